@@ -0,0 +1,292 @@
+import argparse
+import csv
+import json
+import os
+import sys
+import threading
+from urllib.parse import urlsplit
+
+from records import record_ips, to_json
+
+FIELDS = ("scan_id", "domain", "asset_type", "value", "source", "host", "ip", "port", "protocol", "service", "detail")
+ASSET_TYPES = ("host", "ip", "service", "email", "header", "technology")
+FORMATS = ("jsonl", "csv")
+# WhatWeb plugins that describe the response rather than a technology
+WHATWEB_NON_TECH = {"url", "status", "Title", "IP", "Country", "Email", "RedirectLocation", "UncommonHeaders",
+                    "Cookies", "HttpOnly", "Meta-Author", "Script", "Strict-Transport-Security", "X-Frame-Options",
+                    "X-XSS-Protection", "X-UA-Compatible", "Content-Security-Policy"}
+
+# Appends from concurrently finishing scans (e.g. the distributed coordinator) must not interleave
+_write_lock = threading.Lock()
+
+
+def asset_type_list(value):
+    types = [t.strip().lower() for t in value.split(',') if t.strip()]
+    unknown = [t for t in types if t not in ASSET_TYPES]
+    if unknown:
+        raise argparse.ArgumentTypeError(f"unknown asset type(s): {', '.join(unknown)}")
+    return tuple(types)
+
+
+def asset(asset_type, value, source, **fields):
+    """One normalized record; scan_id and domain are filled in by iter_assets."""
+    record = dict.fromkeys(FIELDS, "")
+    record.update(asset_type=asset_type, value=value, source=source)
+    for key, field_value in fields.items():
+        if field_value not in (None, ""):
+            record[key] = field_value
+    return record
+
+
+def _url_host(url):
+    return (urlsplit(url).hostname or "") if url else ""
+
+
+def _values(value):
+    # WhatWeb plugin values are strings or (nested) lists of strings
+    if isinstance(value, list):
+        for item in value:
+            yield from _values(item)
+    elif value not in (None, ""):
+        yield str(value)
+
+
+def _dns_records(records, source):
+    for record in records or []:
+        if not hasattr(record, 'get'):
+            continue
+        host = (record.get('host') or '').rstrip('.').lower()
+        ips = list(record_ips(record))
+        if host:
+            yield asset("host", host, source, host=host, ip=ips[0] if len(ips) == 1 else "")
+        for ip in ips:
+            yield asset("ip", ip, source, host=host)
+
+
+def _nmap_assets(hosts):
+    for entry in hosts or []:
+        ip = entry.get('ip')
+        for hostname in entry.get('hostnames') or []:
+            yield asset("host", hostname, "nmap", host=hostname, ip=ip)
+        yield asset("ip", ip, "nmap")
+        for port in entry.get('ports') or []:
+            if port.get('state') not in (None, 'open'):
+                continue
+            detail = " ".join(v for v in (port.get('product'), port.get('version')) if v)
+            yield asset("service", f"{ip}:{port.get('portid')}/{port.get('protocol')}", "nmap", ip=ip,
+                        port=str(port.get('portid')), protocol=port.get('protocol'), service=port.get('service'),
+                        detail=detail)
+
+
+def _name_assets(source):
+    def extract(names):
+        for name in names or []:
+            if isinstance(name, str) and name:
+                name = name.rstrip('.').lower()
+                yield asset("host", name, source, host=name)
+    return extract
+
+
+def _dnsdumpster_assets(data):
+    for kind in ('a', 'cname'):
+        yield from _dns_records(data.get(kind), "dnsdumpster")
+    for kind in ('mx', 'ns'):
+        for record in data.get(kind) or []:
+            if isinstance(record, dict) and record.get('host'):
+                host = record['host'].rstrip('.').lower()
+                ips = list(record_ips(record))
+                yield asset("host", host, "dnsdumpster", host=host, ip=ips[0] if len(ips) == 1 else "",
+                            detail=f"{kind.upper()} record")
+
+
+def _theharvester_assets(data):
+    yield from _name_assets("theharvester")(data.get('hosts'))
+    for ip in data.get('ips') or []:
+        yield asset("ip", ip, "theharvester")
+    for email in data.get('emails') or []:
+        yield asset("email", email.lower(), "theharvester")
+
+
+def _bruteforce_assets(records):
+    yield from _dns_records(records, "bruteforce")
+
+
+def _tls_assets(certificates):
+    for certificate in certificates or []:
+        for name in certificate.get('in_scope') or []:
+            yield asset("host", name, "tls", host=name, detail=f"SAN of {certificate.get('host')}")
+        if certificate.get('ip'):
+            yield asset("ip", certificate['ip'], "tls", host=certificate.get('host'), port=str(certificate.get('port')))
+
+
+def _whatweb_record_assets(record, source):
+    url = record.get('url', '')
+    host = _url_host(url)
+    for email in _values(record.get('Email')):
+        yield asset("email", email.lower(), source, host=host)
+    for plugin, value in record.items():
+        if plugin not in WHATWEB_NON_TECH:
+            yield asset("technology", plugin, source, host=host, detail=", ".join(_values(value)))
+
+
+def _whatweb_assets(record):
+    yield from _whatweb_record_assets(record, "whatweb")
+
+
+def _whatweb_hosts_assets(records):
+    for record in records or []:
+        yield from _whatweb_record_assets(record, "whatweb")
+
+
+def _httpx_assets(data):
+    for name, value in (data.get('headers') or {}).items():
+        yield asset("header", name, "httpx", detail=value)
+
+
+def _httpx_hosts_assets(responses):
+    for response in responses or []:
+        host = _url_host(response.get('url')) or response.get('input')
+        port = str(response.get('port') or '')
+        ip = response.get('ip')
+        detail = " ".join(str(v) for v in (response.get('status_code'), response.get('title')) if v)
+        yield asset("service", response.get('url'), "httpx", host=host, ip=ip, port=port, protocol="tcp",
+                    service=response.get('scheme'), detail=detail)
+        for tech in response.get('tech') or []:
+            name, _, version = tech.partition(':')
+            yield asset("technology", name, "httpx", host=host, ip=ip, port=port, detail=version)
+
+
+# source -> extractor of its parsed results, in data dictionary order
+ASSET_EXTRACTORS = {
+    "nmap": _nmap_assets,
+    "dnsenum": _name_assets("dnsenum"),
+    "dnsdumpster": _dnsdumpster_assets,
+    "sublist3r": _name_assets("sublist3r"),
+    "ct": _name_assets("ct"),
+    "theharvester": _theharvester_assets,
+    "bruteforce": _bruteforce_assets,
+    "tls": _tls_assets,
+    "whatweb": _whatweb_assets,
+    "whatweb_hosts": _whatweb_hosts_assets,
+    "httpx": _httpx_assets,
+    "httpx_hosts": _httpx_hosts_assets,
+}
+
+
+def iter_assets(domain, results, scan_id, asset_types=ASSET_TYPES):
+    """Yield one normalized record per asset in a scan's aggregated results, source by source.
+
+    results may be any mapping; with a lazy one (see iter_archive_assets)
+    only one source's results are held in memory at a time.
+    """
+    for source, extract in ASSET_EXTRACTORS.items():
+        data = results.get(source)
+        if not data:
+            continue
+        for record in extract(data):
+            if record["value"] and record["asset_type"] in asset_types:
+                record["scan_id"] = scan_id
+                record["domain"] = domain
+                yield record
+
+
+class _ArchiveResults:
+    """Mapping over an archive's per-tool results that decompresses one section per lookup."""
+
+    def __init__(self, path):
+        self.path = path
+
+    def get(self, source, default=None):
+        from result_archive import load_aggregated_results
+        return load_aggregated_results(self.path, [source]).get(source, default)
+
+
+def iter_archive_assets(path, scan_id=None, asset_types=ASSET_TYPES):
+    """Asset records of a saved scan archive, with its domain and scan ID from the archive metadata."""
+    from result_archive import load_section
+    metadata = load_section(path, "scan_metadata", {})
+    name = os.path.basename(path)
+    domain = metadata.get("domain") or (name[5:-4] if name.startswith("scan_") and name.endswith(".arc") else name)
+    scan_id = scan_id or metadata.get("scan_id") or f"{domain}-{metadata.get('timestamp', '')}"
+    yield from iter_assets(domain, _ArchiveResults(path), scan_id, asset_types)
+
+
+class AssetWriter:
+    """Write asset records to a JSON Lines or CSV stream one at a time, so exports run in constant memory."""
+
+    def __init__(self, file, fmt="jsonl", header=True):
+        if fmt not in FORMATS:
+            raise ValueError(f"unknown asset export format: {fmt}")
+        self.file = file
+        self.format = fmt
+        self.count = 0
+        self.csv = None
+        if fmt == "csv":
+            self.csv = csv.DictWriter(file, FIELDS, extrasaction='ignore')
+            if header:
+                self.csv.writeheader()
+
+    @classmethod
+    def open(cls, path, fmt=None, append=False):
+        """Writer for path (format from its extension unless given).
+
+        In append mode an existing file is extended; CSV files only get a
+        header when they are new or empty.
+        """
+        fmt = fmt or ("csv" if path.endswith(".csv") else "jsonl")
+        new_file = not (append and os.path.exists(path) and os.path.getsize(path) > 0)
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        return cls(open(path, 'a' if append else 'w', encoding='utf-8', newline=''), fmt, new_file)
+
+    def write(self, record):
+        if self.csv is not None:
+            self.csv.writerow(record)
+        else:
+            self.file.write(json.dumps(record, separators=(',', ':'), default=to_json) + "\n")
+        self.count += 1
+
+    def write_all(self, records):
+        for record in records:
+            self.write(record)
+        return self.count
+
+    def close(self):
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def export_scan_assets(path, domain, results, scan_id, fmt=None):
+    """Append one finished scan's assets to path; returns the number of records written."""
+    with _write_lock, AssetWriter.open(path, fmt, append=True) as writer:
+        return writer.write_all(iter_assets(domain, results, scan_id))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export scan archives as one normalized record per asset")
+    parser.add_argument("archives", nargs="+", help="scan archives, e.g. reports/scan_example.com.arc")
+    parser.add_argument("-o", "--output", help="output file (default: standard output as JSON Lines)")
+    parser.add_argument("--format", choices=FORMATS, help="output format (default: from the output file extension)")
+    parser.add_argument("--append", action="store_true", help="append to the output file instead of replacing it")
+    parser.add_argument("--types", type=asset_type_list, default=ASSET_TYPES, help=f"comma-separated asset types to export (default: all of {', '.join(ASSET_TYPES)})")
+    parser.add_argument("--scan-id", help="scan ID for every record (default: the one stored in each archive)")
+    args = parser.parse_args(argv)
+
+    if args.output:
+        writer = AssetWriter.open(args.output, args.format, args.append)
+    else:
+        writer = AssetWriter(sys.stdout, args.format or "jsonl")
+    for path in args.archives:
+        writer.write_all(iter_archive_assets(path, args.scan_id, args.types))
+    if args.output:
+        writer.close()
+        print(f"Exported {writer.count} asset record(s) to {args.output}", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,200 @@
+import argparse
+import json
+import os
+import sqlite3
+import time
+from datetime import datetime
+
+from records import record_ips
+
+DEFAULT_INDEX_PATH = "cache/correlation_index.db"
+KINDS = ("ip", "ns", "mx", "email", "tech", "cert")
+# WhatWeb plugins whose values name server-side software
+WHATWEB_TECH_PLUGINS = ("HTTPServer", "X-Powered-By")
+
+
+def _host(value):
+    return value.strip().rstrip('.').lower() if isinstance(value, str) else None
+
+
+def _plugin_values(value):
+    if isinstance(value, list):
+        for item in value:
+            yield from _plugin_values(item)
+    elif isinstance(value, str):
+        yield value
+
+
+def extract_observations(results):
+    """Set of (kind, value) pairs in one domain's aggregated results that other domains may share."""
+    found = set()
+
+    def add(kind, value):
+        if value:
+            found.add((kind, value))
+
+    for host in results.get('nmap') or []:
+        add("ip", host.get('ip'))
+    for record in results.get('bruteforce') or []:
+        for ip in record_ips(record):
+            add("ip", ip)
+    dnsdumpster = results.get('dnsdumpster') or {}
+    for record in dnsdumpster.get('a') or []:
+        if isinstance(record, dict):
+            for ip in record_ips(record):
+                add("ip", ip)
+    for kind in ("ns", "mx"):
+        for record in dnsdumpster.get(kind) or []:
+            if isinstance(record, dict):
+                add(kind, _host(record.get('host')))
+    theharvester = results.get('theharvester') or {}
+    for ip in theharvester.get('ips') or []:
+        add("ip", ip)
+    for email in theharvester.get('emails') or []:
+        add("email", _host(email))
+    whatweb_records = [results.get('whatweb') or {}] + list(results.get('whatweb_hosts') or [])
+    for record in whatweb_records:
+        for email in _plugin_values(record.get('Email')):
+            add("email", _host(email))
+        for plugin in WHATWEB_TECH_PLUGINS:
+            for value in _plugin_values(record.get(plugin)):
+                add("tech", value)
+    for certificate in results.get('tls') or []:
+        add("ip", certificate.get('ip'))
+        add("cert", (certificate.get('sha256') or '').lower())
+    for response in results.get('httpx_hosts') or []:
+        add("ip", response.get('ip'))
+        for tech in response.get('tech') or []:
+            add("tech", tech)
+        tls = response.get('tls') or {}
+        add("cert", (tls.get('sha256') or '').lower())
+    return found
+
+
+class CorrelationIndex:
+    """Inverted index of infrastructure (IPs, NS/MX hosts, emails, technologies, certificates) to domains.
+
+    Each indexed scan replaces its domain's observations, so the index always
+    reflects the latest scan of every domain. Lookups by (kind, value) use the
+    primary key instead of reading every domain's results.
+    """
+
+    def __init__(self, path=DEFAULT_INDEX_PATH):
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.conn = sqlite3.connect(path, timeout=30)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS scans ("
+            " domain TEXT PRIMARY KEY, scan_id TEXT NOT NULL, indexed_at REAL NOT NULL)"
+        )
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS observations ("
+            " kind TEXT NOT NULL, value TEXT NOT NULL, domain TEXT NOT NULL,"
+            " PRIMARY KEY (kind, value, domain)) WITHOUT ROWID"
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS observations_domain ON observations (domain)")
+        self.conn.commit()
+
+    def close(self):
+        self.conn.commit()
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def add_scan(self, domain, results, scan_id=None):
+        """Index a finished scan's aggregated results, replacing the domain's previous scan."""
+        observations = extract_observations(results)
+        scan_id = scan_id or f"{domain}-{datetime.now().strftime('%Y%m%d-%H%M%S')}"
+        with self.conn:
+            self.conn.execute("DELETE FROM observations WHERE domain = ?", (domain,))
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO observations (kind, value, domain) VALUES (?, ?, ?)",
+                ((kind, value, domain) for kind, value in observations)
+            )
+            self.conn.execute(
+                "INSERT OR REPLACE INTO scans (domain, scan_id, indexed_at) VALUES (?, ?, ?)",
+                (domain, scan_id, time.time())
+            )
+        return len(observations)
+
+    def remove_domain(self, domain):
+        with self.conn:
+            self.conn.execute("DELETE FROM observations WHERE domain = ?", (domain,))
+            self.conn.execute("DELETE FROM scans WHERE domain = ?", (domain,))
+
+    def lookup(self, kind, value):
+        """Domains (with the scan that saw it) where this IP, NS, MX, email, technology or certificate was found."""
+        rows = self.conn.execute(
+            "SELECT o.domain, s.scan_id, s.indexed_at FROM observations o JOIN scans s ON s.domain = o.domain"
+            " WHERE o.kind = ? AND o.value = ? ORDER BY o.domain",
+            (kind, value)
+        ).fetchall()
+        return [{"domain": domain, "scan_id": scan_id, "indexed_at": indexed_at}
+                for domain, scan_id, indexed_at in rows]
+
+    def shared_with(self, domain, kinds=KINDS):
+        """{kind: {value: [other domains]}} for everything domain shares with another indexed domain."""
+        shared = {}
+        rows = self.conn.execute(
+            "SELECT o.kind, o.value, other.domain FROM observations o"
+            " JOIN observations other ON other.kind = o.kind AND other.value = o.value AND other.domain != o.domain"
+            " WHERE o.domain = ? ORDER BY o.kind, o.value, other.domain",
+            (domain,)
+        )
+        for kind, value, other in rows:
+            if kind in kinds:
+                shared.setdefault(kind, {}).setdefault(value, []).append(other)
+        return shared
+
+    def shared_infrastructure(self, min_domains=2, kinds=KINDS):
+        """{kind: {value: [domains]}} for every value seen in at least min_domains domains."""
+        shared = {}
+        rows = self.conn.execute(
+            "SELECT kind, value, group_concat(domain, ' ') FROM observations"
+            " GROUP BY kind, value HAVING COUNT(*) >= ? ORDER BY kind, value",
+            (min_domains,)
+        )
+        for kind, value, domains in rows:
+            if kind in kinds:
+                shared.setdefault(kind, {})[value] = sorted(domains.split(' '))
+        return shared
+
+    def domains(self):
+        return [row[0] for row in self.conn.execute("SELECT domain FROM scans ORDER BY domain")]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Query infrastructure shared between scanned domains")
+    parser.add_argument("--index", default=DEFAULT_INDEX_PATH, help=f"index database (default: {DEFAULT_INDEX_PATH})")
+    commands = parser.add_subparsers(dest="command", required=True)
+    lookup = commands.add_parser("lookup", help="domains where a value was seen")
+    lookup.add_argument("kind", choices=KINDS)
+    lookup.add_argument("value")
+    shared = commands.add_parser("shared", help="what a domain shares with other domains (or, without one, everything shared)")
+    shared.add_argument("domain", nargs="?")
+    shared.add_argument("--min-domains", type=int, default=2)
+    add = commands.add_parser("add", help="index a saved scan archive or results JSON")
+    add.add_argument("domain")
+    add.add_argument("path", nargs="?", help="default: reports/scan_<domain>.arc")
+    args = parser.parse_args(argv)
+
+    with CorrelationIndex(args.index) as index:
+        if args.command == "lookup":
+            output = index.lookup(args.kind, args.value.lower() if args.kind != "tech" else args.value)
+        elif args.command == "shared":
+            output = (index.shared_with(args.domain) if args.domain
+                      else index.shared_infrastructure(args.min_domains))
+        else:
+            from result_archive import load_aggregated_results
+            path = args.path or os.path.join("reports", f"scan_{args.domain}.arc")
+            output = {"domain": args.domain,
+                      "observations": index.add_scan(args.domain, load_aggregated_results(path))}
+    print(json.dumps(output, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,249 @@
+import argparse
+import gzip
+import heapq
+import mmap
+import os
+import random
+import re
+import tempfile
+import time
+
+DEFAULT_INDEX_PATH = "cache/ct_index.idx"
+MAGIC = b"#autorecon-ct-index v1\n"
+# Names sorted in memory before a run is spilled to disk while building
+RUN_SIZE = 1_000_000
+NAME_PATTERN = re.compile(r"^[a-z0-9_-]+(\.[a-z0-9_-]+)+$")
+# Separators between names in a dump line (crt.sh name_value, CSV, space-separated lists)
+SPLIT_PATTERN = re.compile(r"[\s,;\"']+")
+
+
+def reverse_name(name):
+    """www.example.com -> com.example.www, so every name under a domain sorts into one block."""
+    return ".".join(reversed(name.split(".")))
+
+
+def normalize_name(text):
+    name = text.strip().lower().rstrip('.')
+    if name.startswith("*."):
+        name = name[2:]
+    if len(name) > 253 or not NAME_PATTERN.match(name):
+        return None
+    return name
+
+
+def _open_dump(path):
+    if path.endswith(".gz"):
+        return gzip.open(path, 'rt', encoding='utf-8', errors='replace')
+    return open(path, 'r', encoding='utf-8', errors='replace')
+
+
+def iter_dump_names(paths):
+    """Normalized host names from CT name dumps (plain or gzipped text, any separators)."""
+    for path in paths:
+        with _open_dump(path) as f:
+            for line in f:
+                for token in SPLIT_PATTERN.split(line):
+                    name = normalize_name(token) if token else None
+                    if name:
+                        yield name
+
+
+def _write_run(names, run_dir):
+    fd, path = tempfile.mkstemp(prefix="ct-run-", dir=run_dir)
+    with os.fdopen(fd, 'w', encoding='ascii') as f:
+        for name in sorted(set(names)):
+            f.write(name + "\n")
+    return path
+
+
+def build_index(names, output_path, run_size=RUN_SIZE):
+    """Write a sorted, deduplicated file of reversed names; returns the number of names.
+
+    Input larger than run_size is sorted in runs spilled to temporary files
+    and merged, so dumps larger than memory can be indexed.
+    """
+    directory = os.path.dirname(output_path) or "."
+    os.makedirs(directory, exist_ok=True)
+    runs = []
+    batch = []
+    try:
+        for name in names:
+            batch.append(reverse_name(name))
+            if len(batch) >= run_size:
+                runs.append(_write_run(batch, directory))
+                batch = []
+        if batch or not runs:
+            runs.append(_write_run(batch, directory))
+
+        files = [open(path, 'r', encoding='ascii') for path in runs]
+        count = 0
+        tmp_path = f"{output_path}.tmp"
+        try:
+            with open(tmp_path, 'w', encoding='ascii') as out:
+                out.write(MAGIC.decode('ascii'))
+                previous = None
+                for line in heapq.merge(*files):
+                    if line != previous:
+                        out.write(line)
+                        count += 1
+                        previous = line
+        finally:
+            for f in files:
+                f.close()
+        os.replace(tmp_path, output_path)
+    finally:
+        for path in runs:
+            os.remove(path)
+    return count
+
+
+class CTIndex:
+    """Memory-mapped index of reversed host names with binary-search prefix lookups.
+
+    The file is a header line followed by one reversed name per line in
+    sorted order; lookups bisect byte offsets, backing up to the start of the
+    line they land in, so no offset table is stored.
+    """
+
+    def __init__(self, path=DEFAULT_INDEX_PATH):
+        self.path = path
+        self.file = open(path, 'rb')
+        header = self.file.read(len(MAGIC))
+        if header != MAGIC:
+            self.file.close()
+            raise ValueError(f"{path} is not a CT index")
+        size = os.fstat(self.file.fileno()).st_size
+        self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ) if size > len(MAGIC) else None
+        self.start = len(MAGIC)
+        self.end = size
+
+    def close(self):
+        if self.map is not None:
+            self.map.close()
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def _line_at(self, pos):
+        # Line containing byte pos: (start, end) with end excluding the newline
+        start = self.map.rfind(b"\n", self.start - 1, pos) + 1
+        end = self.map.find(b"\n", pos)
+        return start, end if end != -1 else self.end
+
+    def _lower_bound(self, key):
+        """Offset of the first line >= key."""
+        lo, hi = self.start, self.end
+        while lo < hi:
+            mid = (lo + hi) // 2
+            start, end = self._line_at(mid)
+            if self.map[start:end] < key:
+                lo = end + 1
+            else:
+                hi = start
+        return lo
+
+    def iter_reversed(self, prefix):
+        """Reversed names starting with prefix, in sorted order."""
+        if self.map is None:
+            return
+        key = prefix.encode('ascii')
+        pos = self._lower_bound(key)
+        while pos < self.end:
+            end = self.map.find(b"\n", pos)
+            end = end if end != -1 else self.end
+            line = self.map[pos:end]
+            if not line.startswith(key):
+                return
+            yield line.decode('ascii')
+            pos = end + 1
+
+    def _contains_reversed(self, key):
+        if self.map is None:
+            return False
+        key = key.encode('ascii')
+        pos = self._lower_bound(key)
+        end = self.map.find(b"\n", pos)
+        return pos < self.end and self.map[pos:end if end != -1 else self.end] == key
+
+    def subdomains(self, domain):
+        """The domain itself (if present) and every name under it, in forward form."""
+        domain = normalize_name(domain)
+        if domain is None:
+            return []
+        base = reverse_name(domain)
+        names = [domain] if self._contains_reversed(base) else []
+        # The trailing dot keeps example.com from matching examplefoo.com
+        names.extend(reverse_name(name) for name in self.iter_reversed(base + "."))
+        return names
+
+    def __contains__(self, name):
+        name = normalize_name(name)
+        return name is not None and self._contains_reversed(reverse_name(name))
+
+
+def run_benchmark(names=1_000_000, domains=1000, queries=1000, run_size=RUN_SIZE, seed=1):
+    """Time building an index of synthetic names and querying it."""
+    rng = random.Random(seed)
+    words = ["www", "mail", "api", "dev", "staging", "vpn", "cdn", "shop", "blog", "portal", "app", "m"]
+    tlds = ["com", "net", "org", "io", "co.uk"]
+    roots = [f"{rng.choice(words)}{i}.{rng.choice(tlds)}" for i in range(domains)]
+    with tempfile.TemporaryDirectory() as tmp:
+        dump = os.path.join(tmp, "names.txt")
+        with open(dump, 'w') as f:
+            for i in range(names):
+                f.write(f"{rng.choice(words)}{rng.randrange(100000)}.{rng.choice(roots)}\n")
+        started = time.perf_counter()
+        count = build_index(iter_dump_names([dump]), os.path.join(tmp, "ct.idx"), run_size)
+        build_seconds = time.perf_counter() - started
+        size = os.path.getsize(os.path.join(tmp, "ct.idx"))
+        with CTIndex(os.path.join(tmp, "ct.idx")) as index:
+            sample = [rng.choice(roots) for _ in range(queries)]
+            started = time.perf_counter()
+            found = sum(len(index.subdomains(domain)) for domain in sample)
+            query_seconds = time.perf_counter() - started
+    return {
+        "names": count,
+        "index_bytes": size,
+        "build_seconds": round(build_seconds, 3),
+        "queries": queries,
+        "names_returned": found,
+        "query_ms_avg": round(query_seconds * 1000 / queries, 4),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build and query the local certificate-transparency name index")
+    commands = parser.add_subparsers(dest="command", required=True)
+    build = commands.add_parser("build", help="index CT name dumps (plain or .gz text)")
+    build.add_argument("dumps", nargs="+", help="dump files with host names, e.g. exported crt.sh name_value columns")
+    build.add_argument("-o", "--output", default=DEFAULT_INDEX_PATH, help=f"index file (default: {DEFAULT_INDEX_PATH})")
+    build.add_argument("--run-size", type=int, default=RUN_SIZE, help="names sorted in memory per run")
+    query = commands.add_parser("query", help="list every indexed name under a domain")
+    query.add_argument("domain")
+    query.add_argument("-i", "--index", default=DEFAULT_INDEX_PATH)
+    bench = commands.add_parser("benchmark", help="time index build and lookups on synthetic names")
+    bench.add_argument("--names", type=int, default=1_000_000)
+    bench.add_argument("--domains", type=int, default=1000)
+    bench.add_argument("--queries", type=int, default=1000)
+    bench.add_argument("--run-size", type=int, default=RUN_SIZE)
+    args = parser.parse_args(argv)
+
+    if args.command == "build":
+        started = time.perf_counter()
+        count = build_index(iter_dump_names(args.dumps), args.output, args.run_size)
+        print(f"Indexed {count} name(s) into {args.output} in {time.perf_counter() - started:.2f}s")
+    elif args.command == "query":
+        with CTIndex(args.index) as index:
+            for name in index.subdomains(args.domain):
+                print(name)
+    else:
+        for key, value in run_benchmark(args.names, args.domains, args.queries, args.run_size).items():
+            print(f"{key}: {value}")
+
+
+if __name__ == '__main__':
+    main()
@@ -2,160 +2,230 @@ import json
 import os
 from datetime import datetime
 from typing import Dict, Any
+from result_archive import save_scan_archive, load_aggregated_results
+from records import to_json
 
-def categorize_scan_results(aggregated_data: Dict[str, Any]) -> Dict[str, Any]:
-    """Reorganize aggregated scan results into categorized structure."""
-    
-    categorized_data = {
-        "scan_metadata": {
-            "timestamp": datetime.now().isoformat(),
-            "total_sources": len([k for k, v in aggregated_data.items() if v]),
-            "available_sources": [k for k, v in aggregated_data.items() if v]
-        },
-        "network_dns_info": {},
-        "subdomains_hosts": {},
-        "emails": {},
-        "web_technologies": {},
-        "http_headers": {}
-    }
+CATEGORIES = ("network_dns_info", "subdomains_hosts", "emails", "web_technologies",
+              "http_headers", "live_hosts")
+
+# Order in which sources are merged by categorize_scan_results
+SOURCE_ORDER = ("nmap", "dnsenum", "dnsdumpster", "sublist3r", "ct", "theharvester", "bruteforce", "tls",
+                "whatweb", "whatweb_hosts", "httpx", "httpx_hosts")
 
+def _categorize_nmap(data):
     # 1. Network & DNS Info - Sources: nmap, dnsenum, dnsdumpster
-    if 'nmap' in aggregated_data and aggregated_data['nmap']:
-        categorized_data["network_dns_info"]["nmap"] = aggregated_data['nmap']
-    
-    if 'dnsenum' in aggregated_data and aggregated_data['dnsenum']:
-        categorized_data["network_dns_info"]["dnsenum"] = aggregated_data['dnsenum']
-    
-    # For dnsdumpster, separate network info from subdomain info
-    if 'dnsdumpster' in aggregated_data and aggregated_data['dnsdumpster']:
-        dnsdumpster_data = aggregated_data['dnsdumpster']
-        
-        # Network/DNS info from dnsdumpster (MX, NS records, total counts)
-        network_info = {}
-        if 'mx' in dnsdumpster_data:
-            network_info['mx_records'] = dnsdumpster_data['mx']
-        if 'ns' in dnsdumpster_data:
-            network_info['ns_records'] = dnsdumpster_data['ns']
-        if 'total_a_recs' in dnsdumpster_data:
-            network_info['total_a_records'] = dnsdumpster_data['total_a_recs']
-        
-        if network_info:
-            categorized_data["network_dns_info"]["dnsdumpster"] = network_info
-
-    # 2. Subdomains & Hosts - Sources: sublist3r, theharvester, dnsdumpster
-    if 'sublist3r' in aggregated_data and aggregated_data['sublist3r']:
-        categorized_data["subdomains_hosts"]["sublist3r"] = aggregated_data['sublist3r']
-    
-    if 'theharvester' in aggregated_data and aggregated_data['theharvester']:
-        theharvester_data = aggregated_data['theharvester']
-        
-        # Extract hosts/subdomains from theharvester
-        hosts_data = {}
-        if 'hosts' in theharvester_data and theharvester_data['hosts']:
-            hosts_data['discovered_hosts'] = theharvester_data['hosts']
-        if 'ips' in theharvester_data and theharvester_data['ips']:
-            hosts_data['discovered_ips'] = theharvester_data['ips']
-        
-        if hosts_data:
-            categorized_data["subdomains_hosts"]["theharvester"] = hosts_data
-    
-    # Subdomain/host info from dnsdumpster (A records, CNAME records)
-    if 'dnsdumpster' in aggregated_data and aggregated_data['dnsdumpster']:
-        dnsdumpster_data = aggregated_data['dnsdumpster']
-        
-        subdomain_info = {}
-        if 'a' in dnsdumpster_data and dnsdumpster_data['a']:
-            subdomain_info['a_records'] = dnsdumpster_data['a']
-        if 'cname' in dnsdumpster_data and dnsdumpster_data['cname']:
-            subdomain_info['cname_records'] = dnsdumpster_data['cname']
-        
-        if subdomain_info:
-            categorized_data["subdomains_hosts"]["dnsdumpster"] = subdomain_info
+    return {"network_dns_info": {"nmap": data}}
+
+def _categorize_dnsenum(data):
+    return {"network_dns_info": {"dnsenum": data}}
+
+def _categorize_dnsdumpster(data):
+    # For dnsdumpster, separate network info (MX, NS records, total counts)
+    # from subdomain info (A records, CNAME records)
+    categories = {}
+    network_info = {}
+    if 'mx' in data:
+        network_info['mx_records'] = data['mx']
+    if 'ns' in data:
+        network_info['ns_records'] = data['ns']
+    if 'total_a_recs' in data:
+        network_info['total_a_records'] = data['total_a_recs']
+    if network_info:
+        categories["network_dns_info"] = {"dnsdumpster": network_info}
+
+    subdomain_info = {}
+    if 'a' in data and data['a']:
+        subdomain_info['a_records'] = data['a']
+    if 'cname' in data and data['cname']:
+        subdomain_info['cname_records'] = data['cname']
+    if subdomain_info:
+        categories["subdomains_hosts"] = {"dnsdumpster": subdomain_info}
+    return categories
+
+def _categorize_sublist3r(data):
+    # 2. Subdomains & Hosts - Sources: sublist3r, theharvester, dnsdumpster, bruteforce
+    return {"subdomains_hosts": {"sublist3r": data}}
+
+def _categorize_ct(data):
+    # Names from the local certificate-transparency index
+    return {"subdomains_hosts": {"ct": data}}
+
+def _categorize_theharvester(data):
+    categories = {}
+    # Extract hosts/subdomains from theharvester
+    hosts_data = {}
+    if 'hosts' in data and data['hosts']:
+        hosts_data['discovered_hosts'] = data['hosts']
+    if 'ips' in data and data['ips']:
+        hosts_data['discovered_ips'] = data['ips']
+    if hosts_data:
+        categories["subdomains_hosts"] = {"theharvester": hosts_data}
 
     # 3. Emails - Source: theharvester and others
-    if 'theharvester' in aggregated_data and aggregated_data['theharvester']:
-        theharvester_data = aggregated_data['theharvester']
-        
-        if 'emails' in theharvester_data:
-            categorized_data["emails"]["theharvester"] = {
-                "discovered_emails": theharvester_data['emails']
-            }
-    
-    # Check if whatweb has email information
-    if 'whatweb' in aggregated_data and aggregated_data['whatweb']:
-        whatweb_data = aggregated_data['whatweb']
-        if 'Email' in whatweb_data:
-            if 'whatweb' not in categorized_data["emails"]:
-                categorized_data["emails"]["whatweb"] = {}
-            categorized_data["emails"]["whatweb"]["contact_email"] = whatweb_data['Email']
+    if 'emails' in data:
+        categories["emails"] = {"theharvester": {"discovered_emails": data['emails']}}
+    return categories
+
+def _categorize_bruteforce(data):
+    # Subdomains resolved by the active brute-force/permutation stage
+    return {"subdomains_hosts": {"bruteforce": data}}
+
+def _categorize_tls(data):
+    # Certificates harvested from HTTPS endpoints; their in-scope SANs are extra hosts
+    return {"subdomains_hosts": {"tls": data}}
+
+def _categorize_whatweb(data):
+    categories = {}
+    # Email found by whatweb goes to the emails category
+    if 'Email' in data:
+        categories["emails"] = {"whatweb": {"contact_email": data['Email']}}
 
     # 4. Web Technologies - Source: whatweb
-    if 'whatweb' in aggregated_data and aggregated_data['whatweb']:
-        # Create a clean copy without email (since that goes to emails category)
-        whatweb_clean = {k: v for k, v in aggregated_data['whatweb'].items() if k != 'Email'}
-        if whatweb_clean:
-            categorized_data["web_technologies"]["whatweb"] = whatweb_clean
+    whatweb_clean = {k: v for k, v in data.items() if k != 'Email'}
+    if whatweb_clean:
+        categories["web_technologies"] = {"whatweb": whatweb_clean}
+    return categories
+
+def _categorize_whatweb_hosts(data):
+    # Per-URL fingerprints from the bulk WhatWeb run
+    return {"web_technologies": {"whatweb_hosts": data}}
 
+def _categorize_httpx(data):
     # 5. HTTP Headers - Source: httpx
-    if 'httpx' in aggregated_data and aggregated_data['httpx']:
-        categorized_data["http_headers"]["httpx"] = aggregated_data['httpx']
+    return {"http_headers": {"httpx": data}}
 
-    # Remove empty categories
-    categories_to_remove = []
-    for category, data in categorized_data.items():
-        if category != "scan_metadata" and not data:
-            categories_to_remove.append(category)
-    
-    for category in categories_to_remove:
-        del categorized_data[category]
+def _categorize_httpx_hosts(data):
+    # 6. Live Hosts - Source: httpx bulk probing (one record per responding host)
+    return {"live_hosts": {"httpx": data}}
+
+# source -> (categorizer, every (category, key) slot the source can fill)
+SOURCE_CATEGORIZERS = {
+    "nmap": (_categorize_nmap, [("network_dns_info", "nmap")]),
+    "dnsenum": (_categorize_dnsenum, [("network_dns_info", "dnsenum")]),
+    "dnsdumpster": (_categorize_dnsdumpster, [("network_dns_info", "dnsdumpster"),
+                                              ("subdomains_hosts", "dnsdumpster")]),
+    "sublist3r": (_categorize_sublist3r, [("subdomains_hosts", "sublist3r")]),
+    "ct": (_categorize_ct, [("subdomains_hosts", "ct")]),
+    "theharvester": (_categorize_theharvester, [("subdomains_hosts", "theharvester"),
+                                                ("emails", "theharvester")]),
+    "bruteforce": (_categorize_bruteforce, [("subdomains_hosts", "bruteforce")]),
+    "tls": (_categorize_tls, [("subdomains_hosts", "tls")]),
+    "whatweb": (_categorize_whatweb, [("emails", "whatweb"), ("web_technologies", "whatweb")]),
+    "whatweb_hosts": (_categorize_whatweb_hosts, [("web_technologies", "whatweb_hosts")]),
+    "httpx": (_categorize_httpx, [("http_headers", "httpx")]),
+    "httpx_hosts": (_categorize_httpx_hosts, [("live_hosts", "httpx")]),
+}
 
+def new_categorized_data() -> Dict[str, Any]:
+    """Empty data dictionary that sources are merged into one at a time."""
+    categorized_data = {
+        "scan_metadata": {
+            "timestamp": datetime.now().isoformat(),
+            "total_sources": 0,
+            "available_sources": []
+        }
+    }
+    for category in CATEGORIES:
+        categorized_data[category] = {}
     return categorized_data
 
-def create_data_dictionary_file(domain: str, aggregated_data: Dict[str, Any], output_dir: str = "reports") -> str:
-    """Create and save the categorized data dictionary JSON file."""
+def merge_source(categorized_data: Dict[str, Any], source: str, data: Any) -> Dict[str, Any]:
+    """Merge (or replace) one source's parsed results into a categorized data dictionary.
+
+    Entries previously merged for the same source are dropped first, so a source
+    can be merged again when its results are refreshed.
+    """
+    if source not in SOURCE_CATEGORIZERS:
+        return categorized_data
+    categorize, slots = SOURCE_CATEGORIZERS[source]
+    for category, key in slots:
+        categorized_data.setdefault(category, {}).pop(key, None)
+
+    metadata = categorized_data["scan_metadata"]
+    if source in metadata["available_sources"]:
+        metadata["available_sources"].remove(source)
+    if data:
+        metadata["available_sources"].append(source)
+        for category, entries in categorize(data).items():
+            categorized_data.setdefault(category, {}).update(entries)
+    metadata["total_sources"] = len(metadata["available_sources"])
+    return categorized_data
+
+def finalize_categorized_data(categorized_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Copy of the data dictionary without empty categories, ready to be saved."""
+    # Remove empty categories
+    finalized = {category: dict(data) for category, data in categorized_data.items()
+                 if category == "scan_metadata" or data}
+    finalized["scan_metadata"]["available_sources"] = list(finalized["scan_metadata"]["available_sources"])
+    return finalized
+
+def categorize_scan_results(aggregated_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Reorganize aggregated scan results into categorized structure."""
+    categorized_data = new_categorized_data()
+    for source in SOURCE_ORDER:
+        if source in aggregated_data:
+            merge_source(categorized_data, source, aggregated_data[source])
+    return finalize_categorized_data(categorized_data)
+
+def create_data_dictionary_file(domain: str, aggregated_data: Dict[str, Any], output_dir: str = "reports",
+                                export_json: bool = False, categorized_data: Dict[str, Any] = None,
+                                scan_id: str = None) -> str:
+    """Create and save the categorized data dictionary as a compressed scan archive.
+
+    The archive holds every category plus each tool's parsed results; the
+    pretty-printed data_dictionary_{domain}.json is only written on request.
+    An already categorized (e.g. incrementally merged) dictionary can be passed in.
+    """
     
     # Generate the categorized data structure
-    categorized_data = categorize_scan_results(aggregated_data)
+    if categorized_data is None:
+        categorized_data = categorize_scan_results(aggregated_data)
     
     # Add domain info to metadata
     categorized_data["scan_metadata"]["domain"] = domain
+    if scan_id:
+        categorized_data["scan_metadata"]["scan_id"] = scan_id
     
     # Create output directory if it doesn't exist
     os.makedirs(output_dir, exist_ok=True)
     
     # Save to file
-    filename = f"data_dictionary_{domain}.json"
-    filepath = os.path.join(output_dir, filename)
-    
-    with open(filepath, 'w', encoding='utf-8') as f:
-        json.dump(categorized_data, f, indent=2)
+    filepath = os.path.join(output_dir, f"scan_{domain}.arc")
+    save_scan_archive(filepath, aggregated_data, categorized_data)
+
+    if export_json:
+        json_path = os.path.join(output_dir, f"data_dictionary_{domain}.json")
+        with open(json_path, 'w', encoding='utf-8') as f:
+            json.dump(categorized_data, f, indent=2, default=to_json)
+        print(f"Data dictionary JSON exported: {json_path}")
     
-    print(f"Data dictionary JSON generated: {filepath}")
+    print(f"Data dictionary archive generated: {filepath}")
     return filepath
 
-def generate_data_dictionary_from_json(json_file_path: str) -> str:
-    """Generate categorized data dictionary from an existing aggregated JSON file."""
+def generate_data_dictionary_from_json(json_file_path: str, export_json: bool = False) -> str:
+    """Generate categorized data dictionary from an existing aggregated JSON file or scan archive."""
     
     # Extract domain from filename
     filename = os.path.basename(json_file_path)
     if filename.startswith("results_") and filename.endswith(".json"):
         domain = filename[8:-5]  # Remove "results_" prefix and ".json" suffix
+    elif filename.startswith("scan_") and filename.endswith(".arc"):
+        domain = filename[5:-4]
     else:
         domain = "unknown"
     
-    # Load the JSON data
-    with open(json_file_path, 'r', encoding='utf-8') as f:
-        aggregated_data = json.load(f)
+    # Load the aggregated data
+    aggregated_data = load_aggregated_results(json_file_path)
     
     # Generate and save the categorized data dictionary
     output_dir = os.path.dirname(json_file_path)
-    return create_data_dictionary_file(domain, aggregated_data, output_dir)
+    return create_data_dictionary_file(domain, aggregated_data, output_dir, export_json)
 
 if __name__ == "__main__":
     # For testing - can be run standalone on a JSON file
     import sys
     if len(sys.argv) > 1:
         json_file = sys.argv[1]
-        generate_data_dictionary_from_json(json_file)
+        generate_data_dictionary_from_json(json_file, export_json="--export-json" in sys.argv[2:])
     else:
-        print("Usage: python3 data_dictionary_generator.py <path_to_results_json>")
\ No newline at end of file
+        print("Usage: python3 data_dictionary_generator.py <path_to_results_json_or_archive> [--export-json]")
\ No newline at end of file
@@ -0,0 +1,744 @@
+import argparse
+import datetime
+import glob
+import http.client
+import http.server
+import json
+import logging
+import os
+import re
+import socket
+import statistics
+import sys
+import threading
+import time
+import uuid
+from functools import partial
+from urllib.parse import urlsplit, quote, unquote
+
+from scanners.nmap_scanner import nmap_scan
+from scanners.whatweb_scanner import whatweb_scan
+from scanners.dnsenum_scanner import dnsenum_scan
+from scanners.theharvester_scanner import theharvester_scan
+from scanners.httpx_scanner import httpx_scan
+from scanners.sublist3r_scanner import sublist3r_scan
+from scanners.dnsdumpster_scanner import dnsdumpster_scan
+from scanners.bruteforce_scanner import bruteforce_scan
+from scanners.ct_scanner import ct_scan
+from tls_harvester import tls_scan
+from event_bus import EventBus, TOOL_FINISHED, RESULTS_UPDATED
+from scheduler import FairScheduler, DEFAULT_TENANT, DEFAULT_PRIORITY, AGING_SECONDS, DOMAIN_QUANTUM, DOMAIN_SLOTS
+from tool_log import LogService, ToolLog
+from scanner import (web_probe_scan, collect_known_hosts, build_scan_host_index, build_arg_parser, nmap_options, tls_ports,
+                     selected_tools, plan_from_args, apply_plan, format_plan, ProgressiveAggregator, print_progress, write_partial_data_dictionary, write_final_outputs,
+                     cleanup_ips_files)
+
+DEFAULT_PORT = 8765
+LEASE_SECONDS = 60
+MAX_ATTEMPTS = 3
+POLL_INTERVAL = 2.0
+TOKEN_ENV = "AUTORECON_TOKEN"
+RESULTS_DIR = "results"
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+ARTIFACT_NAME = re.compile(r"^[A-Za-z0-9][A-Za-z0-9._-]*$")
+
+# Work unit tool -> scan function(domain, log_handle, **kwargs) run by the worker.
+# Names match the lowercased stage names in scanner.py, so TOOL_SOURCES applies.
+TOOLS = {
+    'nmap': nmap_scan,
+    'whatweb': whatweb_scan,
+    'dnsenum': dnsenum_scan,
+    'theharvester': theharvester_scan,
+    'httpx': httpx_scan,
+    'sublist3r': sublist3r_scan,
+    'dnsdumpster': dnsdumpster_scan,
+    'ct': ct_scan,
+    'bruteforce': bruteforce_scan,
+    'tls': tls_scan,
+    'web probing': web_probe_scan,
+}
+PASSIVE_TOOLS = ('nmap', 'whatweb', 'dnsenum', 'theharvester', 'httpx', 'sublist3r', 'dnsdumpster', 'ct')
+
+# Coordinator-side outputs removed before a unit is dispatched; the tool may
+# leave any of them out, so copies from an earlier scan must not be aggregated
+STALE_OUTPUTS = {
+    'nmap': ("nmap_sv_{domain}_*.xml", "nmap_cached_{domain}.json"),
+    'web probing': ("whatweb_{domain}.json", "fingerprint_{domain}.jsonl"),
+}
+
+logger = logging.getLogger("autorecon.distributed")
+
+
+class ProtocolError(Exception):
+    pass
+
+
+class WorkUnit:
+    """One tool run against one domain, leased to at most one worker at a time."""
+
+    def __init__(self, domain, tool, kwargs=None):
+        self.id = uuid.uuid4().hex
+        self.domain = domain
+        self.tool = tool
+        self.kwargs = kwargs or {}
+        self.state = "pending"
+        self.worker = None
+        self.deadline = None
+        self.attempts = 0
+        self.error = None
+        self.job = None
+
+    def to_json(self):
+        return {"id": self.id, "domain": self.domain, "tool": self.tool, "kwargs": self.kwargs}
+
+
+class Coordinator:
+    """Split each domain's scan into work units and hand them out to workers on lease.
+
+    Units follow the same stages as a local scan: the passive tools, then the
+    brute force seeded with the hosts they found, then the TLS certificate
+    harvest, then web probing (and Nmap with scan_subdomains) over the
+    resolved host index. A stage is planned
+    once every unit of the previous one is done, from the artifacts workers
+    uploaded into results/. Workers renew leases with heartbeats; a unit whose
+    lease runs out is queued again for another worker, up to max_attempts.
+    Ready units wait in a FairScheduler that shares the workers between
+    tenants and between each tenant's domains; targets maps a domain to its
+    (tenant, priority).
+    """
+
+    def __init__(self, domains, options=None, lease_seconds=LEASE_SECONDS, max_attempts=MAX_ATTEMPTS,
+                 buses=None, on_domain_done=None, scheduler=None, targets=None):
+        self.options = options or {}
+        self.scheduler = scheduler or FairScheduler()
+        self.targets = targets or {}
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.buses = buses or {}
+        self.on_domain_done = on_domain_done
+        self.units = {}
+        self.started = time.monotonic()
+        # domain -> seconds from the start of the batch until its last unit settled
+        self.finished = {}
+        # domain -> [stage number, units of that stage still open]
+        self.stages = {}
+        self.done = threading.Event()
+        self.lock = threading.Lock()
+        for domain in domains:
+            self.stages[domain] = [-1, 0]
+        for domain in domains:
+            self._next_stage(domain)
+
+    def _plan(self, domain, stage):
+        """(tool, kwargs) units for a stage ([] to skip it), or None once the domain is finished."""
+        nmap_kwargs = self.options.get('nmap', {})
+        concurrency = self.options.get('concurrency', {})
+        scan_subdomains = self.options.get('scan_subdomains', False)
+        if stage == 0:
+            return [(tool, nmap_kwargs if tool == 'nmap' else {}) for tool in PASSIVE_TOOLS
+                    if tool != 'nmap' or not scan_subdomains]
+        if stage == 1:
+            return [('bruteforce', dict(concurrency, known_hosts=sorted(collect_known_hosts(domain))))]
+        if stage == 2:
+            ports = self.options.get('tls_ports')
+            return [('tls', dict(concurrency, hosts=sorted(collect_known_hosts(domain)), ports=ports))] if ports else []
+        if stage == 3:
+            host_index = build_scan_host_index(domain)
+            self._publish(domain, 'host index', host_index)
+            units = [('web probing', {'hosts': sorted(collect_known_hosts(domain)),
+                                      'engine': self.options.get('engine', 'whatweb')})]
+            if scan_subdomains:
+                units.append(('nmap', dict(nmap_kwargs, targets=list(host_index) or None)))
+            return units
+        return None
+
+    def _selected(self, plan):
+        tools = self.options.get('tools')
+        if plan is None or tools is None:
+            return plan
+        return [(tool, kwargs) for tool, kwargs in plan if tool in tools]
+
+    def _next_stage(self, domain):
+        # Planning reads artifacts and resolves hosts, so it runs outside the lock,
+        # on a thread of its own once the previous stage has closed
+        # An error here must still end the domain, or the batch would never be done
+        stage = self.stages[domain][0] + 1
+        try:
+            plan = self._selected(self._plan(domain, stage))
+            while plan == []:
+                stage += 1
+                plan = self._selected(self._plan(domain, stage))
+        except Exception:
+            logger.exception("Planning stage %d for %s failed; finishing it with the results so far", stage, domain)
+            plan = None
+        if plan is None:
+            logger.info("All work units for %s are done", domain)
+            if self.on_domain_done is not None:
+                try:
+                    self.on_domain_done(domain)
+                except Exception:
+                    logger.exception("Writing the outputs for %s failed", domain)
+            with self.lock:
+                self.finished[domain] = round(time.monotonic() - self.started, 3)
+                del self.stages[domain]
+                if not self.stages:
+                    self.done.set()
+            return
+        units = [WorkUnit(domain, tool, kwargs) for tool, kwargs in plan]
+        for unit in units:
+            for pattern in STALE_OUTPUTS.get(unit.tool, ()):
+                for stale in glob.glob(os.path.join(RESULTS_DIR, pattern.format(domain=domain))):
+                    os.remove(stale)
+        with self.lock:
+            self.stages[domain] = [stage, len(units)]
+            for unit in units:
+                self.units[unit.id] = unit
+                self._submit(unit)
+        logger.info("Queued %d work unit(s) for %s: %s", len(units), domain, ", ".join(u.tool for u in units))
+
+    def _submit(self, unit):
+        # Called with the lock held
+        tenant, priority = self.targets.get(unit.domain, (DEFAULT_TENANT, DEFAULT_PRIORITY))
+        unit.job = self.scheduler.submit(unit, tenant, unit.domain, unit.tool, priority)
+
+    def _publish(self, domain, tool, output):
+        bus = self.buses.get(domain)
+        if bus is not None:
+            bus.publish(TOOL_FINISHED, tool=tool, domain=domain, output=output)
+
+    def _owned(self, worker, unit_id):
+        unit = self.units.get(unit_id)
+        if unit is None or unit.state != "leased" or unit.worker != worker:
+            return None
+        return unit
+
+    def lease(self, worker, tools=None):
+        """Next unit this worker can run, "wait" when none is ready yet, or "done"."""
+        self.reap()
+        with self.lock:
+            if self.done.is_set():
+                return "done"
+            job = self.scheduler.next(None if tools is None else lambda job: job.tool in tools)
+            if job is None:
+                return "wait"
+            unit = job.item
+            unit.state = "leased"
+            unit.worker = worker
+            unit.attempts += 1
+            unit.deadline = time.monotonic() + self.lease_seconds
+            logger.info("Leased %s/%s to %s (attempt %d)", unit.domain, unit.tool, worker, unit.attempts)
+            return unit
+
+    def heartbeat(self, worker, unit_id):
+        """Extend the lease; False when the unit has been reassigned and the worker should drop it."""
+        with self.lock:
+            unit = self._owned(worker, unit_id)
+            if unit is None:
+                return False
+            unit.deadline = time.monotonic() + self.lease_seconds
+            return True
+
+    def owns(self, worker, unit_id):
+        with self.lock:
+            return self._owned(worker, unit_id) is not None
+
+    def complete(self, worker, unit_id, output=None, error=None):
+        """Record a unit's outcome; a failed unit is retried until max_attempts."""
+        with self.lock:
+            unit = self._owned(worker, unit_id)
+            if unit is None:
+                return False
+            stage_done = self._settle(unit, error)
+        self._after_settle(unit, output, stage_done)
+        return True
+
+    def _settle(self, unit, error):
+        # Called with the lock held; returns True when the unit closed its stage
+        unit.worker = None
+        unit.deadline = None
+        unit.error = error
+        self.scheduler.finish(unit.job)
+        if error is not None and unit.attempts < self.max_attempts:
+            logger.warning("%s/%s failed, retrying: %s", unit.domain, unit.tool, error)
+            unit.state = "pending"
+            self._submit(unit)
+            return False
+        unit.state = "failed" if error is not None else "done"
+        stage = self.stages[unit.domain]
+        stage[1] -= 1
+        return stage[1] == 0
+
+    def _after_settle(self, unit, output, stage_done):
+        if unit.state == "pending":
+            return
+        if unit.state == "failed":
+            logger.error("%s/%s failed after %d attempt(s): %s", unit.domain, unit.tool, unit.attempts, unit.error)
+        self._publish(unit.domain, unit.tool, output)
+        if stage_done:
+            threading.Thread(target=self._next_stage, args=(unit.domain,), name=f"plan-{unit.domain}",
+                             daemon=True).start()
+
+    def reap(self):
+        """Requeue (or fail, after max_attempts) units whose lease expired without a heartbeat."""
+        now = time.monotonic()
+        expired = []
+        with self.lock:
+            for unit in self.units.values():
+                if unit.state == "leased" and unit.deadline < now:
+                    logger.warning("Lease on %s/%s expired on %s; reassigning", unit.domain, unit.tool, unit.worker)
+                    expired.append((unit, self._settle(unit, "lease expired")))
+        for unit, stage_done in expired:
+            self._after_settle(unit, None, stage_done)
+        return len(expired)
+
+    def status(self):
+        with self.lock:
+            counts = {}
+            for unit in self.units.values():
+                counts[unit.state] = counts.get(unit.state, 0) + 1
+            return {
+                "done": self.done.is_set(),
+                "units": counts,
+                "domains": {domain: stage[0] for domain, stage in self.stages.items()},
+                "leases": [{"domain": u.domain, "tool": u.tool, "worker": u.worker, "attempt": u.attempts}
+                           for u in self.units.values() if u.state == "leased"],
+                "queue": self.scheduler.metrics(),
+                "time_to_report": dict(self.finished),
+            }
+
+    def save_artifact(self, worker, unit_id, name, stream, length):
+        """Stream an uploaded result file into results/, replacing it only if the lease still holds."""
+        if not ARTIFACT_NAME.match(name):
+            raise ProtocolError(f"invalid artifact name {name!r}")
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        path = os.path.join(RESULTS_DIR, name)
+        tmp_path = f"{path}.{unit_id}.part"
+        with open(tmp_path, 'wb') as f:
+            remaining = length
+            while remaining > 0:
+                chunk = stream.read(min(UPLOAD_CHUNK_SIZE, remaining))
+                if not chunk:
+                    break
+                f.write(chunk)
+                remaining -= len(chunk)
+        if remaining or not self.owns(worker, unit_id):
+            os.remove(tmp_path)
+            return False
+        os.replace(tmp_path, path)
+        return True
+
+
+class CoordinatorHandler(http.server.BaseHTTPRequestHandler):
+    """JSON-over-HTTP protocol between the coordinator and its workers.
+
+    POST /lease       {"worker", "tools"} -> 200 {"unit"}, 204 (nothing ready) or 410 (all done)
+    POST /heartbeat   {"worker", "unit"}  -> 200, or 409 when the lease was lost
+    PUT  /artifacts/<unit>/<file name>?worker=<id>  raw file body -> 200 or 409
+    POST /complete    {"worker", "unit", "output", "error"} -> 200 or 409
+    GET  /status
+    """
+    protocol_version = "HTTP/1.1"
+    coordinator = None
+    token = None
+
+    def log_message(self, format, *args):
+        logger.debug("%s %s", self.address_string(), format % args)
+
+    def _send(self, status, body=None):
+        data = json.dumps(body).encode('utf-8') if body is not None else b""
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _authorized(self):
+        if self.token and self.headers.get("Authorization") != f"Bearer {self.token}":
+            self._send(401, {"error": "unauthorized"})
+            return False
+        return True
+
+    def _read_json(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        return json.loads(self.rfile.read(length) or b"{}")
+
+    def do_GET(self):
+        if not self._authorized():
+            return
+        if self.path == "/status":
+            self._send(200, self.coordinator.status())
+        else:
+            self._send(404, {"error": "not found"})
+
+    def do_POST(self):
+        if not self._authorized():
+            return
+        try:
+            body = self._read_json()
+        except ValueError:
+            self._send(400, {"error": "invalid JSON"})
+            return
+        worker = body.get("worker")
+        if self.path == "/lease":
+            tools = body.get("tools")
+            unit = self.coordinator.lease(worker, set(tools) if tools is not None else None)
+            if unit == "done":
+                self._send(410, {"done": True})
+            elif unit == "wait":
+                self._send(204)
+            else:
+                self._send(200, {"unit": unit.to_json(), "lease_seconds": self.coordinator.lease_seconds})
+        elif self.path == "/heartbeat":
+            ok = self.coordinator.heartbeat(worker, body.get("unit"))
+            self._send(200 if ok else 409, {"ok": ok})
+        elif self.path == "/complete":
+            ok = self.coordinator.complete(worker, body.get("unit"), body.get("output"), body.get("error"))
+            self._send(200 if ok else 409, {"ok": ok})
+        else:
+            self._send(404, {"error": "not found"})
+
+    def do_PUT(self):
+        if not self._authorized():
+            return
+        parts = urlsplit(self.path)
+        segments = parts.path.split("/")
+        if len(segments) != 4 or segments[1] != "artifacts" or not parts.query.startswith("worker="):
+            self._send(404, {"error": "not found"})
+            return
+        worker = unquote(parts.query[len("worker="):])
+        try:
+            ok = self.coordinator.save_artifact(worker, segments[2], unquote(segments[3]), self.rfile,
+                                                int(self.headers.get("Content-Length") or 0))
+        except ProtocolError as e:
+            self._send(400, {"error": str(e)})
+            return
+        self._send(200 if ok else 409, {"ok": ok})
+
+
+def serve(coordinator, host="127.0.0.1", port=DEFAULT_PORT, token=None):
+    """Start the coordinator's HTTP server on a background thread and return it."""
+    handler = type("Handler", (CoordinatorHandler,), {"coordinator": coordinator, "token": token})
+    server = http.server.ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="coordinator-http", daemon=True).start()
+    threading.Thread(target=_reap_loop, args=(coordinator,), name="coordinator-reaper", daemon=True).start()
+    return server
+
+
+def _reap_loop(coordinator, interval=1.0):
+    while not coordinator.done.wait(interval):
+        coordinator.reap()
+
+
+class CoordinatorClient:
+    """Worker side of the protocol over one keep-alive connection."""
+
+    def __init__(self, url, worker_id, token=None, timeout=30):
+        parts = urlsplit(url)
+        self.host = parts.hostname
+        self.port = parts.port or DEFAULT_PORT
+        self.worker_id = worker_id
+        self.token = token
+        self.timeout = timeout
+        self.conn = None
+        self.lock = threading.Lock()
+
+    def close(self):
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+
+    def _request(self, method, path, body=None, headers=None):
+        headers = dict(headers or {})
+        if self.token:
+            headers["Authorization"] = f"Bearer {self.token}"
+        if isinstance(body, dict):
+            body = json.dumps(body).encode('utf-8')
+            headers["Content-Type"] = "application/json"
+        with self.lock:
+            if self.conn is None:
+                self.conn = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+            try:
+                self.conn.request(method, path, body=body, headers=headers)
+                response = self.conn.getresponse()
+                data = response.read()
+            except (http.client.HTTPException, OSError):
+                self.close()
+                raise
+        if response.status == 401:
+            raise ProtocolError("coordinator rejected the token")
+        return response.status, json.loads(data) if data else None
+
+    def lease(self, tools=None):
+        """(unit dict, lease seconds), None when nothing is ready, or "done" once the coordinator has finished."""
+        status, body = self._request("POST", "/lease", {"worker": self.worker_id, "tools": tools})
+        if status == 410:
+            return "done"
+        return (body["unit"], body.get("lease_seconds", LEASE_SECONDS)) if status == 200 else None
+
+    def heartbeat(self, unit_id):
+        return self._request("POST", "/heartbeat", {"worker": self.worker_id, "unit": unit_id})[0] == 200
+
+    def upload(self, unit_id, path):
+        """Stream one result file to the coordinator; False when the lease was lost."""
+        with open(path, 'rb') as f:
+            status, _ = self._request(
+                "PUT", f"/artifacts/{unit_id}/{quote(os.path.basename(path))}?worker={quote(self.worker_id)}",
+                body=f, headers={"Content-Length": str(os.path.getsize(path))})
+        return status == 200
+
+    def complete(self, unit_id, output=None, error=None):
+        body = {"worker": self.worker_id, "unit": unit_id, "output": output, "error": error}
+        return self._request("POST", "/complete", body)[0] == 200
+
+
+def _artifacts(domain, since):
+    """Result files for domain written since the unit started."""
+    pattern = re.compile(rf"_{re.escape(domain)}(?:[._]|$)")
+    paths = []
+    for path in glob.glob(os.path.join(RESULTS_DIR, "*")):
+        if os.path.isfile(path) and pattern.search(os.path.basename(path)) and os.path.getmtime(path) >= since:
+            paths.append(path)
+    return sorted(paths)
+
+
+def _heartbeat_loop(client, unit_id, interval, stop, lost):
+    while not stop.wait(interval):
+        try:
+            if not client.heartbeat(unit_id):
+                lost.set()
+                return
+        except ProtocolError as e:
+            # The coordinator no longer accepts this worker, so the lease will not be renewed
+            logger.warning("Heartbeat for %s rejected: %s", unit_id, e)
+            lost.set()
+            return
+        except (http.client.HTTPException, OSError) as e:
+            logger.warning("Heartbeat for %s failed: %s", unit_id, e)
+
+
+def run_unit(client, unit, run_id, lease_seconds=LEASE_SECONDS):
+    """Run one leased unit, upload its result files and report the outcome."""
+    domain, tool = unit["domain"], unit["tool"]
+    stop, lost = threading.Event(), threading.Event()
+    heartbeat = threading.Thread(target=_heartbeat_loop, args=(client, unit["id"], lease_seconds / 3, stop, lost),
+                                 name=f"heartbeat-{tool}", daemon=True)
+    heartbeat.start()
+    started = time.time()
+    output, error = None, None
+    with ToolLog(run_id, tool) as log_handle:
+        try:
+            output = TOOLS[tool](domain, log_handle, **unit["kwargs"])
+        except Exception as e:
+            logger.exception("%s scan raised an error", tool, extra={"run_id": run_id, "tool": tool})
+            error = f"{type(e).__name__}: {e}"
+    stop.set()
+    heartbeat.join()
+    if lost.is_set():
+        logger.warning("Lease on %s/%s was lost; dropping its results", domain, tool)
+        return False
+    for path in _artifacts(domain, started):
+        if not client.upload(unit["id"], path):
+            logger.warning("Lease on %s/%s was lost during upload", domain, tool)
+            return False
+    return client.complete(unit["id"], output, error)
+
+
+def run_worker(url, worker_id=None, tools=None, token=None, poll_interval=POLL_INTERVAL, run_id=None):
+    """Lease and run units until the coordinator reports that every domain is done.
+
+    Units run one at a time, because scanners write to the shared results/
+    directory; run several workers (each with its own working directory) to
+    use more of a machine.
+    """
+    worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}"
+    run_id = run_id or f"worker-{worker_id}"
+    client = CoordinatorClient(url, worker_id, token)
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    completed = 0
+    try:
+        while True:
+            try:
+                leased = client.lease(tools)
+            except (http.client.HTTPException, OSError) as e:
+                logger.warning("Coordinator unreachable: %s", e)
+                leased = None
+            if leased == "done":
+                break
+            if leased is None:
+                time.sleep(poll_interval)
+                continue
+            # Heartbeats follow the coordinator's lease length, not this worker's default
+            unit, lease_seconds = leased
+            print(f"[+] {worker_id}: running {unit['tool']} for {unit['domain']}")
+            try:
+                if run_unit(client, unit, run_id, lease_seconds):
+                    completed += 1
+            except (http.client.HTTPException, OSError) as e:
+                # The lease runs out and the coordinator hands the unit to another worker
+                logger.warning("Could not report %s/%s: %s", unit['domain'], unit['tool'], e)
+    finally:
+        client.close()
+    return completed
+
+
+def load_targets(path):
+    """{domain: (tenant, priority)} from a file of "domain [tenant] [priority]" lines; # starts a comment."""
+    targets = {}
+    with open(path, 'r', encoding='utf-8') as f:
+        for number, line in enumerate(f, 1):
+            fields = line.split('#', 1)[0].split()
+            if not fields:
+                continue
+            try:
+                priority = int(fields[2]) if len(fields) > 2 else DEFAULT_PRIORITY
+            except ValueError:
+                raise ValueError(f"{path}:{number}: priority must be an integer") from None
+            targets[fields[0]] = (fields[1] if len(fields) > 1 else DEFAULT_TENANT, priority)
+    return targets
+
+
+def tenant_weight(value):
+    tenant, sep, weight = value.partition('=')
+    try:
+        if not sep or float(weight) <= 0:
+            raise ValueError
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected TENANT=WEIGHT with a positive weight, got {value!r}") from None
+    return tenant, float(weight)
+
+
+def batch_targets(args):
+    """{domain: (tenant, priority)} for the positional domains and --targets, in the order given."""
+    targets = {domain: (DEFAULT_TENANT, DEFAULT_PRIORITY) for domain in args.domains}
+    if args.targets:
+        targets.update(load_targets(args.targets))
+    return targets
+
+
+def run_coordinator(targets, args, author):
+    """Serve the work units of every domain and write each domain's report once its units are done."""
+    domains = list(targets)
+    reports_dir = "reports"
+    os.makedirs(reports_dir, exist_ok=True)
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    started = time.time()
+    buses, aggregators = {}, {}
+    for domain in domains:
+        bus = EventBus()
+        aggregators[domain] = ProgressiveAggregator(domain, bus, None if args.no_parse_cache else args.parse_cache)
+        bus.subscribe(RESULTS_UPDATED, partial(print_progress, sys.stdout))
+        bus.subscribe(RESULTS_UPDATED, partial(write_partial_data_dictionary, domain, reports_dir, args.export_json))
+        buses[domain] = bus.start()
+
+    def finish_domain(domain):
+        buses[domain].close()
+        duration = time.time() - started
+        scan_duration = f"{int(duration // 60)} minute(s) {int(duration % 60)} second(s)"
+        print(f"\n--- Aggregating Results for {domain} ---")
+        write_final_outputs(domain, aggregators[domain].complete(), reports_dir, author, scan_duration,
+                            args.export_json, None if args.no_correlation_index else args.correlation_index,
+                            args.shared_infrastructure, asset_export=args.export_assets)
+
+    options = {'nmap': nmap_options(args), 'scan_subdomains': args.scan_subdomains, 'engine': args.fingerprint_engine,
+               'tls_ports': None if args.no_tls_harvest else tls_ports(args), 'tools': selected_tools(args),
+               'concurrency': {'concurrency': args.concurrency} if args.concurrency else {}}
+    scheduler = FairScheduler(dict(args.tenant_weight or ()), args.domain_slots or None, args.aging_seconds,
+                              args.domain_quantum)
+    coordinator = Coordinator(domains, options, args.lease_seconds, args.max_attempts, buses, finish_domain,
+                              scheduler, targets)
+    server = serve(coordinator, args.bind, args.port, args.token)
+    print(f"[+] Coordinator listening on http://{args.bind}:{server.server_address[1]}/ "
+          f"for {len(domains)} domain(s)")
+    try:
+        coordinator.done.wait()
+        # Let idle workers see that the batch is finished before the server goes away
+        time.sleep(args.linger)
+    finally:
+        server.shutdown()
+        server.server_close()
+    cleanup_ips_files()
+    return coordinator.status()
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Distributed reconnaissance: one coordinator, many workers")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    coordinator = commands.add_parser("coordinator", parents=[build_arg_parser(add_help=False)],
+                                      help="queue the scans of one or more domains and serve them to workers")
+    coordinator.add_argument("domains", nargs="*", help=f"target domains (tenant {DEFAULT_TENANT!r})")
+    coordinator.add_argument("--targets", metavar="FILE",
+                             help='batch file of "domain [tenant] [priority]" lines; higher priorities go first')
+    coordinator.add_argument("--tenant-weight", type=tenant_weight, action="append", metavar="TENANT=WEIGHT",
+                             help="share of the workers a tenant gets relative to others (default weight: 1)")
+    coordinator.add_argument("--domain-slots", type=int, default=DOMAIN_SLOTS,
+                             help="most units of one domain running at once while other domains wait; "
+                                  f"0 for no limit (default: {DOMAIN_SLOTS})")
+    coordinator.add_argument("--domain-quantum", type=float, default=DOMAIN_QUANTUM,
+                             help="seconds of run time a domain gets before domains that have had less go "
+                                  f"ahead of it (default: {DOMAIN_QUANTUM:.0f})")
+    coordinator.add_argument("--aging-seconds", type=float, default=AGING_SECONDS,
+                             help="seconds of waiting that lift a unit by one quantum or priority level "
+                                  f"(default: {AGING_SECONDS:.0f})")
+    coordinator.add_argument("--author", default="autorecon", help="author shown in the reports")
+    coordinator.add_argument("--bind", default="127.0.0.1", help="address to listen on (default: 127.0.0.1)")
+    coordinator.add_argument("--port", type=int, default=DEFAULT_PORT, help=f"port to listen on (default: {DEFAULT_PORT})")
+    coordinator.add_argument("--lease-seconds", type=float, default=LEASE_SECONDS,
+                             help=f"seconds without a heartbeat before a unit is reassigned (default: {LEASE_SECONDS})")
+    coordinator.add_argument("--max-attempts", type=int, default=MAX_ATTEMPTS,
+                             help=f"times a unit is tried before it counts as failed (default: {MAX_ATTEMPTS})")
+    coordinator.add_argument("--linger", type=float, default=POLL_INTERVAL * 2,
+                             help="seconds to keep serving after the last unit so idle workers can exit")
+
+    worker = commands.add_parser("worker", help="run work units leased from a coordinator")
+    worker.add_argument("url", help="coordinator URL, e.g. http://10.0.0.5:8765")
+    worker.add_argument("--id", help="worker ID (default: <hostname>-<pid>)")
+    worker.add_argument("--workdir", help="directory the worker writes results/ and log/ into")
+    worker.add_argument("--tools", help=f"comma-separated tools this worker runs (default: all of {', '.join(TOOLS)})")
+    worker.add_argument("--poll-interval", type=float, default=POLL_INTERVAL,
+                        help=f"seconds between lease requests when no unit is ready (default: {POLL_INTERVAL})")
+
+    for command in (coordinator, worker):
+        command.add_argument("--token", default=os.environ.get(TOKEN_ENV),
+                             help=f"shared secret sent as a bearer token (default: ${TOKEN_ENV})")
+    args = parser.parse_args(argv)
+    if args.command == "coordinator" and not (args.domains or args.targets):
+        coordinator.error("give at least one domain or --targets")
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.command == "worker" and args.workdir:
+        os.makedirs(args.workdir, exist_ok=True)
+        os.chdir(args.workdir)
+    run_id = f"{args.command}-{datetime.datetime.now().strftime('%Y%m%d-%H%M%S')}"
+    log_service = LogService(default_run_id=run_id).start()
+    try:
+        if args.command == "coordinator":
+            targets = batch_targets(args)
+            if args.dry_run or args.time_budget:
+                # Shards are the number of workers the batch needs to fit the budget
+                plan, fits, budget = plan_from_args(list(targets), args, allow_shards=True)
+                print(format_plan(plan, budget, fits))
+                if args.dry_run:
+                    return
+                apply_plan(args, plan)
+            status = run_coordinator(targets, args, args.author)
+            print(f"[+] Work units: {status['units']}")
+            for job_class, wait in status['queue']['waits'].items():
+                print(f"    queue wait {job_class}: p50 {wait['p50']}s, p95 {wait['p95']}s, max {wait['max']}s "
+                      f"({wait['count']} unit(s))")
+            if status['time_to_report']:
+                print(f"[+] Median time to report: {statistics.median(status['time_to_report'].values()):.1f}s")
+        else:
+            tools = [t.strip() for t in args.tools.split(',')] if args.tools else None
+            completed = run_worker(args.url, args.id, tools, args.token, args.poll_interval, run_id)
+            print(f"[+] Worker finished after {completed} unit(s).")
+    finally:
+        log_service.stop()
+
+
+if __name__ == '__main__':
+    main()
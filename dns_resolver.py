@@ -0,0 +1,147 @@
+import asyncio
+import random
+import struct
+
+DEFAULT_NAMESERVER = "8.8.8.8"
+DNS_PORT = 53
+
+TYPE_A = 1
+TYPE_CNAME = 5
+CLASS_IN = 1
+
+RCODE_NOERROR = 0
+RCODE_NXDOMAIN = 3
+
+
+def system_nameserver(resolv_conf="/etc/resolv.conf"):
+    """Return the first nameserver from resolv.conf, or the public default."""
+    try:
+        with open(resolv_conf, 'r') as f:
+            for line in f:
+                parts = line.split()
+                if len(parts) >= 2 and parts[0] == "nameserver":
+                    return parts[1]
+    except OSError:
+        pass
+    return DEFAULT_NAMESERVER
+
+
+def build_query(query_id, name, qtype=TYPE_A):
+    """Build a recursive DNS query packet for a single question."""
+    header = struct.pack(">HHHHHH", query_id, 0x0100, 1, 0, 0, 0)
+    qname = b""
+    for label in name.rstrip('.').split('.'):
+        encoded = label.encode('idna') if label else b""
+        qname += bytes([len(encoded)]) + encoded
+    qname += b"\x00"
+    return header + qname + struct.pack(">HH", qtype, CLASS_IN)
+
+
+def _skip_name(packet, offset):
+    while True:
+        length = packet[offset]
+        if length == 0:
+            return offset + 1
+        if length & 0xC0 == 0xC0:
+            return offset + 2
+        offset += length + 1
+
+
+def parse_response(packet):
+    """Parse a DNS response into (query_id, rcode, [ipv4 addresses])."""
+    query_id, flags, qdcount, ancount, _, _ = struct.unpack(">HHHHHH", packet[:12])
+    rcode = flags & 0x000F
+    offset = 12
+    for _ in range(qdcount):
+        offset = _skip_name(packet, offset) + 4
+
+    addresses = []
+    for _ in range(ancount):
+        offset = _skip_name(packet, offset)
+        rtype, rclass, _, rdlength = struct.unpack(">HHIH", packet[offset:offset + 10])
+        offset += 10
+        if rtype == TYPE_A and rclass == CLASS_IN and rdlength == 4:
+            addresses.append(".".join(str(b) for b in packet[offset:offset + 4]))
+        offset += rdlength
+    return query_id, rcode, addresses
+
+
+class _ResolverProtocol(asyncio.DatagramProtocol):
+    def __init__(self, pending):
+        self.pending = pending
+
+    def datagram_received(self, data, addr):
+        try:
+            query_id, rcode, addresses = parse_response(data)
+        except (struct.error, IndexError):
+            return
+        future = self.pending.pop(query_id, None)
+        if future is not None and not future.done():
+            future.set_result((rcode, addresses))
+
+    def error_received(self, exc):
+        pass
+
+
+class AsyncResolver:
+    """Minimal asynchronous A-record resolver sharing a single UDP socket.
+
+    Queries are matched to responses by transaction ID, so many lookups can be
+    in flight at once without opening a socket per name.
+    """
+
+    def __init__(self, nameserver=None, port=DNS_PORT, timeout=2.0, retries=2):
+        self.nameserver = nameserver or system_nameserver()
+        self.port = port
+        self.timeout = timeout
+        self.retries = retries
+        self._pending = {}
+        self._transport = None
+
+    async def open(self):
+        loop = asyncio.get_running_loop()
+        self._transport, _ = await loop.create_datagram_endpoint(
+            lambda: _ResolverProtocol(self._pending),
+            remote_addr=(self.nameserver, self.port)
+        )
+        return self
+
+    def close(self):
+        if self._transport is not None:
+            self._transport.close()
+            self._transport = None
+        for future in self._pending.values():
+            if not future.done():
+                future.cancel()
+        self._pending.clear()
+
+    async def __aenter__(self):
+        return await self.open()
+
+    async def __aexit__(self, exc_type, exc, tb):
+        self.close()
+
+    def _next_id(self):
+        while True:
+            query_id = random.randint(0, 0xFFFF)
+            if query_id not in self._pending:
+                return query_id
+
+    async def resolve(self, name):
+        """Return the A records for name, or an empty list if it does not resolve."""
+        loop = asyncio.get_running_loop()
+        for _ in range(self.retries + 1):
+            query_id = self._next_id()
+            future = loop.create_future()
+            self._pending[query_id] = future
+            self._transport.sendto(build_query(query_id, name))
+            try:
+                rcode, addresses = await asyncio.wait_for(future, self.timeout)
+            except asyncio.TimeoutError:
+                self._pending.pop(query_id, None)
+                continue
+            if rcode == RCODE_NOERROR:
+                return addresses
+            if rcode == RCODE_NXDOMAIN:
+                return []
+        return []
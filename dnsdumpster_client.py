@@ -0,0 +1,136 @@
+import http.client
+import json
+import os
+import threading
+import time
+from urllib.parse import urlsplit, quote
+
+DEFAULT_BASE_URL = "https://api.dnsdumpster.com"
+API_KEY_ENV = "DNSDUMPSTER_API_KEY"
+# Free-tier quota: one request every two seconds
+DEFAULT_RATE = 0.5
+DEFAULT_BURST = 1
+MAX_RETRIES = 4
+BACKOFF = 2.0
+RECORD_KEYS = ('a', 'mx', 'ns', 'cname', 'txt', 'total_a_recs')
+
+
+class DNSDumpsterError(Exception):
+    pass
+
+
+class TokenBucket:
+    """Thread-safe token bucket; acquire() sleeps until a token is available."""
+
+    def __init__(self, rate=DEFAULT_RATE, capacity=DEFAULT_BURST):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        with self.lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                time.sleep((1 - self.tokens) / self.rate)
+
+
+def validate_response(data):
+    """Raise DNSDumpsterError unless data looks like a domain lookup result."""
+    if not isinstance(data, dict):
+        raise DNSDumpsterError("unexpected response type")
+    if data.get('error'):
+        raise DNSDumpsterError(str(data['error']))
+    if not any(key in data for key in RECORD_KEYS):
+        raise DNSDumpsterError("response contains no DNS records")
+    return data
+
+
+class DNSDumpsterClient:
+    """DNSDumpster API client over one persistent keep-alive connection.
+
+    Requests are paced by a token bucket matching the API quota and retried
+    with exponential backoff (honouring Retry-After) on 429 and 5xx responses.
+    """
+
+    def __init__(self, api_key=None, base_url=DEFAULT_BASE_URL, rate=DEFAULT_RATE, burst=DEFAULT_BURST,
+                 max_retries=MAX_RETRIES, backoff=BACKOFF, timeout=30):
+        self.api_key = api_key or os.environ.get(API_KEY_ENV)
+        if not self.api_key:
+            raise DNSDumpsterError(f"no API key; set {API_KEY_ENV}")
+        parts = urlsplit(base_url)
+        self.scheme = parts.scheme
+        self.host = parts.hostname
+        self.port = parts.port
+        self.prefix = parts.path.rstrip('/')
+        self.bucket = TokenBucket(rate, burst)
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self.conn = None
+        self.lock = threading.Lock()
+
+    def _connection(self):
+        if self.conn is None:
+            cls = http.client.HTTPSConnection if self.scheme == "https" else http.client.HTTPConnection
+            self.conn = cls(self.host, self.port, timeout=self.timeout)
+        return self.conn
+
+    def close(self):
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def _request(self, path):
+        conn = self._connection()
+        try:
+            conn.request("GET", path, headers={
+                "X-API-Key": self.api_key,
+                "Accept": "application/json",
+                "Connection": "keep-alive"
+            })
+            response = conn.getresponse()
+            return response.status, response.getheader("Retry-After"), response.read()
+        except (http.client.HTTPException, OSError):
+            # The server may drop an idle keep-alive connection; reconnect on the next attempt
+            self.close()
+            raise
+
+    def lookup(self, domain):
+        """Return validated DNS records for domain, retrying transient failures."""
+        path = f"{self.prefix}/domain/{quote(domain)}"
+        last_error = None
+        with self.lock:
+            for attempt in range(self.max_retries + 1):
+                if attempt:
+                    time.sleep(last_error[1] if last_error and last_error[1] is not None
+                               else self.backoff * (2 ** (attempt - 1)))
+                self.bucket.acquire()
+                try:
+                    status, retry_after, body = self._request(path)
+                except (http.client.HTTPException, OSError) as e:
+                    last_error = (f"connection error: {e}", None)
+                    continue
+                if status == 429 or status >= 500:
+                    delay = float(retry_after) if retry_after and retry_after.isdigit() else None
+                    last_error = (f"HTTP {status}", delay)
+                    continue
+                if status != 200:
+                    raise DNSDumpsterError(f"HTTP {status} for {domain}")
+                try:
+                    return validate_response(json.loads(body))
+                except json.JSONDecodeError:
+                    raise DNSDumpsterError(f"invalid JSON for {domain}")
+        raise DNSDumpsterError(f"giving up on {domain} after {self.max_retries + 1} attempts ({last_error[0]})")
@@ -0,0 +1,67 @@
+import logging
+import queue
+import threading
+
+TOOL_FINISHED = "tool_finished"
+RESULTS_UPDATED = "results_updated"
+
+logger = logging.getLogger(__name__)
+
+
+class EventBus:
+    """Publish/subscribe bus with one dispatcher thread.
+
+    publish() only enqueues, so scanner threads never wait on subscribers.
+    Handlers run one at a time on the dispatcher thread in publish order, so
+    state shared between subscribers needs no locking.
+    """
+
+    def __init__(self):
+        self._subscribers = {}
+        self._queue = queue.Queue()
+        self._thread = None
+
+    def subscribe(self, event_type, handler):
+        self._subscribers.setdefault(event_type, []).append(handler)
+        return handler
+
+    def publish(self, event_type, **payload):
+        self._queue.put((event_type, payload))
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._dispatch, name="event-bus", daemon=True)
+            self._thread.start()
+        return self
+
+    def close(self):
+        """Deliver every event already published, then stop the dispatcher.
+
+        Events published by handlers while draining are delivered too.
+        """
+        if self._thread is not None:
+            self._queue.join()
+            self._queue.put(None)
+            self._thread.join()
+            self._thread = None
+
+    def _dispatch(self):
+        while True:
+            event = self._queue.get()
+            if event is None:
+                self._queue.task_done()
+                return
+            event_type, payload = event
+            for handler in list(self._subscribers.get(event_type, [])):
+                try:
+                    handler(**payload)
+                except Exception:
+                    # A failing subscriber must not stop the others or the scan
+                    logger.exception("%s subscriber failed", event_type)
+            self._queue.task_done()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
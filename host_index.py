@@ -0,0 +1,57 @@
+import json
+import os
+import socket
+from concurrent.futures import ThreadPoolExecutor
+
+RESOLVE_WORKERS = 32
+
+
+def _resolve(host):
+    try:
+        infos = socket.getaddrinfo(host, None, socket.AF_INET, socket.SOCK_STREAM)
+    except (socket.gaierror, UnicodeError, OSError):
+        return host, []
+    return host, sorted({info[4][0] for info in infos})
+
+
+def resolve_hosts(hosts, known_ips=None, workers=RESOLVE_WORKERS):
+    """Resolve hosts to IPv4 addresses, reusing addresses already known from discovery."""
+    known_ips = known_ips or {}
+    resolved = {host: sorted(set(ips)) for host, ips in known_ips.items() if host in hosts and ips}
+    pending = [host for host in hosts if host not in resolved]
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for host, ips in executor.map(_resolve, pending):
+            resolved[host] = ips
+    return resolved
+
+
+def build_host_index(host_ips):
+    """Invert a host -> [ip] mapping into ip -> sorted [host]."""
+    index = {}
+    for host, ips in host_ips.items():
+        for ip in ips:
+            index.setdefault(ip, set()).add(host)
+    return {ip: sorted(names) for ip, names in sorted(index.items())}
+
+
+def save_host_index(domain, index, results_dir="results"):
+    os.makedirs(results_dir, exist_ok=True)
+    path = os.path.join(results_dir, f"host_index_{domain}.json")
+    with open(path, 'w') as f:
+        json.dump(index, f)
+    return path
+
+
+def load_host_index(path):
+    try:
+        with open(path, 'r') as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def attach_hostnames(nmap_hosts, index):
+    """Fan port-scan results for each IP back out to every hostname pointing at it."""
+    for host in nmap_hosts:
+        host['hostnames'] = index.get(host.get('ip'), [])
+    return nmap_hosts
@@ -0,0 +1,123 @@
+import asyncio
+import logging
+import ssl
+from urllib.parse import urlsplit
+
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64)"
+DEFAULT_CONCURRENCY = 50
+DEFAULT_TIMEOUT = 10.0
+MAX_BODY = 512 * 1024
+
+logger = logging.getLogger(__name__)
+
+
+def _ssl_context():
+    # Recon probes must still read misconfigured or self-signed endpoints
+    context = ssl.create_default_context()
+    context.check_hostname = False
+    context.verify_mode = ssl.CERT_NONE
+    return context
+
+
+async def _read_body(reader, max_body):
+    chunks = []
+    remaining = max_body
+    while remaining > 0:
+        chunk = await reader.read(min(65536, remaining))
+        if not chunk:
+            break
+        chunks.append(chunk)
+        remaining -= len(chunk)
+    return b"".join(chunks)
+
+
+async def fetch(url, timeout=DEFAULT_TIMEOUT, max_body=MAX_BODY, ssl_context=None):
+    """GET url and return a response dict, or None if the host did not answer.
+
+    The request is sent as HTTP/1.0 with Connection: close so the body arrives
+    unchunked and ends at EOF. Only the first max_body bytes are kept.
+    """
+    parts = urlsplit(url)
+    https = parts.scheme == "https"
+    port = parts.port or (443 if https else 80)
+    path = (parts.path or "/") + (f"?{parts.query}" if parts.query else "")
+
+    async def _exchange():
+        reader, writer = await asyncio.open_connection(
+            parts.hostname, port,
+            ssl=(ssl_context or _ssl_context()) if https else None,
+            server_hostname=parts.hostname if https else None
+        )
+        try:
+            peer = writer.get_extra_info('peername')
+            writer.write(
+                f"GET {path} HTTP/1.0\r\nHost: {parts.netloc}\r\nUser-Agent: {USER_AGENT}\r\n"
+                f"Accept: */*\r\nConnection: close\r\n\r\n".encode('latin-1')
+            )
+            await writer.drain()
+
+            status_line = (await reader.readline()).decode('latin-1').strip()
+            fields = status_line.split(' ', 2)
+            if len(fields) < 2 or not fields[0].startswith("HTTP/"):
+                return None
+            headers = []
+            while True:
+                line = (await reader.readline()).decode('latin-1')
+                if line in ('\r\n', '\n', ''):
+                    break
+                if ':' in line:
+                    name, value = line.split(':', 1)
+                    headers.append((name.strip(), value.strip()))
+            body = await _read_body(reader, max_body)
+        finally:
+            writer.close()
+
+        return {
+            'url': url,
+            'ip': peer[0] if peer else '',
+            'status': int(fields[1]) if fields[1].isdigit() else 0,
+            'reason': fields[2] if len(fields) > 2 else '',
+            'headers': headers,
+            'body': body.decode('utf-8', errors='replace')
+        }
+
+    try:
+        return await asyncio.wait_for(_exchange(), timeout)
+    except (OSError, asyncio.TimeoutError, ssl.SSLError, UnicodeError, ValueError):
+        return None
+
+
+async def probe_urls(urls, on_response, concurrency=DEFAULT_CONCURRENCY, timeout=DEFAULT_TIMEOUT):
+    """Fetch urls with at most `concurrency` requests in flight.
+
+    on_response(response) is called for every URL that answered; URLs are pulled
+    from the iterable lazily so large target lists are not held in memory.
+    Returns the number of responses received.
+    """
+    queue = asyncio.Queue(maxsize=concurrency * 2)
+    context = _ssl_context()
+    answered = 0
+
+    async def worker():
+        nonlocal answered
+        while True:
+            url = await queue.get()
+            if url is None:
+                return
+            # A URL that fails must not take its worker down: with every
+            # worker gone the producer would block on the full queue forever
+            try:
+                response = await fetch(url, timeout=timeout, ssl_context=context)
+                if response is not None:
+                    answered += 1
+                    on_response(response)
+            except Exception as e:
+                logger.warning("Probing %s failed: %s", url, e)
+
+    workers = [asyncio.create_task(worker()) for _ in range(concurrency)]
+    for url in urls:
+        await queue.put(url)
+    for _ in workers:
+        await queue.put(None)
+    await asyncio.gather(*workers)
+    return answered
@@ -0,0 +1,188 @@
+import hashlib
+import importlib
+import json
+import logging
+import multiprocessing
+import os
+import sqlite3
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import records
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_PATH = "cache/parse_cache.db"
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+DIGEST_CHUNK_SIZE = 1024 * 1024
+# Modules the parsers share; their PARSER_VERSION is part of every key as well
+SHARED_MODULES = ("records", "parsers.json_stream")
+
+
+def file_digest(path):
+    sha = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(DIGEST_CHUNK_SIZE), b''):
+            sha.update(chunk)
+    return sha.hexdigest()
+
+
+def _job_paths(args):
+    for arg in args:
+        if isinstance(arg, (list, tuple)):
+            yield from _job_paths(arg)
+        elif arg is not None:
+            yield arg
+
+
+def job_key(job):
+    """Cache key for a parse job: parser, the PARSER_VERSION of it and of SHARED_MODULES, and the SHA-256
+    of every input file.
+
+    A job is (module name, function name, args), where args are input file
+    paths (or lists of paths, or None). File names are not part of the key, so
+    the same artifact parsed from another scan directory is a hit.
+    """
+    module_name, func_name, args = job
+    versions = ",".join(str(getattr(importlib.import_module(name), 'PARSER_VERSION', 0))
+                        for name in (module_name,) + SHARED_MODULES)
+    sha = hashlib.sha256(f"{module_name}.{func_name}:{versions}".encode('utf-8'))
+    for path in _job_paths(args):
+        sha.update(b"\0" + (file_digest(path) if os.path.exists(path) else "missing").encode('ascii'))
+    return sha.hexdigest()
+
+
+def run_parse_job(job):
+    module_name, func_name, args = job
+    return getattr(importlib.import_module(module_name), func_name)(*args)
+
+
+class _RecordCollector(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.records = []
+
+    def emit(self, record):
+        # Flatten to a picklable record that can be replayed in the parent
+        record.msg = self.format(record)
+        record.args = None
+        record.exc_info = None
+        self.records.append(record)
+
+
+def _run_parse_job_in_worker(job):
+    """Run a job in a pool worker, returning its result and the log records it emitted.
+
+    The parent's queue handler does not reach across processes, so records are
+    collected here and handed back to the parent's logging.
+    """
+    root = logging.getLogger()
+    collector = _RecordCollector()
+    saved_handlers, saved_level = root.handlers[:], root.level
+    root.handlers = [collector]
+    root.setLevel(logging.INFO)
+    try:
+        return run_parse_job(job), collector.records
+    finally:
+        root.handlers = saved_handlers
+        root.setLevel(saved_level)
+
+
+class ParseCache:
+    """Persistent memo of parser outputs keyed by (parser version, input content hash).
+
+    Results are stored in sqlite as JSON, with records tagged by type and
+    rebuilt on load, so reading the cache never runs code from it; evict()
+    drops the least recently used entries until the cache fits in max_bytes.
+    """
+
+    def __init__(self, path=DEFAULT_CACHE_PATH, max_bytes=DEFAULT_MAX_BYTES):
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.max_bytes = max_bytes
+        self.conn = sqlite3.connect(path)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS parse_results ("
+            " key TEXT PRIMARY KEY, parser TEXT NOT NULL, size INTEGER NOT NULL,"
+            " last_used REAL NOT NULL, data BLOB NOT NULL)"
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS parse_results_last_used ON parse_results (last_used)")
+        self.conn.commit()
+
+    def close(self):
+        self.conn.commit()
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def get(self, key):
+        row = self.conn.execute("SELECT data FROM parse_results WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        try:
+            value = json.loads(row[0], object_hook=records.from_tagged_json)
+        except (ValueError, TypeError):
+            # Unreadable or written by an older version: parse again and overwrite it
+            return None
+        self.conn.execute("UPDATE parse_results SET last_used = ? WHERE key = ?", (time.time(), key))
+        return value
+
+    def put(self, key, parser, value):
+        try:
+            data = json.dumps(value, default=records.to_tagged_json, separators=(',', ':')).encode('utf-8')
+        except (TypeError, ValueError):
+            logger.warning("Not caching %s: its result is not JSON serializable", parser)
+            return
+        self.conn.execute(
+            "INSERT OR REPLACE INTO parse_results (key, parser, size, last_used, data) VALUES (?, ?, ?, ?, ?)",
+            (key, parser, len(data), time.time(), sqlite3.Binary(data))
+        )
+
+    def evict(self):
+        self.conn.execute(
+            "DELETE FROM parse_results WHERE key IN ("
+            " SELECT key FROM (SELECT key, SUM(size) OVER (ORDER BY last_used DESC) AS total"
+            " FROM parse_results) WHERE total > ?)",
+            (self.max_bytes,)
+        )
+        self.conn.commit()
+
+
+def parse_jobs(jobs, cache=None, workers=None):
+    """Run {name: job} parse jobs, returning {name: result}.
+
+    Cached results are reused; the remaining jobs run in a process pool (or
+    inline when only one is left) and their results are stored in the cache.
+    """
+    results = {}
+    pending = {}
+    for name, job in jobs.items():
+        key = job_key(job) if cache is not None else None
+        cached = cache.get(key) if key is not None else None
+        if cached is not None:
+            results[name] = cached
+        else:
+            pending[name] = (job, key)
+
+    if len(pending) == 1:
+        name, (job, _) = next(iter(pending.items()))
+        results[name] = run_parse_job(job)
+    elif pending:
+        # Forking here would copy locks held by the scan, reader and logging threads into the workers
+        with ProcessPoolExecutor(max_workers=min(len(pending), workers or os.cpu_count() or 1),
+                                 mp_context=multiprocessing.get_context("forkserver")) as executor:
+            futures = {name: executor.submit(_run_parse_job_in_worker, job) for name, (job, _) in pending.items()}
+            for name, future in futures.items():
+                results[name], records = future.result()
+                for record in records:
+                    logging.getLogger(record.name).handle(record)
+
+    if cache is not None and pending:
+        for name, (job, key) in pending.items():
+            cache.put(key, f"{job[0]}.{job[1]}", results[name])
+        cache.evict()
+    return {name: results[name] for name in jobs}
@@ -0,0 +1,17 @@
+from records import DnsRecord
+
+PARSER_VERSION = 1
+
+def parse_bruteforce(text_file):
+    results = []
+    try:
+        with open(text_file, 'r') as f:
+            for line in f:
+                parts = line.split()
+                if not parts:
+                    continue
+                ips = parts[1].split(',') if len(parts) > 1 else []
+                results.append(DnsRecord(parts[0], ips))
+    except FileNotFoundError:
+        return []
+    return results
@@ -0,0 +1,8 @@
+PARSER_VERSION = 1
+
+def parse_ct(text_file):
+    try:
+        with open(text_file, 'r') as f:
+            return [line.strip() for line in f if line.strip()]
+    except FileNotFoundError:
+        return []
@@ -1,12 +1,26 @@
 import json
+import logging
+
+from parsers.json_stream import collect_members, summarize
+
+PARSER_VERSION = 1
+
+logger = logging.getLogger(__name__)
+
+RECORD_KEYS = ('a', 'mx', 'ns', 'cname')
+SCALAR_KEYS = ('total_a_recs', 'error')
 
 def parse_dnsdumpster(json_file):
     try:
-        with open(json_file, 'r') as f:
-            data = json.load(f)
-        return data
+        members, summary = collect_members(json_file, RECORD_KEYS, SCALAR_KEYS)
+        if members.get('error'):
+            logger.warning(f"Ignoring DNSDumpster error response in {json_file}")
+            return {}
+        logger.info(f"Parsed DNSDumpster JSON: {summarize(json_file, summary)}")
+        # Keep the old shape: record types absent from the response stay absent
+        return {key: value for key, value in members.items() if value not in ([], None)}
     except FileNotFoundError:
         return {}
     except json.JSONDecodeError:
-        print(f"Error decoding JSON from {json_file}")
+        logger.warning(f"Error decoding JSON from {json_file}")
         return {}
@@ -1,6 +1,8 @@
 
 import xml.etree.ElementTree as ET
 
+PARSER_VERSION = 1
+
 def parse_dnsenum(xml_file):
     try:
         tree = ET.parse(xml_file)
@@ -1,3 +1,12 @@
+import json
+import logging
+
+from records import HttpResponse
+
+PARSER_VERSION = 1
+
+logger = logging.getLogger(__name__)
+
 def parse_httpx(text_file):
     parsed_data = {}
     try:
@@ -20,5 +29,54 @@ def parse_httpx(text_file):
             parsed_data['headers'] = headers
             
     except Exception as e:
-        print(f"Error parsing httpx output file {text_file}: {e}")
-    return parsed_data
\ No newline at end of file
+        logger.warning(f"Error parsing httpx output file {text_file}: {e}")
+    return parsed_data
+
+def _field(record, name, default=None):
+    # httpx releases differ between hyphenated and underscored field names
+    return record.get(name, record.get(name.replace('_', '-'), default))
+
+def _tls_info(record):
+    tls = _field(record, 'tls') or _field(record, 'tls_grab')
+    if not tls:
+        return None
+    fingerprint = _field(tls, 'fingerprint_hash') or {}
+    return {
+        'subject_cn': _field(tls, 'subject_cn', ''),
+        'subject_an': _field(tls, 'subject_an', []),
+        'issuer': _field(tls, 'issuer_cn') or _field(tls, 'issuer_dn', ''),
+        'not_after': _field(tls, 'not_after', ''),
+        'version': _field(tls, 'tls_version', ''),
+        'sha256': fingerprint.get('sha256', '') if isinstance(fingerprint, dict) else ''
+    }
+
+def iter_httpx_jsonl(jsonl_file):
+    """Yield one normalized record per live host from httpx -json output, line by line."""
+    with open(jsonl_file, 'r') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            yield HttpResponse(
+                url=record.get('url', ''),
+                input=record.get('input', ''),
+                ip=record.get('host', ''),
+                port=record.get('port'),
+                scheme=record.get('scheme', ''),
+                status_code=_field(record, 'status_code'),
+                title=record.get('title', ''),
+                webserver=record.get('webserver', ''),
+                tech=record.get('tech', []),
+                content_length=_field(record, 'content_length'),
+                tls=_tls_info(record)
+            )
+
+def parse_httpx_jsonl(jsonl_file):
+    try:
+        return list(iter_httpx_jsonl(jsonl_file))
+    except FileNotFoundError:
+        return []
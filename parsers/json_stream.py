@@ -0,0 +1,193 @@
+import json
+import os
+import re
+
+# Part of every parse cache key, since several parsers read their inputs through this module;
+# bump it whenever a change here alters what a parser returns
+PARSER_VERSION = 1
+CHUNK_SIZE = 64 * 1024
+_WHITESPACE = ' \t\r\n'
+_STRUCTURAL = re.compile(r'["\[\]{},]')
+_STRING_SPECIAL = re.compile(r'["\\]')
+
+
+class _Reader:
+    """Character source over a file read in fixed-size chunks."""
+
+    def __init__(self, f, chunk_size):
+        self.f = f
+        self.chunk_size = chunk_size
+        self.buf = ''
+        self.pos = 0
+
+    def peek(self):
+        if self.pos >= len(self.buf):
+            self.buf = self.f.read(self.chunk_size)
+            self.pos = 0
+            if not self.buf:
+                return ''
+        return self.buf[self.pos]
+
+    def next(self):
+        ch = self.peek()
+        self.pos += 1
+        return ch
+
+    def skip_whitespace(self):
+        while self.peek() and self.peek() in _WHITESPACE:
+            self.pos += 1
+
+    def expect(self, ch):
+        self.skip_whitespace()
+        got = self.next()
+        if got != ch:
+            raise json.JSONDecodeError(f"expected {ch!r}, got {got!r}", '', 0)
+
+
+def _read_value(reader, keep):
+    """Consume one JSON value; return its text if keep, otherwise discard it.
+
+    Only the bracket depth and string state are tracked, jumping between
+    structural characters with a regex, so skipping a value costs no memory
+    however large it is.
+    """
+    reader.skip_whitespace()
+    out = []
+    depth = 0
+    in_string = False
+    started = False
+    while True:
+        if not reader.peek():
+            if depth or in_string:
+                raise json.JSONDecodeError("unexpected end of file", '', 0)
+            break
+        buf, pos = reader.buf, reader.pos
+        if in_string:
+            found = _STRING_SPECIAL.search(buf, pos)
+            if not found:
+                if keep:
+                    out.append(buf[pos:])
+                reader.pos = len(buf)
+                continue
+            end = found.start()
+            if keep:
+                out.append(buf[pos:end + 1])
+            reader.pos = end + 1
+            if buf[end] == '\\':
+                escaped = reader.next()
+                if keep:
+                    out.append(escaped)
+                continue
+            in_string = False
+            if depth == 0:
+                break
+            continue
+        found = _STRUCTURAL.search(buf, pos)
+        end = found.start() if found else len(buf)
+        if buf[pos:end].strip():
+            started = True
+        if found and depth == 0 and started and buf[end] in ',]}':
+            if keep:
+                out.append(buf[pos:end])
+            reader.pos = end
+            break
+        if keep:
+            out.append(buf[pos:end + 1] if found else buf[pos:])
+        if not found:
+            reader.pos = len(buf)
+            continue
+        reader.pos = end + 1
+        started = True
+        ch = buf[end]
+        if ch == '"':
+            in_string = True
+        elif ch in '[{':
+            depth += 1
+        elif ch in ']}':
+            depth -= 1
+            if depth == 0:
+                break
+    return ''.join(out) if keep else None
+
+
+def _read_key(reader):
+    return json.loads(_read_value(reader, True))
+
+
+def iter_object_members(json_file, wanted, chunk_size=CHUNK_SIZE):
+    """Stream a top-level JSON object, yielding (key, item) for wanted keys.
+
+    Array members are yielded one element at a time; scalar or object members
+    are yielded whole. Members that are not wanted are skipped without being
+    decoded, so memory stays bounded by the largest single wanted element.
+    """
+    with open(json_file, 'r', encoding='utf-8') as f:
+        reader = _Reader(f, chunk_size)
+        reader.expect('{')
+        reader.skip_whitespace()
+        if reader.peek() == '}':
+            return
+        while True:
+            key = _read_key(reader)
+            reader.expect(':')
+            reader.skip_whitespace()
+            if key not in wanted:
+                _read_value(reader, False)
+            elif reader.peek() == '[':
+                reader.next()
+                reader.skip_whitespace()
+                if reader.peek() == ']':
+                    reader.next()
+                else:
+                    while True:
+                        yield key, json.loads(_read_value(reader, True))
+                        reader.skip_whitespace()
+                        separator = reader.next()
+                        if separator == ']':
+                            break
+                        if separator != ',':
+                            raise json.JSONDecodeError(f"unexpected {separator!r} in array", '', 0)
+            else:
+                yield key, json.loads(_read_value(reader, True))
+            reader.skip_whitespace()
+            separator = reader.next()
+            if separator == '}':
+                return
+            if separator != ',':
+                raise json.JSONDecodeError(f"unexpected {separator!r} in object", '', 0)
+
+
+def _key_for(item):
+    # Hashable identity for deduplicating records that may be dicts or lists
+    if isinstance(item, (dict, list)):
+        return json.dumps(item, sort_keys=True)
+    return item
+
+
+def collect_members(json_file, array_keys, scalar_keys=(), chunk_size=CHUNK_SIZE):
+    """Collect wanted top-level members, deduplicating array elements as they stream in.
+
+    Returns (members, summary) where summary maps each array key to the number
+    of elements read and kept, for logging instead of the raw data.
+    """
+    members = {key: [] for key in array_keys}
+    seen = {key: set() for key in array_keys}
+    summary = {key: {'read': 0, 'kept': 0} for key in array_keys}
+    for key, item in iter_object_members(json_file, set(array_keys) | set(scalar_keys), chunk_size):
+        if key in scalar_keys:
+            members[key] = item
+            continue
+        summary[key]['read'] += 1
+        identity = _key_for(item)
+        if identity not in seen[key]:
+            seen[key].add(identity)
+            members[key].append(item)
+            summary[key]['kept'] += 1
+    return members, summary
+
+
+def summarize(json_file, summary):
+    """One-line size/count summary of a collect_members() run for the scan log."""
+    size = os.path.getsize(json_file)
+    counts = ", ".join(f"{key}: {c['kept']} unique of {c['read']}" for key, c in summary.items())
+    return f"{json_file} ({size} bytes) -> {counts}"
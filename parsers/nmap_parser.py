@@ -1,22 +1,67 @@
-
+import json
 import xml.etree.ElementTree as ET
 
-def parse_nmap(xml_file):
+from records import Host, Port, pack_ip
+
+PARSER_VERSION = 1
+
+def _parse_hosts(xml_file):
     tree = ET.parse(xml_file)
     root = tree.getroot()
     hosts = []
     for host in root.findall('host'):
-        host_info = {
-            'ip': host.find('address').get('addr'),
-            'ports': []
-        }
+        host_info = Host(host.find('address').get('addr'))
         for port in host.findall('.//port'):
-            port_info = {
-                'portid': port.get('portid'),
-                'protocol': port.get('protocol'),
-                'state': port.find('state').get('state'),
-                'service': port.find('service').get('name') if port.find('service') is not None else ''
-            }
-            host_info['ports'].append(port_info)
+            service = port.find('service')
+            host_info.ports.append(Port(
+                port.get('portid'),
+                port.get('protocol'),
+                port.find('state').get('state'),
+                service.get('name') if service is not None else '',
+                service.get('product') if service is not None else None,
+                service.get('version') if service is not None else None
+            ))
         hosts.append(host_info)
     return hosts
+
+def parse_nmap(xml_file, service_xml_files=(), cached_services=()):
+    """Parse an nmap XML file, overlaying results of targeted -sV passes if given.
+
+    cached_services holds port entries (with an 'ip' key) taken from the service
+    fingerprint cache; fresh -sV results take precedence over them.
+    """
+    hosts = _parse_hosts(xml_file)
+    if not service_xml_files and not cached_services:
+        return hosts
+
+    detected = {}
+    for entry in cached_services:
+        port = Port.from_dict(entry)
+        detected[(pack_ip(entry['ip']), port.port, port.protocol)] = port
+    for service_file in service_xml_files:
+        try:
+            for host in _parse_hosts(service_file):
+                for port in host.ports:
+                    detected[(host.address, port.port, port.protocol)] = port
+        except ET.ParseError:
+            continue
+
+    for host in hosts:
+        for i, port in enumerate(host.ports):
+            key = (host.address, port.port, port.protocol)
+            if key in detected:
+                host.ports[i] = detected[key]
+    return hosts
+
+def parse_nmap_scan(xml_file, service_xml_files=(), cached_services_file=None, host_index_file=None):
+    """parse_nmap over a scan's files, with hostnames from the host index attached to each address."""
+    from host_index import load_host_index, attach_hostnames
+
+    cached_services = []
+    if cached_services_file:
+        with open(cached_services_file, 'r') as f:
+            cached_services = json.load(f)
+    hosts = parse_nmap(xml_file, service_xml_files, cached_services)
+    if host_index_file:
+        attach_hostnames(hosts, load_host_index(host_index_file))
+    return hosts
@@ -1,3 +1,5 @@
+PARSER_VERSION = 1
+
 def parse_sublist3r(text_file):
     try:
         with open(text_file, 'r') as f:
@@ -1,26 +1,26 @@
 import json
+import logging
+
+from parsers.json_stream import collect_members, summarize
+
+PARSER_VERSION = 1
+
+logger = logging.getLogger(__name__)
 
 def parse_theharvester(json_file):
-    emails = set()
-    hosts = set()
-    ips = set()
     try:
-        with open(json_file, 'r') as f:
-            data = json.load(f)
-        print(f"Parsing theHarvester JSON: {data}") # Debugging line
-
-        emails = set(data.get('emails', []))
-        hosts = set(data.get('hosts', []))
-        ips = set(data.get('ips', [])) # Extract IPs
+        # Only the arrays we use are streamed in; everything else is skipped undecoded
+        members, summary = collect_members(json_file, ('emails', 'hosts', 'ips'))
+        logger.info(f"Parsed theHarvester JSON: {summarize(json_file, summary)}")
 
     except FileNotFoundError:
-        print(f"theHarvester JSON file not found: {json_file}")
+        logger.warning(f"theHarvester JSON file not found: {json_file}")
         return {'emails': [], 'hosts': [], 'ips': []}
     except json.JSONDecodeError as e:
-        print(f"Error decoding JSON from theHarvester file {json_file}: {e}")
+        logger.warning(f"Error decoding JSON from theHarvester file {json_file}: {e}")
         return {'emails': [], 'hosts': [], 'ips': []}
     except Exception as e:
-        print(f"Error parsing theHarvester JSON file {json_file}: {e}")
+        logger.warning(f"Error parsing theHarvester JSON file {json_file}: {e}")
         return {'emails': [], 'hosts': [], 'ips': []}
 
-    return {'emails': list(emails), 'hosts': list(hosts), 'ips': list(ips)}
+    return {'emails': members['emails'], 'hosts': members['hosts'], 'ips': members['ips']}
@@ -0,0 +1,19 @@
+import json
+
+PARSER_VERSION = 1
+
+def parse_tls(jsonl_file):
+    records = []
+    try:
+        with open(jsonl_file, 'r') as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    records.append(json.loads(line))
+                except json.JSONDecodeError:
+                    continue
+    except FileNotFoundError:
+        return []
+    return records
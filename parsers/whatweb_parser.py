@@ -1,47 +1,155 @@
+import json
+import logging
+import sys
 
-import re
+PARSER_VERSION = 1
 
-def parse_whatweb(text_file):
+logger = logging.getLogger(__name__)
+
+# Order WhatWeb's brief format prints plugin fields in, e.g. HTTPServer[Ubuntu Linux][Apache/2.4.41]
+PLUGIN_FIELDS = ('version', 'os', 'string', 'account', 'model', 'firmware', 'module', 'filepath')
+
+def _add_value(data, key, value):
+    if key in data:
+        if isinstance(data[key], list):
+            data[key].append(value)
+        else:
+            data[key] = [data[key], value]
+    else:
+        data[key] = value
+
+def _plugin_value(groups):
+    # Matches the legacy representation: no value -> True, Name[a][b] -> "a][b"
+    if not groups:
+        return True
+    return "][".join(groups)
+
+def tokenize_whatweb_line(line):
+    """Parse one line of WhatWeb's brief text output in a single pass.
+
+    The line looks like "URL [200 OK] Name[value][value], Name, ..." with ANSI
+    colour codes interleaved. Commas inside brackets are kept as part of the
+    value instead of splitting the entry.
+    """
     data = {}
-    try:
-        with open(text_file, 'r') as f:
-            content = f.read()
-        # Remove ANSI escape codes
-        content = re.sub(r'\x1b\[[0-9;]*m', '', content)
-
-        # Extract URL and status code
-        match_url_status = re.match(r'(https?://[^ ]+) \[([0-9]{3} [A-Z]+)\]', content)
-        if match_url_status:
-            data['url'] = match_url_status.group(1)
-            data['status'] = match_url_status.group(2)
-            content = content[match_url_status.end():].strip()
-
-        # Split by comma and parse key[value] pairs
-        pairs = content.split(', ')
-        for pair in pairs:
-            pair = pair.strip()
-            if not pair: continue
-            if '[' in pair and ']' in pair:
-                key, value = pair.split('[', 1)
-                value = value[:-1] # Remove closing bracket
-                key = key.strip()
-                value = value.strip()
-
-                if key in data:
-                    if isinstance(data[key], list):
-                        data[key].append(value)
-                    else:
-                        data[key] = [data[key], value]
+    i = 0
+    n = len(line)
+    token = []
+    groups = []
+    depth = 0
+    group = []
+    state = 'url'
+
+    def flush():
+        name = ''.join(token).strip()
+        if state == 'url':
+            if name:
+                data['url'] = name
+        elif name:
+            _add_value(data, sys.intern(name), _plugin_value(groups))
+
+    while i < n:
+        ch = line[i]
+        if ch == '\x1b':
+            # Skip an ANSI escape sequence such as \x1b[1m or \x1b[0m
+            i += 1
+            if i < n and line[i] == '[':
+                i += 1
+                while i < n and (line[i].isdigit() or line[i] == ';'):
+                    i += 1
+            i += 1
+            continue
+        if depth:
+            if ch == '[':
+                depth += 1
+                group.append(ch)
+            elif ch == ']':
+                depth -= 1
+                if depth:
+                    group.append(ch)
+                elif state == 'status':
+                    data['status'] = ''.join(group).strip()
+                    group = []
+                    state = 'plugins'
                 else:
-                    data[key] = value
-            elif pair.strip(): # Handle cases like 'HTML5' without a value
-                data[pair.strip()] = True
+                    groups.append(''.join(group).strip())
+                    group = []
+            else:
+                group.append(ch)
+        elif ch == '[':
+            if state == 'url':
+                flush()
+                token = []
+                state = 'status'
+            depth = 1
+        elif ch == ',' and state == 'plugins':
+            flush()
+            token = []
+            groups = []
+        elif state != 'status':
+            token.append(ch)
+        i += 1
+
+    if state == 'plugins':
+        flush()
+    return data
+
+def iter_whatweb_text(text_file):
+    """Yield one record per URL line of WhatWeb's brief text output."""
+    with open(text_file, 'r') as f:
+        for line in f:
+            if line.strip():
+                record = tokenize_whatweb_line(line.rstrip('\n'))
+                if record:
+                    yield record
 
+def whatweb_json_record(entry):
+    """Convert one --log-json entry into the dict shape parse_whatweb produces."""
+    data = {'url': entry.get('target', '')}
+    if entry.get('http_status'):
+        data['status'] = str(entry['http_status'])
+    for name, fields in (entry.get('plugins') or {}).items():
+        groups = []
+        for field in PLUGIN_FIELDS:
+            values = fields.get(field, []) if isinstance(fields, dict) else []
+            if not isinstance(values, list):
+                values = [values]
+            groups.extend(str(v) for v in values)
+        data[sys.intern(name)] = _plugin_value(groups)
+    return data
+
+def iter_whatweb_json(json_file):
+    """Stream per-URL records from a WhatWeb --log-json file.
+
+    WhatWeb writes a JSON array with one entry per line, so entries are
+    decoded a line at a time instead of loading the whole log.
+    """
+    with open(json_file, 'r') as f:
+        for line in f:
+            line = line.strip().rstrip(',')
+            if line in ('', '[', ']', '{}'):
+                continue
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if isinstance(entry, dict) and entry.get('target'):
+                yield whatweb_json_record(entry)
+
+def parse_whatweb_json(json_file):
+    try:
+        return list(iter_whatweb_json(json_file))
     except FileNotFoundError:
-        print(f"WhatWeb text file not found: {text_file}")
+        return []
+
+def parse_whatweb(text_file):
+    try:
+        for record in iter_whatweb_text(text_file):
+            return record
+    except FileNotFoundError:
+        logger.warning(f"WhatWeb text file not found: {text_file}")
         return {}
     except Exception as e:
-        print(f"Error parsing WhatWeb text file {text_file}: {e}")
+        logger.warning(f"Error parsing WhatWeb text file {text_file}: {e}")
         return {}
-
-    return data
+    return {}
@@ -0,0 +1,265 @@
+import os
+import sqlite3
+import statistics
+import time
+
+DEFAULT_METRICS_PATH = "cache/tool_metrics.db"
+# Runs per tool the rates are learned from (most recent first)
+HISTORY = 20
+# Hosts assumed for a domain never scanned before, when there is no history either
+DEFAULT_HOSTS = 25
+FULL_RANGE_PORTS = 65535
+
+# Work unit of each tool, which its cost grows with
+UNIT_NAMES = {
+    'nmap': "host-port",
+    'bruteforce': "known host",
+    'tls': "endpoint",
+    'web probing': "host",
+}
+# Seconds of wall time and CPU per work unit at concurrency 1, until history replaces them
+DEFAULT_RATES = {
+    'nmap': (0.02, 0.002),
+    'whatweb': (20.0, 2.0),
+    'dnsenum': (60.0, 5.0),
+    'theharvester': (120.0, 10.0),
+    'httpx': (5.0, 0.5),
+    'sublist3r': (90.0, 10.0),
+    'dnsdumpster': (3.0, 0.1),
+    'ct': (0.1, 0.05),
+    'bruteforce': (400.0, 2.0),
+    'tls': (2.0, 0.02),
+    'web probing': (1.5, 0.2),
+}
+# External API requests per domain (DNSDumpster lookup; theHarvester's crtsh, bing, duckduckgo and otx backends)
+API_CALLS = {'dnsdumpster': 1, 'theharvester': 4}
+# Tools whose run time divides by their concurrency setting
+CONCURRENT_TOOLS = ('bruteforce', 'tls')
+
+# Settings the planner may lower to fit a time budget, most thorough first
+PORT_CHOICES = (FULL_RANGE_PORTS, 1000, 100, 20)
+CONCURRENCY_CHOICES = (100, 200, 400)
+MAX_SHARDS = 32
+
+
+class ToolMetrics:
+    """Per-tool run history: wall time, CPU and work units of every finished tool run."""
+
+    def __init__(self, path=DEFAULT_METRICS_PATH):
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS tool_runs ("
+            " tool TEXT NOT NULL, domain TEXT NOT NULL, finished REAL NOT NULL, wall_seconds REAL NOT NULL,"
+            " cpu_seconds REAL NOT NULL, units INTEGER NOT NULL, concurrency INTEGER NOT NULL, ok INTEGER NOT NULL)"
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS tool_runs_tool ON tool_runs (tool, finished)")
+        self.conn.commit()
+
+    def close(self):
+        self.conn.commit()
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def record(self, tool, domain, wall_seconds, cpu_seconds, units=1, concurrency=1, ok=True):
+        self.conn.execute(
+            "INSERT INTO tool_runs (tool, domain, finished, wall_seconds, cpu_seconds, units, concurrency, ok)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (tool, domain, time.time(), wall_seconds, cpu_seconds, max(units, 1), max(concurrency, 1), int(ok))
+        )
+        self.conn.commit()
+
+    def rates(self, tool):
+        """Median (wall, CPU) seconds per unit at concurrency 1 over recent successful runs, or None."""
+        rows = self.conn.execute(
+            "SELECT wall_seconds, cpu_seconds, units, concurrency FROM tool_runs"
+            " WHERE tool = ? AND ok = 1 ORDER BY finished DESC LIMIT ?",
+            (tool, HISTORY)
+        ).fetchall()
+        if not rows:
+            return None
+        return (statistics.median(wall * concurrency / units for wall, _, units, concurrency in rows),
+                statistics.median(cpu / units for _, cpu, units, _ in rows))
+
+    def median_hosts(self):
+        rows = self.conn.execute(
+            "SELECT units FROM tool_runs WHERE tool = 'web probing' AND ok = 1 ORDER BY finished DESC LIMIT ?",
+            (HISTORY,)
+        ).fetchall()
+        return int(statistics.median(r[0] for r in rows)) if rows else None
+
+
+def work_units(tool, hosts=1, targets=1, ports=1000, tls_ports=1):
+    """Work units of one tool run: host-ports for Nmap, hosts or endpoints for host-wide tools, else 1."""
+    if tool == 'nmap':
+        return targets * ports
+    if tool in ('bruteforce', 'web probing'):
+        return hosts
+    if tool == 'tls':
+        return hosts * tls_ports
+    return 1
+
+
+class ToolEstimate:
+    __slots__ = ('tool', 'domain', 'units', 'wall_seconds', 'cpu_seconds', 'api_calls', 'from_history')
+
+    def __init__(self, tool, domain, units, wall_seconds, cpu_seconds, api_calls, from_history):
+        self.tool = tool
+        self.domain = domain
+        self.units = units
+        self.wall_seconds = wall_seconds
+        self.cpu_seconds = cpu_seconds
+        self.api_calls = api_calls
+        self.from_history = from_history
+
+
+class ScanPlan:
+    """Estimated cost of scanning the targets with the chosen tools and settings."""
+
+    def __init__(self, settings, estimates, hosts, stages):
+        self.settings = settings
+        self.estimates = estimates
+        self.hosts = hosts
+        self.stages = stages
+
+    @property
+    def ports_probed(self):
+        return sum(e.units for e in self.estimates if e.tool == 'nmap')
+
+    @property
+    def api_calls(self):
+        return sum(e.api_calls for e in self.estimates)
+
+    @property
+    def cpu_seconds(self):
+        return sum(e.cpu_seconds for e in self.estimates)
+
+    @property
+    def wall_seconds(self):
+        """Wall time: each domain's stages run one after another, tools within a stage side by side,
+        and domains are spread over settings['shards'] scanners."""
+        by_domain = {}
+        for e in self.estimates:
+            by_domain.setdefault(e.domain, []).append(e)
+        per_domain = []
+        for domain in self.hosts:
+            rows = by_domain.get(domain, ())
+            per_domain.append(sum(max((e.wall_seconds for e in rows if e.tool in stage), default=0.0)
+                                  for stage in self.stages))
+        shards = max(1, self.settings.get('shards', 1))
+        # Longest-first onto the least loaded shard
+        loads = [0.0] * min(shards, max(1, len(per_domain)))
+        for seconds in sorted(per_domain, reverse=True):
+            loads[loads.index(min(loads))] += seconds
+        return max(loads, default=0.0)
+
+
+def _known_host_count(domain):
+    from scanner import collect_known_hosts
+    hosts = collect_known_hosts(domain)
+    return len(hosts) if len(hosts) > 1 else None
+
+
+def _known_ip_count(domain):
+    from host_index import load_host_index
+    path = f"results/host_index_{domain}.json"
+    return len(load_host_index(path)) if os.path.exists(path) else None
+
+
+def scan_inputs(domains, tools, settings, metrics=None):
+    """(hosts, targets, rates) that estimate() needs: known hosts and Nmap targets per domain, learned rates per tool.
+
+    Host counts come from each domain's previous results when present, else
+    from the history's median, else DEFAULT_HOSTS.
+    """
+    fallback_hosts = (metrics.median_hosts() if metrics is not None else None) or DEFAULT_HOSTS
+    hosts, targets = {}, {}
+    for domain in domains:
+        hosts[domain] = _known_host_count(domain) or fallback_hosts
+        targets[domain] = (_known_ip_count(domain) or hosts[domain]) if settings.get('scan_subdomains') else 1
+    rates = {tool: metrics.rates(tool) if metrics is not None else None for tool in tools}
+    return hosts, targets, rates
+
+
+def estimate(domains, tools, settings, metrics=None, stages=None, inputs=None):
+    """ScanPlan for scanning domains with tools under settings.
+
+    inputs is scan_inputs()'s result, computed here when not given.
+    """
+    hosts, targets, rates = inputs or scan_inputs(domains, tools, settings, metrics)
+    stages = stages or [tuple(tools)]
+    ports = FULL_RANGE_PORTS if settings.get('full_range') else settings.get('top_ports', 1000)
+    tls_ports = len(settings.get('tls_ports') or ()) or 1
+    estimates = []
+    for domain in domains:
+        for tool in tools:
+            units = work_units(tool, hosts[domain], targets[domain], ports, tls_ports)
+            learned = rates[tool]
+            wall_rate, cpu_rate = learned or DEFAULT_RATES.get(tool, (60.0, 5.0))
+            concurrency = settings.get('concurrency', 1) if tool in CONCURRENT_TOOLS else 1
+            estimates.append(ToolEstimate(tool, domain, units, units * wall_rate / concurrency, units * cpu_rate,
+                                          API_CALLS.get(tool, 0), learned is not None))
+    return ScanPlan(dict(settings), estimates, {domain: hosts[domain] for domain in domains}, stages)
+
+
+def plan_scan(domains, tools, settings, metrics=None, stages=None, time_budget=None):
+    """Estimate the scan, raising concurrency, adding shards and lowering Nmap's port list to fit time_budget.
+
+    Returns (plan, fits). Without a budget the settings are kept as given.
+    """
+    # Host, target and rate lookups read result files and the history, so they are done once for every candidate
+    inputs = scan_inputs(domains, tools, settings, metrics)
+    plan = estimate(domains, tools, settings, metrics, stages, inputs)
+    if time_budget is None or plan.wall_seconds <= time_budget:
+        return plan, True
+    requested_ports = FULL_RANGE_PORTS if settings.get('full_range') else settings.get('top_ports', 1000)
+    port_choices = [p for p in PORT_CHOICES if p <= requested_ports] or [requested_ports]
+    max_shards = min(MAX_SHARDS, len(domains)) if settings.get('allow_shards') else 1
+    # Port coverage is given up last: first raise concurrency, then spread domains over more shards
+    for ports in port_choices:
+        for concurrency in CONCURRENCY_CHOICES:
+            for shards in range(1, max_shards + 1):
+                candidate = dict(settings, top_ports=ports, full_range=ports == FULL_RANGE_PORTS,
+                                 concurrency=max(concurrency, settings.get('concurrency', 1)), shards=shards)
+                plan = estimate(domains, tools, candidate, metrics, stages, inputs)
+                if plan.wall_seconds <= time_budget:
+                    return plan, True
+    return plan, False
+
+
+def _duration(seconds):
+    if seconds < 60:
+        return f"{seconds:.0f}s"
+    minutes, seconds = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}h{minutes:02d}m" if hours else f"{minutes}m{seconds:02d}s"
+
+
+def format_plan(plan, time_budget=None, fits=True):
+    settings = plan.settings
+    ports = "all 65535" if settings.get('full_range') else f"top {settings.get('top_ports', 1000)}"
+    lines = [
+        "--- Scan Plan ---",
+        f"Targets: {len(plan.hosts)} domain(s), ~{sum(plan.hosts.values())} host(s)",
+        f"Settings: Nmap {ports} ports, concurrency {settings.get('concurrency', 1)}, "
+        f"{settings.get('shards', 1)} shard(s)",
+        f"{'Tool':<14}{'Units':>12}  {'Wall':>8}  {'CPU':>8}  {'API':>5}  Source",
+    ]
+    for tool in dict.fromkeys(e.tool for e in plan.estimates):
+        rows = [e for e in plan.estimates if e.tool == tool]
+        unit = UNIT_NAMES.get(tool, "domain")
+        lines.append(f"{tool:<14}{sum(e.units for e in rows):>12}  {_duration(sum(e.wall_seconds for e in rows)):>8}  "
+                     f"{_duration(sum(e.cpu_seconds for e in rows)):>8}  {sum(e.api_calls for e in rows):>5}  "
+                     f"{'history' if rows[0].from_history else 'default'} ({unit})")
+    lines.append(f"Ports probed: {plan.ports_probed}, API calls: {plan.api_calls}, "
+                 f"CPU: {_duration(plan.cpu_seconds)}, wall time: ~{_duration(plan.wall_seconds)}")
+    if time_budget is not None:
+        lines.append(f"Time budget {_duration(time_budget)}: " + ("fits" if fits else "does not fit even with the "
+                                                                   "cheapest settings"))
+    return "\n".join(lines)
@@ -0,0 +1,286 @@
+import ipaddress
+import sys
+
+# Part of every parse cache key, since parsers build their results from these records;
+# bump it whenever a change here alters what a parser returns
+PARSER_VERSION = 1
+
+
+def pack_ip(text):
+    """Store an address as its packed bytes (4 or 16), falling back to the text for non-IPs."""
+    if not text:
+        return text
+    try:
+        return ipaddress.ip_address(text).packed
+    except ValueError:
+        return sys.intern(text)
+
+
+def unpack_ip(value):
+    if isinstance(value, bytes):
+        return str(ipaddress.ip_address(value))
+    return value
+
+
+def intern(value):
+    # Protocols, states, service and product names repeat across every host
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+def _plain(value):
+    if isinstance(value, Record):
+        return value.to_json()
+    if isinstance(value, (list, tuple)):
+        return [_plain(v) for v in value]
+    return value
+
+
+def to_json(obj):
+    """json.dump(s) default hook: serialize records to their legacy dict shape."""
+    if isinstance(obj, Record):
+        return obj.to_json()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+# Key naming the record class in to_tagged_json() output
+RECORD_TAG = "__record__"
+
+
+def to_tagged_json(obj):
+    """json.dump(s) default hook that keeps the record type, so from_tagged_json() can rebuild it."""
+    if isinstance(obj, Record):
+        return {RECORD_TAG: type(obj).__name__, **dict(obj.items())}
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def from_tagged_json(entry):
+    """json.load(s) object_hook: rebuild the records to_tagged_json() wrote."""
+    if RECORD_TAG not in entry:
+        return entry
+    fields = dict(entry)
+    name = fields.pop(RECORD_TAG)
+    if name not in RECORD_TYPES:
+        raise ValueError(f"unknown record type {name!r}")
+    return RECORD_TYPES[name](**fields)
+
+
+class Record:
+    """Slotted parser record with dict-style access to its JSON shape.
+
+    record['key'] and record.get('key') return the same values the old dict
+    parsers produced (e.g. string port ids, dotted IPs), while attributes keep
+    the compact typed values; record['key'] = value takes the JSON form and
+    stores it in the typed attribute.
+    """
+    __slots__ = ()
+    # JSON keys in output order
+    KEYS = ()
+    # JSON keys omitted when their value is None
+    OPTIONAL = ()
+
+    def _value(self, key):
+        return getattr(self, key)
+
+    def __getitem__(self, key):
+        if key not in self.KEYS:
+            raise KeyError(key)
+        value = self._value(key)
+        if value is None and key in self.OPTIONAL:
+            raise KeyError(key)
+        return value
+
+    def _set_value(self, key, value):
+        setattr(self, key, value)
+
+    def __setitem__(self, key, value):
+        if key not in self.KEYS:
+            raise KeyError(key)
+        self._set_value(key, value)
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def __contains__(self, key):
+        try:
+            self[key]
+        except KeyError:
+            return False
+        return True
+
+    def keys(self):
+        return [key for key in self.KEYS if key in self]
+
+    def items(self):
+        return [(key, self[key]) for key in self.keys()]
+
+    def to_json(self):
+        return {key: _plain(value) for key, value in self.items()}
+
+    def __eq__(self, other):
+        if isinstance(other, Record):
+            other = other.to_json()
+        return self.to_json() == other
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.to_json()!r})"
+
+
+class Port(Record):
+    __slots__ = ('port', 'protocol', 'state', 'service', 'product', 'version')
+    KEYS = ('portid', 'protocol', 'state', 'service', 'product', 'version')
+    OPTIONAL = ('product', 'version')
+
+    def __init__(self, portid, protocol, state, service='', product=None, version=None):
+        self.port = int(portid)
+        self.protocol = intern(protocol)
+        self.state = intern(state)
+        self.service = intern(service or '')
+        self.product = intern(product) or None
+        self.version = intern(version) or None
+
+    @classmethod
+    def from_dict(cls, entry):
+        return cls(entry['portid'], entry['protocol'], entry.get('state'), entry.get('service', ''),
+                   entry.get('product'), entry.get('version'))
+
+    def _value(self, key):
+        if key == 'portid':
+            return str(self.port)
+        return getattr(self, key)
+
+    def _set_value(self, key, value):
+        if key == 'portid':
+            self.port = int(value)
+        elif key in self.OPTIONAL:
+            setattr(self, key, intern(value) or None)
+        else:
+            setattr(self, key, intern(value))
+
+
+class Host(Record):
+    __slots__ = ('address', 'ports', 'hostnames')
+    KEYS = ('ip', 'ports', 'hostnames')
+    OPTIONAL = ('hostnames',)
+
+    def __init__(self, ip, ports=None, hostnames=None):
+        self.address = pack_ip(ip)
+        self.ports = ports if ports is not None else []
+        self.hostnames = hostnames
+
+    @property
+    def ip(self):
+        return unpack_ip(self.address)
+
+    def _set_value(self, key, value):
+        if key == 'ip':
+            self.address = pack_ip(value)
+        else:
+            setattr(self, key, value)
+
+
+class DnsRecord(Record):
+    __slots__ = ('host', 'addresses')
+    KEYS = ('host', 'ips')
+
+    def __init__(self, host, ips=()):
+        self.host = host
+        self.addresses = tuple(pack_ip(ip) for ip in ips)
+
+    def _value(self, key):
+        if key == 'ips':
+            return [unpack_ip(a) for a in self.addresses]
+        return getattr(self, key)
+
+    def _set_value(self, key, value):
+        if key == 'ips':
+            self.addresses = tuple(pack_ip(ip) for ip in value)
+        else:
+            setattr(self, key, value)
+
+
+def record_ips(record):
+    """Addresses of a DNS record, whether a DnsRecord or a source's dict.
+
+    DNSDumpster lists addresses as {"ip": ...} objects, other sources as strings.
+    """
+    for entry in record.get('ips') or []:
+        ip = entry.get('ip') if isinstance(entry, dict) else entry
+        if ip:
+            yield ip
+
+
+class Technology(Record):
+    """One detected technology, serialized as httpx's "Name:version" string."""
+    __slots__ = ('name', 'version')
+    KEYS = ('name', 'version')
+    OPTIONAL = ('version',)
+
+    def __init__(self, name, version=None):
+        self.name = intern(name)
+        self.version = intern(version) or None
+
+    @classmethod
+    def parse(cls, text):
+        name, sep, version = text.partition(':')
+        return cls(name, version) if sep else cls(text)
+
+    def to_json(self):
+        return f"{self.name}:{self.version}" if self.version else self.name
+
+    __str__ = to_json
+
+
+class HttpResponse(Record):
+    __slots__ = ('url', 'input', 'address', 'port', 'scheme', 'status_code', 'title',
+                 'webserver', 'tech', 'content_length', 'tls')
+    KEYS = ('url', 'input', 'ip', 'port', 'scheme', 'status_code', 'title',
+            'webserver', 'tech', 'content_length', 'tls')
+
+    def __init__(self, url='', input='', ip='', port=None, scheme='', status_code=None, title='',
+                 webserver='', tech=(), content_length=None, tls=None):
+        self.url = url
+        self.input = input
+        self.address = pack_ip(ip)
+        try:
+            self.port = int(port)
+        except (TypeError, ValueError):
+            self.port = None
+        self.scheme = intern(scheme)
+        self.status_code = status_code
+        self.title = title
+        self.webserver = intern(webserver)
+        self.tech = tuple(Technology.parse(t) if isinstance(t, str) else t for t in tech or ())
+        self.content_length = content_length
+        self.tls = tls
+
+    @property
+    def ip(self):
+        return unpack_ip(self.address)
+
+    def _value(self, key):
+        if key == 'port':
+            return str(self.port) if self.port is not None else ''
+        if key == 'tech':
+            return [str(t) for t in self.tech]
+        return getattr(self, key)
+
+    def _set_value(self, key, value):
+        if key == 'ip':
+            self.address = pack_ip(value)
+        elif key == 'port':
+            try:
+                self.port = int(value)
+            except (TypeError, ValueError):
+                self.port = None
+        elif key == 'tech':
+            self.tech = tuple(Technology.parse(t) if isinstance(t, str) else t for t in value or ())
+        else:
+            setattr(self, key, value)
+
+
+RECORD_TYPES = {cls.__name__: cls for cls in (Port, Host, DnsRecord, Technology, HttpResponse)}
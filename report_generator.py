@@ -1,4 +1,4 @@
-import json
+import zlib
 from reportlab.lib.pagesizes import letter
 from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, PageBreak
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
@@ -8,6 +8,10 @@ from reportlab.graphics.charts.piecharts import Pie
 from reportlab.graphics.shapes import Drawing
 from datetime import datetime
 from reportlab.lib.units import inch
+from result_archive import load_data_dictionary
+
+# A table cell cannot split across pages, so long port lists are spread over several rows
+PORTS_PER_ROW = 40
 
 
 def _create_detailed_table(data):
@@ -126,6 +130,28 @@ def format_web_technologies(web_tech_data):
     return formatted_details.strip()
 
 
+def format_live_host(host):
+    """Format one httpx live host record for the Live Hosts table"""
+    details = f"Status: {host.get('status_code') or 'Unknown'}\n"
+    if host.get('title'):
+        details += f"Title: {host['title']}\n"
+    if host.get('ip'):
+        details += f"IP Address: {host['ip']}\n"
+    if host.get('webserver'):
+        details += f"Server: {host['webserver']}\n"
+    if host.get('content_length') is not None:
+        details += f"Content Length: {host['content_length']} bytes\n"
+    tls = host.get('tls')
+    if tls:
+        details += f"TLS: {tls.get('version') or 'Unknown'}, issuer {tls.get('issuer') or 'Unknown'}"
+        if tls.get('not_after'):
+            details += f", expires {tls['not_after']}"
+        details += "\n"
+    for tech in host.get('tech', []):
+        details += f"• {tech}\n"
+    return details.strip()
+
+
 def get_category_data_counts(data_dictionary):
     """Extract actual data counts from the JSON structure"""
     counts = {}
@@ -147,6 +173,8 @@ def get_category_data_counts(data_dictionary):
     subdomains_hosts = data_dictionary.get("subdomains_hosts", {})
     if subdomains_hosts.get("sublist3r"):
         subdomains_count += len(subdomains_hosts["sublist3r"])
+    if subdomains_hosts.get("ct"):
+        subdomains_count += len(subdomains_hosts["ct"])
     if subdomains_hosts.get("theharvester", {}).get("discovered_hosts"):
         subdomains_count += len(subdomains_hosts["theharvester"]["discovered_hosts"])
     if subdomains_hosts.get("dnsdumpster", {}).get("a_records"):
@@ -156,11 +184,18 @@ def get_category_data_counts(data_dictionary):
     unique_subdomains = set()
     if subdomains_hosts.get("sublist3r"):
         unique_subdomains.update(subdomains_hosts["sublist3r"])
+    if subdomains_hosts.get("ct"):
+        unique_subdomains.update(subdomains_hosts["ct"])
+    for record in subdomains_hosts.get("tls", []):
+        unique_subdomains.update(record.get("in_scope", []))
     if subdomains_hosts.get("theharvester", {}).get("discovered_hosts"):
         unique_subdomains.update(subdomains_hosts["theharvester"]["discovered_hosts"])
     if subdomains_hosts.get("dnsdumpster", {}).get("a_records"):
         for record in subdomains_hosts["dnsdumpster"]["a_records"]:
             unique_subdomains.add(record.get("host", ""))
+    if subdomains_hosts.get("bruteforce"):
+        for record in subdomains_hosts["bruteforce"]:
+            unique_subdomains.add(record.get("host", ""))
     subdomains_count = len(unique_subdomains)
     
     # Emails
@@ -174,14 +209,18 @@ def get_category_data_counts(data_dictionary):
     # Web Technologies
     web_tech_count = 0
     web_tech = data_dictionary.get("web_technologies", {})
-    if web_tech.get("whatweb"):
+    if web_tech.get("whatweb") or web_tech.get("whatweb_hosts"):
         # Count meaningful web tech
-        tech_data = web_tech["whatweb"]
         meaningful_tech = ["HTTPServer", "HTML5", "LiteSpeed", "Title"]
-        web_tech_count = sum(1 for key in meaningful_tech if tech_data.get(key))
+        records = [web_tech.get("whatweb", {})] + web_tech.get("whatweb_hosts", [])
+        web_tech_count = sum(1 for key in meaningful_tech if any(r.get(key) for r in records))
     
     # Live Hosts 
-    live_hosts_count = 1 if data_dictionary.get("http_headers", {}).get("httpx") else 0
+    live_hosts = data_dictionary.get("live_hosts", {}).get("httpx")
+    if live_hosts:
+        live_hosts_count = len(live_hosts)
+    else:
+        live_hosts_count = 1 if data_dictionary.get("http_headers", {}).get("httpx") else 0
     
     if dns_count > 0:
         counts["DNS Records"] = dns_count
@@ -242,143 +281,7 @@ def get_category_summary(category_name, data_dictionary, data_count):
     
     return f"Found {data_count} items"
 
-def add_footer(canvas, doc):
-    """Add footer with page number and date"""
-    canvas.saveState()
-    canvas.setFont('Helvetica', 9)
-    canvas.drawString(inch, 0.75 * inch, f"Page {doc.page}")
-    canvas.drawString(doc.width - 2*inch, 0.75 * inch, datetime.now().strftime("%Y-%m-%d %H:%M"))
-    canvas.restoreState()
-
-def generate_report(domain, data_dictionary_path, output_path, author, scan_duration_str):
-    """Generate the PDF reconnaissance report"""
-    doc = SimpleDocTemplate(output_path, pagesize=letter, topMargin=inch, bottomMargin=inch)
-    styles = getSampleStyleSheet()
-    story = []
-
-    styles.add(ParagraphStyle(
-        name='ReportTitle', 
-        fontSize=24, 
-        leading=28, 
-        alignment=TA_CENTER,
-        fontName='Helvetica-Bold',
-        spaceAfter=20
-    ))
-    
-    styles.add(ParagraphStyle(
-        name='SectionTitle', 
-        fontSize=18, 
-        leading=22, 
-        spaceAfter=12,
-        fontName='Helvetica-Bold',
-        textColor=HexColor('#2C3E50')
-    ))
-    
-    styles.add(ParagraphStyle(
-        name='SubSectionTitle', 
-        fontSize=14, 
-        leading=18, 
-        spaceAfter=8,
-        fontName='Helvetica-Bold',
-        textColor=HexColor('#34495E')
-    ))
-
-    # Load data
-    try:
-        with open(data_dictionary_path, 'r') as f:
-            data_dictionary = json.load(f)
-    except (FileNotFoundError, json.JSONDecodeError) as e:
-        story.append(Paragraph(f"Error loading data: {str(e)}", styles['Normal']))
-        doc.build(story, onFirstPage=add_footer, onLaterPages=add_footer)
-        return
-
-    # Extract scan metadata
-    scan_metadata = data_dictionary.get("scan_metadata", {})
-    target_domain = scan_metadata.get("domain", domain)
-
-    # === FIRST PAGE: Header and Pie Chart ===
-    story.append(Paragraph(f"Reconnaissance Report", styles['ReportTitle']))
-    story.append(Paragraph(f"Target Domain: {target_domain}", styles['ReportTitle']))
-    story.append(Spacer(1, 0.3 * inch))
-    
-    story.append(Paragraph(f"<b>Prepared by:</b> {author}", styles['Normal']))
-    story.append(Paragraph(f"<b>Generated:</b> {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}", styles['Normal']))
-    story.append(Paragraph(f"<b>Scan Duration:</b> {scan_duration_str}", styles['Normal']))
-    story.append(Paragraph(f"<b>Total Sources:</b> {scan_metadata.get('total_sources', 'N/A')}", styles['Normal']))
-    story.append(Spacer(1, 0.5 * inch))
-
-    # Pie Chart
-    data_counts = get_category_data_counts(data_dictionary)
-    if data_counts:
-        drawing = Drawing(500, 300)
-        pie = Pie()
-        pie.x = 150
-        pie.y = 50
-        pie.height = 200
-        pie.width = 200
-        pie.data = list(data_counts.values())
-        pie.labels = [str(v) for v in data_counts.values()]
-        pie.slices.labelRadius = 0.7
-        pie.slices.fontName = 'Helvetica-Bold'
-        pie.slices.fontColor = white
-        
-        # Distinct colors for each slice
-        colors = [
-            HexColor('#007bff'),  # bloo
-            HexColor('#6c757d'),  # kelabu
-            HexColor('#20c997'),  # ijo cair
-            HexColor('#6f42c1'),  # anggur
-            HexColor('#e83e8c'),  # ping
-            HexColor('#964B00')   # cekelat
-        ]
-        
-        pie.slices.strokeWidth = 1
-        pie.slices.strokeColor = white
-        for i in range(len(pie.data)):
-            pie.slices[i].fillColor = colors[i % len(colors)]
-        
-        drawing.add(pie)
-        story.append(drawing)
-
-        # legend
-        legend_data = []
-        for i, (category, count) in enumerate(data_counts.items()):
-            color = colors[i % len(colors)]
-            legend_square = Paragraph(f'<font color="{color.hexval()}">■</font> {category}', styles['Normal'])
-            legend_data.append([legend_square])
-        
-        legend_table = Table(legend_data)
-        legend_table.setStyle(TableStyle([
-            ('ALIGN', (0,0), (-1,-1), 'LEFT'),
-            ('LEFTPADDING', (0,0), (-1,-1), 0),
-            ('RIGHTPADDING', (0,0), (-1,-1), 0),
-            ('TOPPADDING', (0,0), (-1,-1), 0),
-            ('BOTTOMPADDING', (0,0), (-1,-1), 0),
-        ]))
-        story.append(legend_table)
-
-    else:
-        story.append(Paragraph("No data available for visualization.", styles['Normal']))
-
-    story.append(PageBreak())
-
-    # === PAGE 2: Summary Table ===
-    story.append(Paragraph("Summary Table (Key Findings)", styles['SectionTitle']))
-    story.append(Spacer(1, 0.2 * inch))
-
-    # summary table
-    summary_data = [['Category', 'Key Findings', 'Count', 'Severity']]
-    
-    category_order = ["DNS Records", "Open Ports", "Subdomains & Hosts", "Emails", "Web Technologies", "Live Hosts"]
-    
-    for category in category_order:
-        data_count = data_counts.get(category, 0)
-        if data_count > 0:
-            severity = get_category_severity(category, data_count)
-            summary = get_category_summary(category, data_dictionary, data_count)
-            summary_data.append([category, summary, str(data_count), severity])
-
-    # Create table
+def _create_summary_table(summary_data):
     table = Table(summary_data, colWidths=[1.5*inch, 3*inch, 0.8*inch, 0.8*inch])
     
     # Basic table style
@@ -407,13 +310,34 @@ def generate_report(domain, data_dictionary_path, output_path, author, scan_dura
             table.setStyle(TableStyle([
                 ('BACKGROUND', (0, i), (-1, i), severity_colors[severity])
             ]))
+    return table
 
-    story.append(table)
-    story.append(PageBreak())
+def _summary_section(data_dictionary, data_counts, styles):
+    """Summary table of key findings per category"""
+    story = []
+    # === PAGE 2: Summary Table ===
+    story.append(Paragraph("Summary Table (Key Findings)", styles['SectionTitle']))
+    story.append(Spacer(1, 0.2 * inch))
 
-    # === DETAILED SECTIONS ===
-    story.append(Paragraph("Detailed Analysis", styles['SectionTitle']))
+    # summary table
+    summary_data = [['Category', 'Key Findings', 'Count', 'Severity']]
     
+    category_order = ["DNS Records", "Open Ports", "Subdomains & Hosts", "Emails", "Web Technologies", "Live Hosts"]
+    
+    for category in category_order:
+        data_count = data_counts.get(category, 0)
+        if data_count > 0:
+            severity = get_category_severity(category, data_count)
+            summary = get_category_summary(category, data_dictionary, data_count)
+            summary_data.append([category, summary, str(data_count), severity])
+
+    story.append(_create_summary_table(summary_data))
+    story.append(PageBreak())
+    return story
+
+def _network_dns_section(data_dictionary, styles):
+    """4.1 Network & DNS Information"""
+    story = []
     # 4.1 Network & DNS Information
     story.append(Paragraph("4.1 Network & DNS Information", styles['SubSectionTitle']))
     
@@ -433,19 +357,32 @@ def generate_report(domain, data_dictionary_path, output_path, author, scan_dura
             dns_details += "MX Records:\n" + "\n".join([f"• {mx.get('host', 'N/A')}" for mx in mx_records])
         detailed_network_dns_data.append(["DNS Records", dns_details.strip()])
     
-    # Open Ports
+    # Open Ports: one row per host (and per PORTS_PER_ROW ports), since a single
+    # cell holding every host of a scan-subdomains run would not fit on a page
     if network_dns.get("nmap"):
-        ports_details = ""
         for host_data in network_dns["nmap"]:
             ip = host_data.get("ip", "Unknown")
-            ports_details += f"Host: {ip}\n"
+            hostnames = host_data.get("hostnames", [])
+            if hostnames:
+                host_line = f"Host: {ip} ({len(hostnames)} name{'s' if len(hostnames) != 1 else ''})"
+            else:
+                host_line = f"Host: {ip}"
+            port_lines = []
             for port in host_data.get("ports", []):
                 port_id = port.get('portid', 'Unknown')
                 protocol = port.get('protocol', 'Unknown')
                 state = port.get('state', 'Unknown')
                 service = port.get('service', 'Unknown')
-                ports_details += f"• {port_id}/{protocol} - {service} ({state})\n"
-        detailed_network_dns_data.append(["Open Ports", ports_details.strip()])
+                product = " ".join(v for v in (port.get('product'), port.get('version')) if v)
+                if product:
+                    service = f"{service} [{product}]"
+                port_lines.append(f"• {port_id}/{protocol} - {service} ({state})")
+            for i in range(0, max(len(port_lines), 1), PORTS_PER_ROW):
+                chunk = port_lines[i:i + PORTS_PER_ROW]
+                header = host_line
+                if len(port_lines) > PORTS_PER_ROW:
+                    header += f" - ports {i + 1}-{i + len(chunk)} of {len(port_lines)}"
+                detailed_network_dns_data.append(["Open Ports", "\n".join([header] + chunk)])
     else:
         detailed_network_dns_data.append(["Open Ports", "No open ports detected."])
 
@@ -455,7 +392,11 @@ def generate_report(domain, data_dictionary_path, output_path, author, scan_dura
         story.append(Paragraph("No network & DNS information available.", styles['Normal']))
     
     story.append(Spacer(1, 0.2 * inch))
-    
+    return story
+
+def _subdomains_section(data_dictionary, styles):
+    """4.2 Subdomains & Hosts"""
+    story = []
     # 4.2 Subdomains & Hosts  
     story.append(Paragraph("4.2 Subdomains & Hosts", styles['SubSectionTitle']))
     
@@ -464,6 +405,12 @@ def generate_report(domain, data_dictionary_path, output_path, author, scan_dura
     
     if subdomains_hosts.get("sublist3r"):
         all_subdomains.update(subdomains_hosts["sublist3r"])
+
+    if subdomains_hosts.get("ct"):
+        all_subdomains.update(subdomains_hosts["ct"])
+
+    for record in subdomains_hosts.get("tls", []):
+        all_subdomains.update(record.get("in_scope", []))
     
     if subdomains_hosts.get("theharvester", {}).get("discovered_hosts"):
         all_subdomains.update(subdomains_hosts["theharvester"]["discovered_hosts"])
@@ -471,13 +418,17 @@ def generate_report(domain, data_dictionary_path, output_path, author, scan_dura
     if subdomains_hosts.get("dnsdumpster", {}).get("a_records"):
         for record in subdomains_hosts["dnsdumpster"]["a_records"]:
             all_subdomains.add(record.get("host", ""))
+
+    if subdomains_hosts.get("bruteforce"):
+        for record in subdomains_hosts["bruteforce"]:
+            all_subdomains.add(record.get("host", ""))
     
     if all_subdomains:
         subdomain_list = sorted(list(all_subdomains))
         total_count = len(subdomain_list)
         
         summary_details = f"Total subdomains found: {total_count}\n"
-        summary_details += f"Scan sources: sublist3r, theharvester, dnsdumpster\n"
+        summary_details += f"Scan sources: sublist3r, ct, theharvester, dnsdumpster, bruteforce, tls\n"
         summary_details += "All discovered subdomains are listed below:"
         
         summary_table_data = [["Subdomains Summary", summary_details]]
@@ -508,7 +459,11 @@ def generate_report(domain, data_dictionary_path, output_path, author, scan_dura
         detailed_subdomains_data = [["Subdomains", "No subdomains or hosts discovered."]]
         story.append(_create_detailed_table(detailed_subdomains_data))
     story.append(Spacer(1, 0.2 * inch))
-    
+    return story
+
+def _emails_section(data_dictionary, styles):
+    """4.3 Email Addresses"""
+    story = []
     # 4.3 Emails
     story.append(Paragraph("4.3 Email Addresses", styles['SubSectionTitle']))
     
@@ -530,28 +485,44 @@ def generate_report(domain, data_dictionary_path, output_path, author, scan_dura
     
     story.append(_create_detailed_table(detailed_emails_data))
     story.append(Spacer(1, 0.2 * inch))
-    
+    return story
+
+def _web_technologies_section(data_dictionary, styles):
+    """4.4 Web Technologies"""
+    story = []
     # 4.4 Web Technologies - FIXED FORMATTING
     story.append(Paragraph("4.4 Web Technologies", styles['SubSectionTitle']))
     
     web_tech = data_dictionary.get("web_technologies", {}).get("whatweb", {})
+    web_tech_hosts = data_dictionary.get("web_technologies", {}).get("whatweb_hosts", [])
     detailed_web_tech_data = []
     
     if web_tech:
         formatted_tech_details = format_web_technologies(web_tech)
         detailed_web_tech_data.append(["Web Technologies", formatted_tech_details])
-    else:
+    for host_tech in web_tech_hosts:
+        formatted_tech_details = format_web_technologies(host_tech)
+        detailed_web_tech_data.append(["Web Technologies", f"URL: {host_tech.get('url', 'Unknown')}\n{formatted_tech_details}"])
+    if not detailed_web_tech_data:
         detailed_web_tech_data.append(["Web Technologies", "No web technologies detected."])
     
     story.append(_create_detailed_table(detailed_web_tech_data))
     story.append(Spacer(1, 0.2 * inch))
-    
+    return story
+
+def _live_hosts_section(data_dictionary, target_domain, styles):
+    """4.5 Live Hosts Analysis"""
+    story = []
     # 4.5 Live Hosts
     story.append(Paragraph("4.5 Live Hosts Analysis", styles['SubSectionTitle']))
     
     http_headers = data_dictionary.get("http_headers", {})
+    live_hosts = data_dictionary.get("live_hosts", {}).get("httpx", [])
     detailed_live_hosts_data = []
-    if http_headers.get("httpx"):
+    if live_hosts:
+        for host in sorted(live_hosts, key=lambda h: h.get('url', '')):
+            detailed_live_hosts_data.append(["Live Host", f"{host.get('url', 'Unknown')}\n{format_live_host(host)}"])
+    elif http_headers.get("httpx"):
         live_hosts_details = ""
         live_hosts_details += f"Target responds to HTTP/HTTPS requests\n"
         live_hosts_details += f"• Domain: {target_domain}\n"
@@ -562,6 +533,171 @@ def generate_report(domain, data_dictionary_path, output_path, author, scan_dura
         detailed_live_hosts_data.append(["Live Hosts", "No live hosts detected."])
 
     story.append(_create_detailed_table(detailed_live_hosts_data))
+    return story
+
+SHARED_KIND_LABELS = {
+    "ip": "IP Addresses",
+    "ns": "Nameservers",
+    "mx": "Mail Servers",
+    "email": "Email Addresses",
+    "tech": "Technologies",
+    "cert": "TLS Certificates (SHA-256)",
+}
+
+def _shared_infrastructure_section(shared_infrastructure, styles):
+    """4.6 Shared Infrastructure"""
+    story = []
+    story.append(Paragraph("4.6 Shared Infrastructure", styles['SubSectionTitle']))
+
+    shared_data = []
+    for kind, label in SHARED_KIND_LABELS.items():
+        values = shared_infrastructure.get(kind)
+        if values:
+            details = "\n".join(f"• {value}: {', '.join(domains)}" for value, domains in sorted(values.items()))
+            shared_data.append([label, details])
+    if not shared_data:
+        shared_data.append(["Shared Infrastructure", "No infrastructure shared with other scanned domains."])
+
+    story.append(_create_detailed_table(shared_data))
+    story.append(Spacer(1, 0.2 * inch))
+    return story
+
+def add_footer(canvas, doc):
+    """Add footer with page number and date"""
+    canvas.saveState()
+    canvas.setFont('Helvetica', 9)
+    canvas.drawString(inch, 0.75 * inch, f"Page {doc.page}")
+    canvas.drawString(doc.width - 2*inch, 0.75 * inch, datetime.now().strftime("%Y-%m-%d %H:%M"))
+    canvas.restoreState()
+
+def generate_report(domain, data_dictionary_path, output_path, author, scan_duration_str,
+                    shared_infrastructure=None):
+    """Generate the PDF reconnaissance report
+
+    When shared_infrastructure ({kind: {value: [other domains]}}, from the
+    correlation index) is given, a Shared Infrastructure section is added.
+    """
+    doc = SimpleDocTemplate(output_path, pagesize=letter, topMargin=inch, bottomMargin=inch)
+    styles = getSampleStyleSheet()
+    story = []
+
+    styles.add(ParagraphStyle(
+        name='ReportTitle', 
+        fontSize=24, 
+        leading=28, 
+        alignment=TA_CENTER,
+        fontName='Helvetica-Bold',
+        spaceAfter=20
+    ))
+    
+    styles.add(ParagraphStyle(
+        name='SectionTitle', 
+        fontSize=18, 
+        leading=22, 
+        spaceAfter=12,
+        fontName='Helvetica-Bold',
+        textColor=HexColor('#2C3E50')
+    ))
+    
+    styles.add(ParagraphStyle(
+        name='SubSectionTitle', 
+        fontSize=14, 
+        leading=18, 
+        spaceAfter=8,
+        fontName='Helvetica-Bold',
+        textColor=HexColor('#34495E')
+    ))
+
+    # Load data
+    try:
+        data_dictionary = load_data_dictionary(data_dictionary_path)
+    except (OSError, ValueError, zlib.error) as e:
+        story.append(Paragraph(f"Error loading data: {str(e)}", styles['Normal']))
+        doc.build(story, onFirstPage=add_footer, onLaterPages=add_footer)
+        return
+
+    # Extract scan metadata
+    scan_metadata = data_dictionary.get("scan_metadata", {})
+    target_domain = scan_metadata.get("domain", domain)
+
+    # === FIRST PAGE: Header and Pie Chart ===
+    story.append(Paragraph(f"Reconnaissance Report", styles['ReportTitle']))
+    story.append(Paragraph(f"Target Domain: {target_domain}", styles['ReportTitle']))
+    story.append(Spacer(1, 0.3 * inch))
+    
+    story.append(Paragraph(f"<b>Prepared by:</b> {author}", styles['Normal']))
+    story.append(Paragraph(f"<b>Generated:</b> {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}", styles['Normal']))
+    story.append(Paragraph(f"<b>Scan Duration:</b> {scan_duration_str}", styles['Normal']))
+    story.append(Paragraph(f"<b>Total Sources:</b> {scan_metadata.get('total_sources', 'N/A')}", styles['Normal']))
+    story.append(Spacer(1, 0.5 * inch))
+
+    # Pie Chart
+    data_counts = get_category_data_counts(data_dictionary)
+    if data_counts:
+        drawing = Drawing(500, 300)
+        pie = Pie()
+        pie.x = 150
+        pie.y = 50
+        pie.height = 200
+        pie.width = 200
+        pie.data = list(data_counts.values())
+        pie.labels = [str(v) for v in data_counts.values()]
+        pie.slices.labelRadius = 0.7
+        pie.slices.fontName = 'Helvetica-Bold'
+        pie.slices.fontColor = white
+        
+        # Distinct colors for each slice
+        colors = [
+            HexColor('#007bff'),  # bloo
+            HexColor('#6c757d'),  # kelabu
+            HexColor('#20c997'),  # ijo cair
+            HexColor('#6f42c1'),  # anggur
+            HexColor('#e83e8c'),  # ping
+            HexColor('#964B00')   # cekelat
+        ]
+        
+        pie.slices.strokeWidth = 1
+        pie.slices.strokeColor = white
+        for i in range(len(pie.data)):
+            pie.slices[i].fillColor = colors[i % len(colors)]
+        
+        drawing.add(pie)
+        story.append(drawing)
+
+        # legend
+        legend_data = []
+        for i, (category, count) in enumerate(data_counts.items()):
+            color = colors[i % len(colors)]
+            legend_square = Paragraph(f'<font color="{color.hexval()}">■</font> {category}', styles['Normal'])
+            legend_data.append([legend_square])
+        
+        legend_table = Table(legend_data)
+        legend_table.setStyle(TableStyle([
+            ('ALIGN', (0,0), (-1,-1), 'LEFT'),
+            ('LEFTPADDING', (0,0), (-1,-1), 0),
+            ('RIGHTPADDING', (0,0), (-1,-1), 0),
+            ('TOPPADDING', (0,0), (-1,-1), 0),
+            ('BOTTOMPADDING', (0,0), (-1,-1), 0),
+        ]))
+        story.append(legend_table)
+
+    else:
+        story.append(Paragraph("No data available for visualization.", styles['Normal']))
+
+    story.append(PageBreak())
+
+    # Sections are rebuilt only when the data they show has changed
+    story.extend(_summary_section(data_dictionary, data_counts, styles))
+
+    # === DETAILED SECTIONS ===
+    story.append(Paragraph("Detailed Analysis", styles['SectionTitle']))
+    story.extend(_network_dns_section(data_dictionary, styles))
+    story.extend(_subdomains_section(data_dictionary, styles))
+    story.extend(_emails_section(data_dictionary, styles))
+    story.extend(_web_technologies_section(data_dictionary, styles))
+    story.extend(_live_hosts_section(data_dictionary, target_domain, styles))
+    if shared_infrastructure is not None:
+        story.extend(_shared_infrastructure_section(shared_infrastructure, styles))
 
     doc.build(story, onFirstPage=add_footer, onLaterPages=add_footer)
     print(f"Report generated successfully: {output_path}")
@@ -569,7 +705,7 @@ def generate_report(domain, data_dictionary_path, output_path, author, scan_dura
 if __name__ == '__main__':
     # Example jgn kacau ni utk dev purpouse
     domain = ""
-    data_path = f"data_dictionary_{domain}.json"
+    data_path = f"scan_{domain}.arc"
     output_path = f"reconnaissance_report_{domain}.pdf"
     author_example = "Test User"
     scan_duration_example = "00:05:30"
@@ -0,0 +1,139 @@
+import json
+import os
+import struct
+import zlib
+
+from records import to_json
+
+try:
+    import zstandard
+except ImportError:  # zstd is optional; archives fall back to zlib
+    zstandard = None
+
+MAGIC = b"ARCv1\n"
+# Footer: index offset, index length, magic
+FOOTER = struct.Struct(">QI6s")
+RESULTS_PREFIX = "results/"
+
+
+def _compress(codec, data):
+    if codec == "zstd":
+        return zstandard.ZstdCompressor(level=9).compress(data)
+    return zlib.compress(data, 9)
+
+
+def _decompress(codec, data):
+    if codec == "zstd":
+        if zstandard is None:
+            raise ValueError("archive section is zstd-compressed but zstandard is not installed")
+        return zstandard.ZstdDecompressor().decompress(data)
+    return zlib.decompress(data)
+
+
+def is_archive(path):
+    try:
+        with open(path, 'rb') as f:
+            return f.read(len(MAGIC)) == MAGIC
+    except OSError:
+        return False
+
+
+def write_archive(path, sections, codec=None):
+    """Write sections ({name: JSON-serializable}) as independently compressed frames.
+
+    Each section is compact JSON compressed on its own, followed by an index of
+    section offsets, so any one section can be read without touching the rest.
+    """
+    codec = codec or ("zstd" if zstandard is not None else "zlib")
+    index = {"codec": codec, "sections": {}}
+    tmp_path = path + ".tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(MAGIC)
+        for name, value in sections.items():
+            raw = json.dumps(value, separators=(',', ':'), default=to_json).encode('utf-8')
+            frame = _compress(codec, raw)
+            index["sections"][name] = [f.tell(), len(frame), len(raw)]
+            f.write(frame)
+        index_offset = f.tell()
+        index_bytes = json.dumps(index, separators=(',', ':')).encode('utf-8')
+        f.write(index_bytes)
+        f.write(FOOTER.pack(index_offset, len(index_bytes), MAGIC))
+    os.replace(tmp_path, path)
+    return path
+
+
+def read_index(path):
+    with open(path, 'rb') as f:
+        f.seek(-FOOTER.size, os.SEEK_END)
+        index_offset, index_length, magic = FOOTER.unpack(f.read(FOOTER.size))
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a result archive")
+        f.seek(index_offset)
+        return json.loads(f.read(index_length))
+
+
+def load_sections(path, names=None):
+    """Load the named sections (all if names is None), decompressing only those."""
+    index = read_index(path)
+    wanted = index["sections"] if names is None else [n for n in names if n in index["sections"]]
+    loaded = {}
+    with open(path, 'rb') as f:
+        for name in wanted:
+            offset, length, _ = index["sections"][name]
+            f.seek(offset)
+            loaded[name] = json.loads(_decompress(index["codec"], f.read(length)))
+    return loaded
+
+
+def load_section(path, name, default=None):
+    return load_sections(path, [name]).get(name, default)
+
+
+def save_scan_archive(path, aggregated_results, categorized_data, codec=None):
+    """Store one scan: every data dictionary category plus each tool's parsed results."""
+    sections = dict(categorized_data)
+    for tool, value in aggregated_results.items():
+        sections[RESULTS_PREFIX + tool] = value
+    return write_archive(path, sections, codec)
+
+
+def load_data_dictionary(path, categories=None):
+    """Load the categorized data dictionary from an archive or a legacy JSON file."""
+    if not is_archive(path):
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        return data if categories is None else {k: v for k, v in data.items() if k in categories}
+    if categories is None:
+        categories = [n for n in read_index(path)["sections"] if not n.startswith(RESULTS_PREFIX)]
+    return load_sections(path, categories)
+
+
+def load_aggregated_results(path, tools=None):
+    """Load per-tool parsed results from an archive or a legacy results JSON file."""
+    if not is_archive(path):
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        return data if tools is None else {k: v for k, v in data.items() if k in tools}
+    names = [n for n in read_index(path)["sections"] if n.startswith(RESULTS_PREFIX)]
+    if tools is not None:
+        names = [n for n in names if n[len(RESULTS_PREFIX):] in tools]
+    return {name[len(RESULTS_PREFIX):]: value for name, value in load_sections(path, names).items()}
+
+
+def export_json(path, output_path, categories=None, indent=2):
+    """Opt-in pretty JSON export of an archive's data dictionary."""
+    with open(output_path, 'w', encoding='utf-8') as f:
+        json.dump(load_data_dictionary(path, categories), f, indent=indent)
+    return output_path
+
+
+if __name__ == "__main__":
+    import sys
+    if len(sys.argv) < 2:
+        print("Usage: python3 result_archive.py <archive> [category ...]")
+    else:
+        archive = sys.argv[1]
+        categories = sys.argv[2:] or None
+        for name, (offset, length, raw_size) in read_index(archive)["sections"].items():
+            print(f"{name}: {length} bytes compressed, {raw_size} bytes raw", file=sys.stderr)
+        print(json.dumps(load_data_dictionary(archive, categories), indent=2))
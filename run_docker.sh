@@ -17,6 +17,7 @@ fi
 # Run the autorecon container in interactive mode
 echo "Running autorecon container..."
 docker run -it --rm \
+  -e DNSDUMPSTER_API_KEY \
   -v "$(pwd)/reports:/app/reports" \
   -v "$(pwd)/results:/app/results" \
   -v "$(pwd)/logs:/app/logs" \
@@ -4,13 +4,37 @@ import sys
 import datetime
 import time
 import glob
+import json
+import argparse
+import logging
+import resource
+from functools import partial
 from scanners.nmap_scanner import nmap_scan
-from scanners.whatweb_scanner import whatweb_scan
+from scanners.whatweb_scanner import whatweb_scan, whatweb_bulk_scan
 from scanners.dnsenum_scanner import dnsenum_scan
 from scanners.theharvester_scanner import theharvester_scan
-from scanners.httpx_scanner import httpx_scan
+from scanners.httpx_scanner import httpx_scan, httpx_bulk_scan
 from scanners.sublist3r_scanner import sublist3r_scan
 from scanners.dnsdumpster_scanner import dnsdumpster_scan
+from scanners.bruteforce_scanner import bruteforce_scan, DEFAULT_CONCURRENCY
+from scanners.ct_scanner import ct_scan
+from tls_harvester import tls_scan, DEFAULT_CONCURRENCY as TLS_CONCURRENCY
+from event_bus import EventBus, TOOL_FINISHED, RESULTS_UPDATED
+from records import to_json
+from tool_log import LogService, ToolLog
+from parse_cache import ParseCache, parse_jobs, DEFAULT_CACHE_PATH as DEFAULT_PARSE_CACHE
+from correlation_index import CorrelationIndex, DEFAULT_INDEX_PATH as DEFAULT_CORRELATION_INDEX
+from ct_index import DEFAULT_INDEX_PATH as DEFAULT_CT_INDEX
+from tool_replay import ToolRecorder, ToolReplayer
+from planner import ToolMetrics, plan_scan, format_plan, work_units, DEFAULT_METRICS_PATH, FULL_RANGE_PORTS
+
+logger = logging.getLogger("autorecon")
+
+# Every tool in the order the scan runs them, by the name its results are stored under
+TOOL_NAMES = ('nmap', 'whatweb', 'dnsenum', 'theharvester', 'httpx', 'sublist3r', 'dnsdumpster', 'ct',
+              'bruteforce', 'tls', 'web probing')
+# Tools that run after passive discovery, each in a stage of its own
+HOST_TOOLS = ('bruteforce', 'tls', 'web probing')
 
 def print_ascii_art():
     try:
@@ -28,31 +52,250 @@ def get_user_input():
         else:
             print("Invalid domain name. Please enter a valid domain.")
 
-def run_scan(scan_func, domain, results_dict, tool_name, log_handle):
-    results_dict[tool_name] = scan_func(domain, log_handle)
+def build_arg_parser(**kwargs):
+    parser = argparse.ArgumentParser(description="Automated reconnaissance suite", **kwargs)
+    parser.add_argument("--nmap-two-phase", action="store_true",
+                        help="fast open-port discovery, then -sV only on the open ports of each host")
+    parser.add_argument("--nmap-top-ports", type=int, default=1000,
+                        help="number of top ports probed by the two-phase discovery pass (default: 1000)")
+    parser.add_argument("--nmap-full-range", action="store_true",
+                        help="probe all 65535 ports in the two-phase discovery pass")
+    parser.add_argument("--service-cache", default="cache/service_cache.db",
+                        help="service fingerprint cache used by the two-phase mode (default: cache/service_cache.db)")
+    parser.add_argument("--service-cache-ttl", type=float, default=24,
+                        help="hours before a cached service fingerprint is re-detected (default: 24)")
+    parser.add_argument("--no-service-cache", action="store_true",
+                        help="run version detection on every open port in the two-phase mode")
+    parser.add_argument("--fingerprint-engine", choices=["whatweb", "builtin"], default="whatweb",
+                        help="fingerprint live URLs with one WhatWeb process or the in-process signature engine")
+    parser.add_argument("--export-json", action="store_true",
+                        help="also write pretty-printed results_<domain>.json and data_dictionary_<domain>.json")
+    parser.add_argument("--scan-subdomains", action="store_true",
+                        help="port-scan every discovered subdomain, collapsed to unique IPs, after discovery")
+    parser.add_argument("--tls-ports", type=port_list, default="443",
+                        help="comma-separated ports whose certificates are harvested for new host names (default: 443)")
+    parser.add_argument("--no-tls-harvest", action="store_true",
+                        help="skip collecting TLS certificates and their subject alternative names")
+    parser.add_argument("--parse-cache", default=DEFAULT_PARSE_CACHE,
+                        help=f"cache of parser outputs keyed by input content hash (default: {DEFAULT_PARSE_CACHE})")
+    parser.add_argument("--no-parse-cache", action="store_true",
+                        help="always re-parse every tool output")
+    parser.add_argument("--partial-report", action="store_true",
+                        help="refresh reports/report_<domain>.partial.pdf each time a tool's results are merged")
+    parser.add_argument("--ct-index", default=DEFAULT_CT_INDEX,
+                        help="local certificate-transparency name index used as a subdomain source when present "
+                             f"(default: {DEFAULT_CT_INDEX})")
+    parser.add_argument("--correlation-index", default=DEFAULT_CORRELATION_INDEX,
+                        help="index of infrastructure shared between scanned domains, updated after every scan "
+                             f"(default: {DEFAULT_CORRELATION_INDEX})")
+    parser.add_argument("--no-correlation-index", action="store_true",
+                        help="do not add this scan to the correlation index")
+    parser.add_argument("--shared-infrastructure", action="store_true",
+                        help="add a Shared Infrastructure section listing what the target shares with other scanned domains")
+    replay = parser.add_mutually_exclusive_group()
+    replay.add_argument("--record", metavar="DIR",
+                        help="record every tool's commands, output, result files, exit codes and timing into a "
+                             "replay bundle")
+    replay.add_argument("--replay", metavar="DIR",
+                        help="serve the tools' runs from a recorded bundle instead of running them (offline)")
+    parser.add_argument("--replay-speed", type=float, default=1.0,
+                        help="replay timing factor: 1 keeps the recorded pace, 10 is ten times faster, "
+                             "0 does not wait (default: 1)")
+    parser.add_argument("--export-assets", metavar="PATH",
+                        help="append one normalized record per asset (host, IP, service, email, header, technology) "
+                             "to PATH as JSON Lines, or CSV for a .csv path")
+    parser.add_argument("--tools", type=tool_list,
+                        help=f"comma-separated tools to run (default: all of {', '.join(TOOL_NAMES)})")
+    parser.add_argument("--concurrency", type=int,
+                        help=f"DNS lookups and TLS handshakes in flight during brute force and certificate harvest "
+                             f"(default: {DEFAULT_CONCURRENCY} and {TLS_CONCURRENCY})")
+    parser.add_argument("--dry-run", action="store_true",
+                        help="print the estimated hosts, ports, API calls, wall time and CPU of the scan, then exit")
+    parser.add_argument("--time-budget", type=float, metavar="MINUTES",
+                        help="choose the Nmap port list and concurrency so the estimated wall time fits this budget")
+    parser.add_argument("--metrics", default=DEFAULT_METRICS_PATH,
+                        help=f"per-tool run history the estimates are learned from (default: {DEFAULT_METRICS_PATH})")
+    parser.add_argument("--no-metrics", action="store_true",
+                        help="do not record this scan's tool run times")
+    return parser
+
+def tool_list(value):
+    tools = [tool.strip().lower() for tool in value.split(',') if tool.strip()]
+    unknown = [tool for tool in tools if tool not in TOOL_NAMES]
+    if unknown:
+        raise argparse.ArgumentTypeError(f"unknown tool(s): {', '.join(unknown)}")
+    return tools
+
+def port_list(value):
+    try:
+        ports = [int(port) for port in value.split(',') if port.strip()]
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected comma-separated port numbers, got {value!r}") from None
+    if not ports or not all(0 < port < 65536 for port in ports):
+        raise argparse.ArgumentTypeError(f"expected port numbers from 1 to 65535, got {value!r}")
+    return ports
+
+def parse_args(argv=None):
+    return build_arg_parser().parse_args(argv)
+
+def nmap_options(args):
+    """Keyword arguments for nmap_scan from the command-line options."""
+    return dict(two_phase=args.nmap_two_phase, top_ports=args.nmap_top_ports, full_range=args.nmap_full_range,
+                service_cache_path=None if args.no_service_cache else args.service_cache,
+                service_cache_ttl=args.service_cache_ttl * 3600)
+
+def tls_ports(args):
+    return list(args.tls_ports)
+
+def selected_tools(args):
+    """Tools this scan runs: --tools, minus CT without an index and TLS with --no-tls-harvest."""
+    return [tool for tool in TOOL_NAMES if tool in (args.tools or TOOL_NAMES)
+            and (tool != 'ct' or os.path.exists(args.ct_index))
+            and (tool != 'tls' or not args.no_tls_harvest)]
+
+def scan_stages(tools, scan_subdomains=False):
+    """Tools grouped into the stages that run one after another; tools within a stage run side by side."""
+    late_nmap = ('nmap',) if scan_subdomains else ()
+    stages = [tuple(t for t in tools if t not in HOST_TOOLS + late_nmap),
+              ('bruteforce',), ('tls',), ('web probing',) + late_nmap]
+    return [stage for stage in stages if set(stage) & set(tools)]
+
+def plan_settings(args):
+    """Planner settings for the command-line options."""
+    return {
+        # Without the two-phase mode Nmap probes its default top 1000 ports
+        'top_ports': args.nmap_top_ports if args.nmap_two_phase else 1000,
+        'full_range': args.nmap_two_phase and args.nmap_full_range,
+        'tls_ports': tls_ports(args),
+        'scan_subdomains': args.scan_subdomains,
+        'concurrency': args.concurrency or DEFAULT_CONCURRENCY,
+        'shards': 1,
+    }
+
+def plan_from_args(domains, args, allow_shards=False):
+    """(plan, fits, budget in seconds) for scanning domains with the selected tools and settings."""
+    tools = selected_tools(args)
+    budget = args.time_budget * 60 if args.time_budget else None
+    with ToolMetrics(args.metrics) as metrics:
+        plan, fits = plan_scan(domains, tools, dict(plan_settings(args), allow_shards=allow_shards), metrics,
+                               scan_stages(tools, args.scan_subdomains), budget)
+    return plan, fits, budget
+
+def apply_plan(args, plan):
+    """Adopt the port list and concurrency the planner chose to fit the time budget."""
+    requested = plan_settings(args)
+    chosen = plan.settings
+    if (chosen['top_ports'], chosen['full_range']) != (requested['top_ports'], requested['full_range']):
+        # Only the two-phase mode takes a port list
+        args.nmap_two_phase = True
+        args.nmap_top_ports = chosen['top_ports']
+        args.nmap_full_range = chosen['full_range']
+    if chosen['concurrency'] != requested['concurrency']:
+        args.concurrency = chosen['concurrency']
+
+def _cpu_seconds():
+    # This thread's CPU plus that of every finished child process (the external tools)
+    children = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return time.thread_time() + children.ru_utime + children.ru_stime
+
+def run_scan(scan_func, domain, results_dict, tool_name, run_id, bus=None, units=1, concurrency=1):
+    """Run one tool and publish its output with its wall time, CPU time and work units.
+
+    CPU time counts child processes once they exit; tools running side by
+    side are charged each other's finished children, so it is an upper bound.
+    """
+    started, cpu_started = time.monotonic(), _cpu_seconds()
+    # Each tool gets its own log stream, so concurrent tools never interleave
+    with ToolLog(run_id, tool_name) as log_handle:
+        try:
+            results_dict[tool_name] = scan_func(domain, log_handle)
+        except Exception:
+            logger.exception("%s scan raised an error", tool_name, extra={"run_id": run_id, "tool": tool_name})
+            results_dict[tool_name] = None
+    if results_dict[tool_name] is None:
+        report_failure(tool_name, log_handle)
+    if bus is not None:
+        bus.publish(TOOL_FINISHED, tool=tool_name, domain=domain, output=results_dict[tool_name],
+                    wall_seconds=time.monotonic() - started, cpu_seconds=_cpu_seconds() - cpu_started,
+                    units=units, concurrency=concurrency)
+
+def record_metrics(metrics, tool, domain, output, wall_seconds=None, cpu_seconds=None, units=1, concurrency=1):
+    """TOOL_FINISHED subscriber that adds each timed tool run to the planner's history."""
+    if wall_seconds is not None:
+        metrics.record(tool, domain, wall_seconds, cpu_seconds, units, concurrency, output is not None)
 
-def main():
+def report_failure(tool_name, log_handle, lines=10):
+    """Show the end of a tool's output when it produced no results."""
+    tail = list(log_handle.tail)[-lines:]
+    if tail:
+        print(f"[!] {tool_name} produced no results. Last output:\n    " + "\n    ".join(tail))
+
+def run_stage(scans, domain, results, run_id, bus=None, units=None):
+    threads = []
+    for name, scan_func in scans.items():
+        print(f"[+] Starting {name} scan...")
+        thread = threading.Thread(target=run_scan, args=(scan_func, domain, results, name.lower(), run_id, bus,
+                                                         (units or {}).get(name.lower(), 1)))
+        threads.append((name, thread))
+        thread.start()
+
+    for name, thread in threads:
+        thread.join()
+        print(f"[+] {name} scan finished.")
+
+def web_probe_scan(domain, log_handle, hosts, engine="whatweb"):
+    """Probe all hosts with one httpx process, then fingerprint the live URLs.
+
+    Fingerprinting uses either one WhatWeb process or the in-process signature
+    engine; the other engine's stale output is removed so aggregation only
+    sees this run's results.
+    """
+    from parsers.httpx_parser import parse_httpx_jsonl
+
+    httpx_output = httpx_bulk_scan(domain, log_handle, hosts)
+    urls = [r['url'] for r in parse_httpx_jsonl(httpx_output)] if httpx_output else []
+    if not urls:
+        urls = [f"https://{host}" for host in hosts]
+
+    stale = f"results/whatweb_{domain}.json" if engine == "builtin" else f"results/fingerprint_{domain}.jsonl"
+    if os.path.exists(stale):
+        os.remove(stale)
+    if engine == "builtin":
+        from web_fingerprint import fingerprint_scan
+        return fingerprint_scan(domain, log_handle, urls)
+    return whatweb_bulk_scan(domain, log_handle, urls)
+
+def main(argv=None):
+    args = parse_args(argv)
     print_ascii_art()
     domain, author = get_user_input()
-    log_file = f"log/scan_log_{domain}.log"
-
-    original_stdout = sys.stdout
-    original_stderr = sys.stderr
-    log_file_handle = None
+    if args.dry_run or args.time_budget:
+        plan, fits, budget = plan_from_args([domain], args)
+        print(format_plan(plan, budget, fits))
+        if args.dry_run:
+            return
+        apply_plan(args, plan)
+    runner = None
+    if args.record:
+        runner = ToolRecorder(args.record)
+    elif args.replay:
+        runner = ToolReplayer(args.replay, args.replay_speed)
+    # Replays run whatever was recorded, whether or not the tools exist here
+    tools = [t for t in TOOL_NAMES if runner.has(domain, t)] if args.replay else selected_tools(args)
+    wrap = runner.wrap if runner is not None else lambda tool, scan_func: scan_func
+    run_id = f"{domain}-{datetime.datetime.now().strftime('%Y%m%d-%H%M%S')}"
+    log_service = LogService(default_run_id=run_id).start()
 
     try:
-        os.makedirs('log', exist_ok=True)
-        log_file_handle = open(log_file, 'a')
-        #stdout and stderr to log 
-        sys.stdout = log_file_handle
-        sys.stderr = log_file_handle
-
-        print(f"\n--- Scan started at {datetime.datetime.now()} by {author} ---", file=original_stdout)
+        print(f"\n--- Scan started at {datetime.datetime.now()} by {author} ---")
+        print(f"Tool logs: log/{run_id}/")
+        logger.info("Scan of %s started by %s", domain, author, extra={"run_id": run_id})
 
         start_time = time.time()
 
+        nmap_func = partial(nmap_scan, **nmap_options(args))
         scans = {
-            "Nmap": nmap_scan,
+            "Nmap": nmap_func,
             "WhatWeb": whatweb_scan,
             "DNSEnum": dnsenum_scan,
             "theHarvester": theharvester_scan,
@@ -60,91 +303,308 @@ def main():
             "Sublist3r": sublist3r_scan,
             "DNSDumpster": dnsdumpster_scan
         }
+        scans["CT"] = partial(ct_scan, index_path=args.ct_index)
+        # Nmap waits for discovery with --scan-subdomains so it can scan every host's address once
+        scans = {name: wrap(name.lower(), func) for name, func in scans.items() if name.lower() in tools
+                 and not (name == "Nmap" and args.scan_subdomains)}
+        settings = plan_settings(args)
+        nmap_ports = FULL_RANGE_PORTS if settings['full_range'] else settings['top_ports']
+        concurrency = {'concurrency': args.concurrency} if args.concurrency else {}
+
+        # Each finished tool is parsed and merged right away; the progress line,
+        # data dictionary writer and optional partial report follow the merges
+        reports_dir = "reports"
+        os.makedirs(reports_dir, exist_ok=True)
+        bus = EventBus()
+        aggregator = ProgressiveAggregator(domain, bus, None if args.no_parse_cache else args.parse_cache)
+        bus.subscribe(RESULTS_UPDATED, partial(print_progress, sys.stdout))
+        bus.subscribe(RESULTS_UPDATED, partial(write_partial_data_dictionary, domain, reports_dir, args.export_json))
+        if args.partial_report:
+            bus.subscribe(RESULTS_UPDATED, partial(write_partial_report, domain, reports_dir, author))
+        # Replayed timings say nothing about the tools, so they stay out of the planner's history
+        metrics = None if args.no_metrics or args.replay else ToolMetrics(args.metrics)
+        if metrics is not None:
+            bus.subscribe(TOOL_FINISHED, partial(record_metrics, metrics))
+        bus.start()
 
-        threads = []
         results = {}
         print("\n--- Starting Scans ---")
-        for name, scan_func in scans.items():
-            print(f"[+] Starting {name} scan...", file=original_stdout)
-            thread = threading.Thread(target=run_scan, args=(scan_func, domain, results, name.lower(), log_file_handle))
-            threads.append((name, thread))
-            thread.start()
+        run_stage(scans, domain, results, run_id, bus, {'nmap': work_units('nmap', ports=nmap_ports)})
+
+        if 'bruteforce' in tools:
+            # Active discovery builds on the hosts the passive sources found
+            print("[+] Starting subdomain brute-force...")
+            known_hosts = collect_known_hosts(domain)
+            run_scan(wrap('bruteforce', partial(bruteforce_scan, known_hosts=known_hosts, **concurrency)), domain,
+                     results, 'bruteforce', run_id, bus, len(known_hosts), args.concurrency or DEFAULT_CONCURRENCY)
+            print("[+] Subdomain brute-force finished.")
+
+        if 'tls' in tools:
+            # Certificate SANs often name sibling hosts; in-scope ones join the host set
+            print("[+] Starting TLS certificate harvest...")
+            known_hosts = collect_known_hosts(domain)
+            run_scan(wrap('tls', partial(tls_scan, hosts=known_hosts, ports=tls_ports(args), **concurrency)), domain,
+                     results, 'tls', run_id, bus, len(known_hosts) * len(tls_ports(args)), args.concurrency or TLS_CONCURRENCY)
+            print("[+] TLS certificate harvest finished.")
 
-        for name, thread in threads:
-            thread.join()
-            print(f"[+] {name} scan finished.", file=original_stdout)
+        run_scan(wrap('host index', lambda target, _log: build_scan_host_index(target)), domain, results,
+                 'host index', run_id, bus, len(collect_known_hosts(domain)))
+        host_index = results['host index'] or {}
+        print(f"[+] {sum(len(v) for v in host_index.values())} host name(s) resolve to {len(host_index)} unique IP(s).")
+
+        # Second stage: tools that work on the full discovered host set
+        known_hosts = collect_known_hosts(domain)
+        host_scans = {}
+        if 'web probing' in tools:
+            host_scans["Web probing"] = wrap('web probing', partial(web_probe_scan, hosts=known_hosts,
+                                                                    engine=args.fingerprint_engine))
+        if args.scan_subdomains and 'nmap' in tools:
+            host_scans["Nmap"] = wrap('nmap', partial(nmap_func, targets=list(host_index) or None))
+        run_stage(host_scans, domain, results, run_id, bus,
+                  {'web probing': len(known_hosts), 'nmap': work_units('nmap', targets=len(host_index) or 1,
+                                                                      ports=nmap_ports)})
+        # Deliver the remaining merges and metrics before the final aggregation
+        bus.close()
+        if metrics is not None:
+            metrics.close()
 
         end_time = time.time()
         duration = end_time - start_time
         minutes = int(duration // 60)
         seconds = int(duration % 60)
         scan_duration = f"{minutes} minute(s) {seconds} second(s)"
-        print(f"\nAll scans completed in {duration:.2f} seconds.", file=original_stdout)
-
-        # Restore stdout and stderr
-        sys.stdout = original_stdout
-        sys.stderr = original_stderr
-        log_file_handle.close()
+        print(f"\nAll scans completed in {duration:.2f} seconds.")
+        logger.info("All scans completed in %.2f seconds", duration, extra={"run_id": run_id})
 
-        #print toterminal
         print("\n--- Aggregating Results ---")
-        aggregated_results = aggregate_results(domain)
+        aggregated_results = aggregator.complete()
 
-        reports_dir = "reports"
-        os.makedirs(reports_dir, exist_ok=True)
+        write_final_outputs(domain, aggregated_results, reports_dir, author, scan_duration, args.export_json,
+                            None if args.no_correlation_index else args.correlation_index,
+                            args.shared_infrastructure, run_id, args.export_assets)
+        cleanup_ips_files()
+
+    except Exception as e:
+        logger.exception("Scan failed", extra={"run_id": run_id})
+        print(f"An error occurred: {e}")
+    finally:
+        if runner is not None:
+            runner.close()
+        log_service.stop()
+
+def write_final_outputs(domain, aggregated_results, reports_dir, author, scan_duration, export_json=False,
+                        correlation_index=None, shared_infrastructure=False, scan_id=None, asset_export=None):
+    """Write the final data dictionary and PDF report, replacing any partial report.
+
+    With a correlation_index path the scan is indexed first, so the optional
+    Shared Infrastructure section already sees it. With an asset_export path
+    the scan's assets are appended to it.
+    """
+    scan_id = scan_id or f"{domain}-{datetime.datetime.now().strftime('%Y%m%d-%H%M%S')}"
+    shared = None
+    if correlation_index:
+        with CorrelationIndex(correlation_index) as index:
+            index.add_scan(domain, aggregated_results, scan_id)
+            if shared_infrastructure:
+                shared = index.shared_with(domain)
+        print(f"Correlation index updated: {correlation_index}")
+
+    if export_json:
         json_output_path = os.path.join(reports_dir, f"results_{domain}.json")
         with open(json_output_path, 'w') as f:
-            import json
-            json.dump(aggregated_results, f, indent=4)
+            json.dump(aggregated_results, f, indent=4, default=to_json)
         print(f"Aggregated results saved to {json_output_path}")
 
-        print("Generating data dictionary...")
-        from data_dictionary_generator import create_data_dictionary_file
-        data_dict_path = create_data_dictionary_file(domain, aggregated_results, reports_dir)
-        print(f"Data dictionary generated: {data_dict_path}")
+    print("Generating data dictionary...")
+    from data_dictionary_generator import create_data_dictionary_file
+    data_dict_path = create_data_dictionary_file(domain, aggregated_results, reports_dir, export_json,
+                                                 scan_id=scan_id)
+    print(f"Data dictionary generated: {data_dict_path}")
 
-        print("Generating PDF report...")
-        from report_generator import generate_report
-        pdf_output_path = os.path.join(reports_dir, f"report_{domain}.pdf")
-        generate_report(domain, data_dict_path, pdf_output_path, author, scan_duration)
-        print(f"PDF report generated: {pdf_output_path}")
+    if asset_export:
+        from asset_export import export_scan_assets
+        count = export_scan_assets(asset_export, domain, aggregated_results, scan_id)
+        print(f"{count} asset record(s) appended to {asset_export}")
 
-        cleanup_ips_files()
+    print("Generating PDF report...")
+    from report_generator import generate_report
+    pdf_output_path = os.path.join(reports_dir, f"report_{domain}.pdf")
+    generate_report(domain, data_dict_path, pdf_output_path, author, scan_duration, shared_infrastructure=shared)
+    print(f"PDF report generated: {pdf_output_path}")
+    partial_report = os.path.join(reports_dir, f"report_{domain}.partial.pdf")
+    if os.path.exists(partial_report):
+        os.remove(partial_report)
+    return pdf_output_path
 
-    except Exception as e:
-        #stdout and stderr are restored on error
-        if log_file_handle:
-            log_file_handle.close()
-        sys.stdout = original_stdout
-        sys.stderr = original_stderr
-        print(f"An error occurred: {e}")
+def _nmap_job(domain):
+    if not os.path.exists(f"results/nmap_{domain}.xml"):
+        return None
+    cached_file = f"results/nmap_cached_{domain}.json"
+    index_file = f"results/host_index_{domain}.json"
+    return ("parsers.nmap_parser", "parse_nmap_scan",
+            (f"results/nmap_{domain}.xml", sorted(glob.glob(f"results/nmap_sv_{domain}_*.xml")),
+             cached_file if os.path.exists(cached_file) else None,
+             index_file if os.path.exists(index_file) else None))
 
-def aggregate_results(domain):
-    from parsers.nmap_parser import parse_nmap
-    from parsers.whatweb_parser import parse_whatweb
-    from parsers.dnsenum_parser import parse_dnsenum
-    from parsers.theharvester_parser import parse_theharvester
-    from parsers.httpx_parser import parse_httpx
+def _whatweb_hosts_job(domain):
+    if os.path.exists(f"results/whatweb_{domain}.json"):
+        return ("parsers.whatweb_parser", "parse_whatweb_json", (f"results/whatweb_{domain}.json",))
+    if os.path.exists(f"results/fingerprint_{domain}.jsonl"):
+        return ("parsers.fingerprint_parser", "parse_fingerprint", (f"results/fingerprint_{domain}.jsonl",))
+    return None
+
+def _file_job(path_template, parser_module, parser_name):
+    def job(domain):
+        path = path_template.format(domain=domain)
+        return (parser_module, parser_name, (path,)) if os.path.exists(path) else None
+    return job
+
+# source -> function(domain) returning its parse job (module, function, input paths),
+# or None when the tool left no output
+SOURCE_JOBS = {
+    'nmap': _nmap_job,
+    'whatweb': _file_job("results/whatweb_{domain}.txt", "parsers.whatweb_parser", "parse_whatweb"),
+    'whatweb_hosts': _whatweb_hosts_job,
+    'dnsenum': _file_job("results/dnsenum_{domain}.xml", "parsers.dnsenum_parser", "parse_dnsenum"),
+    'theharvester': _file_job("results/theharvester_{domain}.json", "parsers.theharvester_parser", "parse_theharvester"),
+    'httpx': _file_job("results/httpx_headers_{domain}.txt", "parsers.httpx_parser", "parse_httpx"),
+    'httpx_hosts': _file_job("results/httpx_{domain}.jsonl", "parsers.httpx_parser", "parse_httpx_jsonl"),
+    'sublist3r': _file_job("results/sublist3r_{domain}.txt", "parsers.sublist3r_parser", "parse_sublist3r"),
+    'ct': _file_job("results/ct_{domain}.txt", "parsers.ct_parser", "parse_ct"),
+    'dnsdumpster': _file_job("results/dnsdumpster_{domain}.json", "parsers.dnsdumpster_parser", "parse_dnsdumpster"),
+    'bruteforce': _file_job("results/bruteforce_{domain}.txt", "parsers.bruteforce_parser", "parse_bruteforce"),
+    'tls': _file_job("results/tls_{domain}.jsonl", "parsers.tls_parser", "parse_tls"),
+}
+
+# Finished tool (lowercased stage name) -> sources whose output it writes or changes
+TOOL_SOURCES = {
+    'web probing': ('httpx_hosts', 'whatweb_hosts'),
+    # Nmap results are re-merged once hostnames can be attached to each address
+    'host index': ('nmap',),
+}
+
+def parse_sources(domain, sources, cache_path=DEFAULT_PARSE_CACHE):
+    """Parse the given sources' outputs concurrently, reusing cached results for unchanged files."""
+    jobs = {}
+    for source in sources:
+        job = SOURCE_JOBS[source](domain)
+        if job is not None:
+            jobs[source] = job
+    if not jobs:
+        return {}
+    if cache_path is None:
+        return parse_jobs(jobs)
+    with ParseCache(cache_path) as cache:
+        return parse_jobs(jobs, cache)
+
+def aggregate_results(domain, cache_path=DEFAULT_PARSE_CACHE):
+    results = parse_sources(domain, SOURCE_JOBS, cache_path)
+    return {source: value for source, value in results.items() if value is not None}
+
+class ProgressiveAggregator:
+    """Parse each tool's output as soon as it finishes and merge it into the data dictionary.
+
+    Subscribes to TOOL_FINISHED and publishes RESULTS_UPDATED with the results
+    and categorized data so far, so findings are available long before the
+    slowest tool is done.
+    """
+
+    def __init__(self, domain, bus, cache_path=DEFAULT_PARSE_CACHE):
+        from data_dictionary_generator import new_categorized_data
+
+        self.domain = domain
+        self.bus = bus
+        self.cache_path = cache_path
+        self.results = {}
+        self.categorized = new_categorized_data()
+        self.categorized["scan_metadata"]["domain"] = domain
+        bus.subscribe(TOOL_FINISHED, self.on_tool_finished)
+
+    def on_tool_finished(self, tool, **_):
+        sources = TOOL_SOURCES.get(tool, (tool,))
+        self.update([s for s in sources if s in SOURCE_JOBS], tool)
+
+    def update(self, sources, tool=None):
+        from data_dictionary_generator import merge_source, finalize_categorized_data
+
+        updated = []
+        for source, value in parse_sources(self.domain, sources, self.cache_path).items():
+            if value is None:
+                continue
+            self.results[source] = value
+            merge_source(self.categorized, source, value)
+            updated.append(source)
+        if updated:
+            self.bus.publish(RESULTS_UPDATED, tool=tool, sources=updated, results=dict(self.results),
+                             categorized=finalize_categorized_data(self.categorized))
+
+    def complete(self):
+        """Final aggregated results: sources not parsed yet (e.g. from earlier runs) are parsed now."""
+        remaining = [source for source in SOURCE_JOBS if source not in self.results]
+        for source, value in parse_sources(self.domain, remaining, self.cache_path).items():
+            if value is not None:
+                self.results[source] = value
+        return {source: self.results[source] for source in SOURCE_JOBS if source in self.results}
+
+def print_progress(stream, tool, sources, categorized, **_):
+    counts = ", ".join(f"{category} ({len(data)})" for category, data in categorized.items()
+                       if category != "scan_metadata")
+    print(f"[=] {tool or 'results'} parsed ({', '.join(sources)}): {counts}", file=stream)
+
+def write_partial_data_dictionary(domain, reports_dir, export_json, results, categorized, **_):
+    from result_archive import save_scan_archive
+    save_scan_archive(os.path.join(reports_dir, f"scan_{domain}.arc"), results, categorized)
+    if export_json:
+        with open(os.path.join(reports_dir, f"data_dictionary_{domain}.json"), 'w') as f:
+            json.dump(categorized, f, indent=2, default=to_json)
+    logger.info("Partial data dictionary updated with %s", ", ".join(sorted(results)))
+
+def write_partial_report(domain, reports_dir, author, **_):
+    from report_generator import generate_report
+    generate_report(domain, os.path.join(reports_dir, f"scan_{domain}.arc"),
+                    os.path.join(reports_dir, f"report_{domain}.partial.pdf"), author, "scan in progress")
+
+def collect_known_hosts(domain):
     from parsers.sublist3r_parser import parse_sublist3r
+    from parsers.ct_parser import parse_ct
+    from parsers.theharvester_parser import parse_theharvester
     from parsers.dnsdumpster_parser import parse_dnsdumpster
+    from parsers.dnsenum_parser import parse_dnsenum
+    from parsers.bruteforce_parser import parse_bruteforce
+    from parsers.tls_parser import parse_tls
 
-    results = {}
-    if os.path.exists(f"results/nmap_{domain}.xml"):
-        results['nmap'] = parse_nmap(f"results/nmap_{domain}.xml")
-    if os.path.exists(f"results/whatweb_{domain}.txt"):
-        results['whatweb'] = parse_whatweb(f"results/whatweb_{domain}.txt")
-    if os.path.exists(f"results/dnsenum_{domain}.xml"):
-        results['dnsenum'] = parse_dnsenum(f"results/dnsenum_{domain}.xml")
-    if os.path.exists(f"results/theharvester_{domain}.json"):
-        results['theharvester'] = parse_theharvester(f"results/theharvester_{domain}.json")
-    if os.path.exists(f"results/httpx_headers_{domain}.txt"):
-        results['httpx'] = parse_httpx(f"results/httpx_headers_{domain}.txt")
+    hosts = {domain}
     if os.path.exists(f"results/sublist3r_{domain}.txt"):
-        results['sublist3r'] = parse_sublist3r(f"results/sublist3r_{domain}.txt")
+        hosts.update(parse_sublist3r(f"results/sublist3r_{domain}.txt"))
+    if os.path.exists(f"results/ct_{domain}.txt"):
+        hosts.update(parse_ct(f"results/ct_{domain}.txt"))
+    if os.path.exists(f"results/theharvester_{domain}.json"):
+        hosts.update(parse_theharvester(f"results/theharvester_{domain}.json").get('hosts', []))
     if os.path.exists(f"results/dnsdumpster_{domain}.json"):
-        results['dnsdumpster'] = parse_dnsdumpster(f"results/dnsdumpster_{domain}.json")
+        for record in parse_dnsdumpster(f"results/dnsdumpster_{domain}.json").get('a', []):
+            if isinstance(record, dict) and record.get('host'):
+                hosts.add(record['host'])
+    if os.path.exists(f"results/dnsenum_{domain}.xml"):
+        hosts.update(h for h in parse_dnsenum(f"results/dnsenum_{domain}.xml") if h)
+    if os.path.exists(f"results/bruteforce_{domain}.txt"):
+        hosts.update(r['host'] for r in parse_bruteforce(f"results/bruteforce_{domain}.txt"))
+    if os.path.exists(f"results/tls_{domain}.jsonl"):
+        for record in parse_tls(f"results/tls_{domain}.jsonl"):
+            hosts.update(record.get('in_scope', []))
+    # theHarvester reports hosts as "name:ip"
+    return {h.split(':')[0].strip().lower() for h in hosts if h}
+
+def build_scan_host_index(domain):
+    """Resolve every discovered host and save the ip -> hostnames index for this scan."""
+    from parsers.bruteforce_parser import parse_bruteforce
+    from host_index import resolve_hosts, build_host_index, save_host_index
 
-    return results
+    known_ips = {}
+    if os.path.exists(f"results/bruteforce_{domain}.txt"):
+        known_ips = {r['host']: r['ips'] for r in parse_bruteforce(f"results/bruteforce_{domain}.txt")}
+    index = build_host_index(resolve_hosts(collect_known_hosts(domain), known_ips))
+    save_host_index(domain, index)
+    return index
 
 def cleanup_ips_files():
     for f in glob.glob("*_ips.txt"):
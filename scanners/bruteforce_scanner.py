@@ -0,0 +1,179 @@
+import asyncio
+import itertools
+import logging
+import os
+import random
+import re
+import string
+from collections import OrderedDict
+
+from dns_resolver import AsyncResolver
+
+DEFAULT_WORDLIST = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "wordlists", "subdomains.txt")
+DEFAULT_CONCURRENCY = 100
+PERMUTATION_WORDS = 40
+RECENT_WINDOW = 10000
+# DNS limits (RFC 1035): longer names cannot be encoded into a query
+MAX_LABEL_LENGTH = 63
+MAX_NAME_LENGTH = 253
+
+logger = logging.getLogger(__name__)
+
+_TRAILING_DIGITS = re.compile(r'^(.*?)(\d+)$')
+
+
+def _iter_wordlist(wordlist_path):
+    with open(wordlist_path, 'r') as f:
+        for line in f:
+            word = line.strip().lower()
+            if word and not word.startswith('#'):
+                yield word
+
+
+def _known_labels(domain, known_hosts):
+    """Return the leftmost labels of known hosts that sit under domain."""
+    suffix = "." + domain
+    labels = set()
+    for host in known_hosts:
+        host = host.strip().lower().rstrip('.')
+        if host.endswith(suffix):
+            prefix = host[:-len(suffix)]
+            if prefix:
+                labels.add(prefix.split('.')[0])
+    return sorted(labels)
+
+
+def _valid_name(name):
+    encoded = name.encode('utf-8')
+    return len(encoded) <= MAX_NAME_LENGTH and all(0 < len(label) <= MAX_LABEL_LENGTH
+                                                   for label in encoded.split(b'.'))
+
+
+def _numeric_variants(label):
+    match = _TRAILING_DIGITS.match(label)
+    if match:
+        stem, digits = match.group(1), match.group(2)
+        number = int(digits)
+        for n in range(max(0, number - 2), number + 4):
+            if n != number:
+                yield f"{stem}{str(n).zfill(len(digits))}"
+    else:
+        for n in range(1, 4):
+            yield f"{label}{n}"
+            yield f"{label}-{n}"
+
+
+def _permutations(label, words):
+    yield from _numeric_variants(label)
+    for word in words:
+        if word == label:
+            continue
+        yield f"{word}{label}"
+        yield f"{label}{word}"
+        yield f"{word}-{label}"
+        yield f"{label}-{word}"
+
+
+def generate_candidates(domain, known_hosts=(), wordlist_path=DEFAULT_WORDLIST,
+                        permutation_words=PERMUTATION_WORDS, recent_window=RECENT_WINDOW):
+    """Lazily yield candidate hostnames for domain.
+
+    Wordlist entries are streamed straight from disk, followed by permutations
+    of the labels already known from passive sources. Known hosts are skipped
+    before they ever reach the resolver, and a bounded window of recently
+    emitted names suppresses the duplicates permutations tend to produce, so
+    memory stays constant regardless of how many candidates are generated.
+    Names too long for DNS (e.g. permutations of long labels) are dropped.
+    """
+    domain = domain.lower().rstrip('.')
+    known = {h.strip().lower().rstrip('.') for h in known_hosts}
+    recent = OrderedDict()
+
+    perm_words = list(itertools.islice(_iter_wordlist(wordlist_path), permutation_words))
+    labels = _known_labels(domain, known)
+    prefixes = itertools.chain(
+        _iter_wordlist(wordlist_path),
+        itertools.chain.from_iterable(_permutations(label, perm_words) for label in labels)
+    )
+
+    for prefix in prefixes:
+        candidate = f"{prefix}.{domain}"
+        if candidate in known or candidate in recent or not _valid_name(candidate):
+            continue
+        recent[candidate] = None
+        if len(recent) > recent_window:
+            recent.popitem(last=False)
+        yield candidate
+
+
+async def _detect_wildcard(resolver, domain):
+    label = ''.join(random.choice(string.ascii_lowercase) for _ in range(16))
+    return set(await resolver.resolve(f"{label}.{domain}"))
+
+
+async def resolve_candidates(candidates, domain, on_result, nameserver=None, port=53,
+                             concurrency=DEFAULT_CONCURRENCY, timeout=2.0):
+    """Resolve candidates through a bounded worker pool.
+
+    The producer never runs more than a small queue ahead of the workers, so
+    the candidate generator is consumed at the pace the resolver can sustain.
+    on_result(host, ips) is called for every name that resolves to an address
+    outside the domain's wildcard set. Returns the number of names resolved.
+    """
+    queue = asyncio.Queue(maxsize=concurrency * 2)
+    found = 0
+
+    async with AsyncResolver(nameserver, port=port, timeout=timeout) as resolver:
+        wildcard_ips = await _detect_wildcard(resolver, domain)
+
+        async def worker():
+            nonlocal found
+            while True:
+                host = await queue.get()
+                if host is None:
+                    queue.task_done()
+                    return
+                # A name that fails must not take its worker down: with every
+                # worker gone the producer would block on the full queue forever
+                try:
+                    ips = await resolver.resolve(host)
+                    if ips and not set(ips) <= wildcard_ips:
+                        found += 1
+                        on_result(host, ips)
+                except Exception as e:
+                    logger.warning("Resolving %s failed: %s", host, e)
+                finally:
+                    queue.task_done()
+
+        workers = [asyncio.create_task(worker()) for _ in range(concurrency)]
+        for host in candidates:
+            await queue.put(host)
+        for _ in workers:
+            await queue.put(None)
+        await asyncio.gather(*workers)
+
+    return found
+
+
+def bruteforce_scan(domain, log_handle, known_hosts=(), wordlist_path=DEFAULT_WORDLIST,
+                    nameserver=None, port=53, concurrency=DEFAULT_CONCURRENCY):
+    os.makedirs("results", exist_ok=True)
+    output_file = f"results/bruteforce_{domain}.txt"
+    try:
+        with open(output_file, 'w') as f:
+            def write_result(host, ips):
+                f.write(f"{host} {','.join(ips)}\n")
+                f.flush()
+
+            candidates = generate_candidates(domain, known_hosts, wordlist_path)
+            found = asyncio.run(resolve_candidates(candidates, domain, write_result,
+                                                   nameserver=nameserver, port=port,
+                                                   concurrency=concurrency))
+        log_handle.write(f"Subdomain brute-force for {domain} resolved {found} new host(s).\n")
+        return output_file
+    except FileNotFoundError:
+        log_handle.write(f"Subdomain wordlist not found: {wordlist_path}\n")
+        return None
+    except OSError as e:
+        log_handle.write(f"Subdomain brute-force for {domain} failed: {e}\n")
+        return None
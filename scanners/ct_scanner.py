@@ -0,0 +1,22 @@
+import os
+
+from ct_index import CTIndex, DEFAULT_INDEX_PATH
+
+def ct_scan(domain, log_handle, index_path=DEFAULT_INDEX_PATH):
+    """List the domain's names from the local certificate-transparency index (see ct_index.py)."""
+    if not index_path or not os.path.exists(index_path):
+        log_handle.write(f"CT index {index_path} not found; build it with 'python ct_index.py build'\n")
+        return None
+    os.makedirs("results", exist_ok=True)
+    output_file = f"results/ct_{domain}.txt"
+    try:
+        with CTIndex(index_path) as index:
+            names = index.subdomains(domain)
+    except (OSError, ValueError) as e:
+        log_handle.write(f"CT index lookup failed for {domain}: {e}\n")
+        return None
+    with open(output_file, 'w') as f:
+        for name in names:
+            f.write(name + "\n")
+    log_handle.write(f"CT index: {len(names)} name(s) under {domain}\n")
+    return output_file
@@ -1,24 +1,30 @@
-import subprocess
+import json
 import os
+import threading
 
-def dnsdumpster_scan(domain, log_handle):
+from dnsdumpster_client import DNSDumpsterClient, DNSDumpsterError
+
+_client = None
+_client_lock = threading.Lock()
+
+def get_client():
+    # One client per process, so multi-domain runs share the connection and rate limit
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = DNSDumpsterClient()
+        return _client
+
+def dnsdumpster_scan(domain, log_handle, client=None):
     # print(f"Running DNSDumpster scan on {domain}...")
     os.makedirs("results", exist_ok=True)
     output_file = f"results/dnsdumpster_{domain}.json"
-    api_key = "eb35c0dd2f46ef0d0788a26c12439d0f86ca1f28bc97d5fa748a5cb81203ed96"
-    command = [
-        "curl",
-        "-H", f"X-API-Key: {api_key}",
-        f"https://api.dnsdumpster.com/domain/{domain}",
-        "-o", output_file
-    ]
     try:
-        subprocess.run(command, check=True, stdout=log_handle, stderr=log_handle)
-        return output_file
-        # print(f"DNSDumpster scan for {domain} completed.")
-    except subprocess.CalledProcessError as e:
-        # print(f"DNSDumpster scan failed for {domain}: {e}")
-        pass
-    except FileNotFoundError:
-        # print("curl is not installed or not in PATH. Please ensure 'curl' is in your system's PATH.")
-        pass
+        data = (client or get_client()).lookup(domain)
+    except DNSDumpsterError as e:
+        log_handle.write(f"DNSDumpster lookup failed for {domain}: {e}\n")
+        return None
+    # Only validated responses are saved, so an error body is never parsed as results
+    with open(output_file, 'w') as f:
+        json.dump(data, f)
+    return output_file
@@ -1,12 +1,18 @@
-
+import shutil
 import subprocess
 import os
 
+# ProjectDiscovery httpx, which the Dockerfile installs with go install. /root/go/bin is searched first,
+# since PATH lists it last and /usr/bin/httpx may be the Python httpx CLI
+GO_BIN = "/root/go/bin"
+HTTPX = shutil.which("httpx", path=os.pathsep.join((GO_BIN, os.environ.get('PATH', os.defpath)))) \
+    or os.path.join(GO_BIN, "httpx")
+
 def httpx_scan(domain, log_handle):
     # print(f"Running httpx scan on {domain}...")
     os.makedirs("results", exist_ok=True)
     output_file = f"results/httpx_headers_{domain}.txt"
-    command = ["/usr/bin/httpx", f"https://{domain}"]
+    command = [HTTPX, f"https://{domain}"]
     try:
         with open(output_file, 'w') as f:
             subprocess.run(command, check=True, stdout=f, stderr=log_handle, timeout=60) # 1 minute timeout
@@ -23,3 +29,34 @@ def httpx_scan(domain, log_handle):
     except Exception as e:
         log_handle.write(f"An unexpected error occurred during HTTPX scan for {domain}: {e}\n")
         return None
+
+def httpx_bulk_scan(domain, log_handle, hosts):
+    """Probe every host with a single httpx process, writing one JSON record per live host.
+
+    httpx tries HTTPS first and falls back to HTTP on its own, so bare host
+    names are passed through the -l list unchanged.
+    """
+    os.makedirs("results", exist_ok=True)
+    targets_file = f"results/httpx_targets_{domain}.txt"
+    output_file = f"results/httpx_{domain}.jsonl"
+    with open(targets_file, 'w') as f:
+        f.write("\n".join(sorted(set(hosts))) + "\n")
+    command = [
+        HTTPX, "-l", targets_file, "-json", "-silent",
+        "-status-code", "-title", "-tech-detect", "-content-length", "-web-server", "-tls-grab",
+        "-o", output_file
+    ]
+    timeout = 60 + 2 * len(hosts)
+    try:
+        subprocess.run(command, check=True, stdout=subprocess.DEVNULL, stderr=log_handle, timeout=timeout)
+        return output_file
+    except subprocess.CalledProcessError as e:
+        log_handle.write(f"HTTPX bulk scan failed for {domain} with exit code {e.returncode}\n")
+        return None
+    except FileNotFoundError:
+        log_handle.write(f"HTTPX executable not found. Please ensure 'httpx' is in your system's PATH.\n")
+        return None
+    except subprocess.TimeoutExpired:
+        log_handle.write(f"HTTPX bulk scan for {domain} timed out after {timeout} seconds.\n")
+        # Whatever httpx wrote before the timeout is still usable
+        return output_file if os.path.exists(output_file) else None
@@ -1,12 +1,44 @@
-
+import contextvars
 import subprocess
 import os
+import glob
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+NMAP = "/usr/bin/nmap"
+DEFAULT_TOP_PORTS = 1000
+SERVICE_SCAN_WORKERS = 4
+
+def _target_args(domain, targets):
+    # Deduplicated IP targets go through an input list so each address is scanned once
+    if not targets:
+        return [domain]
+    targets_file = f"results/nmap_targets_{domain}.txt"
+    with open(targets_file, 'w') as f:
+        f.write("\n".join(targets) + "\n")
+    return ["-iL", targets_file]
 
-def nmap_scan(domain, log_handle):
+def _remove_sidecars(domain):
+    # Service passes and cached endpoints of an earlier two-phase run would be merged into this run's results
+    for stale in glob.glob(f"results/nmap_sv_{domain}_*.xml") + glob.glob(f"results/nmap_cached_{domain}.json"):
+        os.remove(stale)
+
+def nmap_scan(domain, log_handle, two_phase=False, top_ports=DEFAULT_TOP_PORTS, full_range=False, targets=None,
+              service_cache_path=None, service_cache_ttl=None):
+    if two_phase:
+        if not service_cache_path:
+            return nmap_two_phase_scan(domain, log_handle, top_ports=top_ports, full_range=full_range, targets=targets)
+        from service_cache import ServiceCache, DEFAULT_TTL
+        # sqlite connections are per-thread, so the cache is opened by the scan thread itself
+        with ServiceCache(service_cache_path, ttl=service_cache_ttl or DEFAULT_TTL) as service_cache:
+            return nmap_two_phase_scan(domain, log_handle, top_ports=top_ports, full_range=full_range,
+                                       targets=targets, service_cache=service_cache)
     # print(f"Running nmap scan on {domain}...")
     os.makedirs("results", exist_ok=True)
+    _remove_sidecars(domain)
     output_file = f"results/nmap_{domain}.xml"
-    command = ["/usr/bin/nmap", domain, "-T4", "-sV", "-oX", output_file]
+    command = [NMAP, *_target_args(domain, targets), "-T4", "-sV", "-oX", output_file]
     try:
         subprocess.run(command, check=True, stdout=log_handle, stderr=log_handle)
         return output_file
@@ -18,3 +50,90 @@ def nmap_scan(domain, log_handle):
         # print("Nmap is not installed or not in PATH.")
         pass
 
+def _discovery_command(domain, output_file, top_ports, full_range, targets=None):
+    # SYN scan needs raw sockets; fall back to a connect scan when unprivileged
+    scan_type = "-sS" if hasattr(os, "geteuid") and os.geteuid() == 0 else "-sT"
+    ports = ["-p-"] if full_range else ["--top-ports", str(top_ports)]
+    return [NMAP, *_target_args(domain, targets), "-T4", scan_type, "--open", *ports, "-oX", output_file]
+
+def _service_scan(domain, ip, ports, log_handle):
+    output_file = f"results/nmap_sv_{domain}_{ip}.xml"
+    command = [NMAP, ip, "-T4", "-Pn", "-sV", "-p", ",".join(ports), "-oX", output_file]
+    try:
+        subprocess.run(command, check=True, stdout=log_handle, stderr=log_handle)
+        return output_file
+    except subprocess.CalledProcessError as e:
+        log_handle.write(f"Nmap service detection failed for {ip} with exit code {e.returncode}\n")
+        return None
+
+def _split_cached(hosts, service_cache):
+    """Split open ports into those needing -sV and those the cache can answer."""
+    service_targets = []
+    cached = []
+    for host in hosts:
+        open_ports = []
+        for port in host['ports']:
+            if port['state'] != 'open':
+                continue
+            if service_cache is not None and not service_cache.needs_detection(
+                    host['ip'], port['portid'], port['protocol'], port['state']):
+                entry = service_cache.get(host['ip'], port['portid'], port['protocol'])
+                entry.pop('timestamp', None)
+                cached.append(dict(entry, ip=host['ip']))
+            else:
+                open_ports.append(port['portid'])
+        if open_ports:
+            service_targets.append((host['ip'], open_ports))
+    return service_targets, cached
+
+def nmap_two_phase_scan(domain, log_handle, top_ports=DEFAULT_TOP_PORTS, full_range=False, targets=None,
+                        service_cache=None):
+    """Fast open-port discovery followed by -sV on only the open ports of each host.
+
+    The discovery pass is written to the usual results/nmap_{domain}.xml and the
+    per-host service passes to results/nmap_sv_{domain}_{ip}.xml; parse_nmap
+    merges the two. With a ServiceCache, endpoints that are unchanged and not
+    expired skip -sV and are filled from results/nmap_cached_{domain}.json.
+    """
+    from parsers.nmap_parser import parse_nmap
+
+    os.makedirs("results", exist_ok=True)
+    output_file = f"results/nmap_{domain}.xml"
+    cached_file = f"results/nmap_cached_{domain}.json"
+    _remove_sidecars(domain)
+
+    try:
+        start = time.time()
+        subprocess.run(_discovery_command(domain, output_file, top_ports, full_range, targets),
+                       check=True, stdout=log_handle, stderr=log_handle)
+        discovery_time = time.time() - start
+        log_handle.write(f"Nmap discovery phase for {domain} completed in {discovery_time:.2f} seconds.\n")
+
+        service_targets, cached = _split_cached(parse_nmap(output_file), service_cache)
+        if cached:
+            with open(cached_file, 'w') as f:
+                json.dump(cached, f)
+
+        start = time.time()
+        with ThreadPoolExecutor(max_workers=SERVICE_SCAN_WORKERS) as executor:
+            # Each scan runs in a copy of this thread's context, so per-run state (e.g. a recording) follows it
+            futures = [executor.submit(contextvars.copy_context().run, _service_scan, domain, ip, ports, log_handle)
+                       for ip, ports in service_targets]
+            service_files = [future.result() for future in futures]
+        service_time = time.time() - start
+        log_handle.write(f"Nmap service detection phase for {domain} completed in {service_time:.2f} seconds "
+                         f"({len(service_targets)} host(s), {len(cached)} endpoint(s) from cache).\n")
+
+        if service_cache is not None:
+            for service_file in filter(None, service_files):
+                for host in parse_nmap(service_file):
+                    for port in host['ports']:
+                        service_cache.put(host['ip'], port)
+            service_cache.evict()
+        return output_file
+    except subprocess.CalledProcessError as e:
+        log_handle.write(f"Nmap discovery scan failed for {domain} with exit code {e.returncode}\n")
+        return None
+    except FileNotFoundError:
+        log_handle.write("Nmap is not installed or not in PATH.\n")
+        return None
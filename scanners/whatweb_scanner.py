@@ -25,3 +25,28 @@ def whatweb_scan(domain, log_handle):
         # print("WhatWeb is not installed or not in PATH. Please ensure 'whatweb' is in your system's PATH.")
         pass
 
+def whatweb_bulk_scan(domain, log_handle, urls):
+    """Fingerprint every URL with one WhatWeb process, logging one JSON entry per target."""
+    os.makedirs("results", exist_ok=True)
+    targets_file = f"results/whatweb_targets_{domain}.txt"
+    output_file = f"results/whatweb_{domain}.json"
+    with open(targets_file, 'w') as f:
+        f.write("\n".join(sorted(set(urls))) + "\n")
+    command = [
+        "whatweb",
+        "--input-file", targets_file,
+        f"--log-json={output_file}",
+        "--quiet",
+        "--user-agent", "Mozilla/5.0 (Windows NT 10.0; Win64; x64)",
+        "--header", "Accept: text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
+        "--header", "Accept-Language: en-US,en;q=0.5"
+    ]
+    try:
+        subprocess.run(command, check=True, stdout=log_handle, stderr=log_handle)
+        return output_file
+    except subprocess.CalledProcessError as e:
+        log_handle.write(f"WhatWeb bulk scan failed for {domain} with exit code {e.returncode}\n")
+        return None
+    except FileNotFoundError:
+        log_handle.write("WhatWeb is not installed or not in PATH. Please ensure 'whatweb' is in your system's PATH.\n")
+        return None
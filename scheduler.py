@@ -0,0 +1,185 @@
+import itertools
+import statistics
+import time
+from collections import deque
+
+# Tenant of targets given without one; they share its fair share and are served in the order given
+DEFAULT_TENANT = "default"
+DEFAULT_PRIORITY = 0
+DEFAULT_WEIGHT = 1.0
+# Seconds of waiting that raise a job's priority by one level, so low-priority work is never starved
+AGING_SECONDS = 300.0
+# Run time a domain is served in arrival order before domains that have had less go ahead of it
+DOMAIN_QUANTUM = 3600.0
+# Units of one domain running at once while other domains have units waiting
+DOMAIN_SLOTS = 2
+# Run time charged for a tool that has not finished a job yet
+DEFAULT_COST = 60.0
+# Weight of the latest run in a tool's running cost estimate
+COST_SMOOTHING = 0.3
+# Queue waits kept per job class for the percentiles
+WAIT_SAMPLES = 1000
+
+
+class Job:
+    __slots__ = ('item', 'tenant', 'domain', 'tool', 'priority', 'enqueued', 'seq', 'started', 'charged')
+
+    def __init__(self, item, tenant, domain, tool, priority, enqueued, seq):
+        self.item = item
+        self.tenant = tenant
+        self.domain = domain
+        self.tool = tool
+        self.priority = priority
+        self.enqueued = enqueued
+        self.seq = seq
+        self.started = None
+        self.charged = 0.0
+
+
+def _summary(samples):
+    ordered = sorted(samples)
+    return {
+        "count": len(ordered),
+        "mean": round(statistics.fmean(ordered), 3),
+        "p50": round(ordered[len(ordered) // 2], 3),
+        "p95": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))], 3),
+        "max": round(ordered[-1], 3),
+    }
+
+
+class FairScheduler:
+    """Weighted fair queuing of jobs across tenants and their domains, with priorities, per-domain caps and aging.
+
+    Every tenant, and every domain within its tenant, accumulates virtual
+    time: the run time of its jobs divided by the tenant's weight. A job is
+    charged its tool's estimated run time when it starts, the time it overruns
+    that estimate while it runs, and its measured time once it finishes.
+    Of the waiting jobs a worker can take, the highest effective priority
+    goes first, then the tenant with the least virtual time, then the domain
+    that has had the fewest quanta of virtual time, then the domain that
+    arrived first and its oldest job. Small domains are thus served in order
+    and finish one after another, while a large one drops behind them once
+    it has had its first quantum. Every aging_seconds a job waits takes back
+    one of its domain's quanta, so a large domain is never starved by smaller
+    ones, and raises its priority by one level, up to the highest priority
+    waiting, so low-priority work is never starved either.
+    While other domains have jobs a worker can take, a domain already running
+    domain_slots jobs waits; the cap never leaves a worker idle.
+    A tenant or domain that becomes active again starts at the least virtual
+    time of its active peers, so idle time is not saved up as credit.
+
+    Not thread-safe: callers serialize access (the coordinator holds its lock).
+    """
+
+    def __init__(self, weights=None, domain_slots=DOMAIN_SLOTS, aging_seconds=AGING_SECONDS,
+                 quantum=DOMAIN_QUANTUM, clock=time.monotonic):
+        self.weights = dict(weights or {})
+        self.domain_slots = domain_slots
+        self.aging_seconds = aging_seconds
+        self.quantum = quantum
+        self.clock = clock
+        self.waiting = []
+        self.running = {}
+        self.domain_running = {}
+        self.virtual_time = {}
+        # (tenant, domain) -> virtual time of the domain within its tenant
+        self.domain_time = {}
+        # domain -> order it was first submitted in
+        self.arrival = {}
+        self.costs = {}
+        self.waits = {}
+        self._seq = itertools.count()
+
+    def __len__(self):
+        return len(self.waiting)
+
+    def _weight(self, tenant):
+        return self.weights.get(tenant, DEFAULT_WEIGHT)
+
+    def _active(self):
+        return [(job.tenant, job.domain) for job in self.waiting] + \
+            [(job.tenant, job.domain) for job in self.running.values()]
+
+    def submit(self, item, tenant, domain, tool, priority=DEFAULT_PRIORITY):
+        """Queue item as a job of tenant's domain; returns the Job to pass to finish()."""
+        active = self._active()
+        tenants = {t for t, _ in active}
+        if tenant not in tenants:
+            floor = min((self.virtual_time.get(t, 0.0) for t in tenants), default=0.0)
+            self.virtual_time[tenant] = max(self.virtual_time.get(tenant, 0.0), floor)
+        key = (tenant, domain)
+        if key not in active:
+            floor = min((self.domain_time.get(k, 0.0) for k in active if k[0] == tenant), default=0.0)
+            self.domain_time[key] = max(self.domain_time.get(key, 0.0), floor)
+        self.arrival.setdefault(domain, len(self.arrival))
+        job = Job(item, tenant, domain, tool, priority, self.clock(), next(self._seq))
+        self.waiting.append(job)
+        return job
+
+    def _overrun(self, now, match):
+        # Jobs that outlive their estimate keep charging their tenant and domain while they run
+        return sum(max(0.0, now - job.started - job.charged) for job in self.running.values() if match(job))
+
+    def _charge(self, job, seconds):
+        seconds /= self._weight(job.tenant)
+        self.virtual_time[job.tenant] = self.virtual_time.get(job.tenant, 0.0) + seconds
+        key = (job.tenant, job.domain)
+        self.domain_time[key] = self.domain_time.get(key, 0.0) + seconds
+
+    def next(self, accept=None):
+        """Start and return the next job accept(job) allows, or None when none can run now."""
+        now = self.clock()
+        candidates = [job for job in self.waiting if accept is None or accept(job)]
+        if self.domain_slots is not None:
+            candidates = [job for job in candidates
+                          if self.domain_running.get(job.domain, 0) < self.domain_slots] or candidates
+        # Aging lifts a job towards the highest waiting priority, never past it, so it does not reorder a level
+        top = max((job.priority for job in candidates), default=DEFAULT_PRIORITY)
+        tenant_times, domain_quanta = {}, {}
+        best, best_key = None, None
+        for job in candidates:
+            tenant, key = job.tenant, (job.tenant, job.domain)
+            if tenant not in tenant_times:
+                tenant_times[tenant] = self.virtual_time.get(tenant, 0.0) + \
+                    self._overrun(now, lambda j: j.tenant == tenant) / self._weight(tenant)
+            if key not in domain_quanta:
+                seconds = self.domain_time.get(key, 0.0) + \
+                    self._overrun(now, lambda j: (j.tenant, j.domain) == key) / self._weight(tenant)
+                domain_quanta[key] = int(seconds // self.quantum) if self.quantum else 0
+            aged = int((now - job.enqueued) // self.aging_seconds) if self.aging_seconds else 0
+            # Within a priority, waiting takes back one of the domain's quanta per level
+            job_key = (-min(job.priority + aged, top), tenant_times[tenant], max(0, domain_quanta[key] - aged),
+                       self.arrival[job.domain], job.seq)
+            if best_key is None or job_key < best_key:
+                best, best_key = job, job_key
+        if best is None:
+            return None
+        self.waiting.remove(best)
+        best.started = now
+        best.charged = self.costs.get(best.tool, DEFAULT_COST)
+        self._charge(best, best.charged)
+        self.running[best.seq] = best
+        self.domain_running[best.domain] = self.domain_running.get(best.domain, 0) + 1
+        wait = now - best.enqueued
+        for job_class in (f"tool:{best.tool}", f"tenant:{best.tenant}", f"priority:{best.priority}"):
+            self.waits.setdefault(job_class, deque(maxlen=WAIT_SAMPLES)).append(wait)
+        return best
+
+    def finish(self, job):
+        """Settle a started job: charge its measured run time and learn its tool's cost."""
+        if self.running.pop(job.seq, None) is None:
+            return
+        seconds = self.clock() - job.started
+        self._charge(job, seconds - job.charged)
+        self.domain_running[job.domain] -= 1
+        previous = self.costs.get(job.tool)
+        self.costs[job.tool] = seconds if previous is None else \
+            COST_SMOOTHING * seconds + (1 - COST_SMOOTHING) * previous
+
+    def metrics(self):
+        """Queue-wait summaries (seconds) per job class: tool:<name>, tenant:<name> and priority:<level>."""
+        return {
+            "waiting": len(self.waiting),
+            "running": len(self.running),
+            "waits": {job_class: _summary(samples) for job_class, samples in sorted(self.waits.items()) if samples},
+        }
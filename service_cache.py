@@ -0,0 +1,80 @@
+import os
+import sqlite3
+import time
+
+DEFAULT_CACHE_PATH = "cache/service_cache.db"
+DEFAULT_TTL = 24 * 60 * 60
+DEFAULT_MAX_ENTRIES = 100000
+
+
+class ServiceCache:
+    """Persistent cache of nmap service-detection results keyed by (ip, port, protocol).
+
+    Entries older than ttl seconds are treated as missing, and the table is
+    trimmed back to max_entries (oldest first) on evict().
+    """
+
+    def __init__(self, path=DEFAULT_CACHE_PATH, ttl=DEFAULT_TTL, max_entries=DEFAULT_MAX_ENTRIES):
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.conn = sqlite3.connect(path)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS services ("
+            " ip TEXT NOT NULL, port INTEGER NOT NULL, protocol TEXT NOT NULL,"
+            " state TEXT, service TEXT, product TEXT, version TEXT, timestamp REAL NOT NULL,"
+            " PRIMARY KEY (ip, port, protocol))"
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS services_timestamp ON services (timestamp)")
+        self.conn.commit()
+
+    def close(self):
+        self.conn.commit()
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def get(self, ip, port, protocol):
+        row = self.conn.execute(
+            "SELECT state, service, product, version, timestamp FROM services"
+            " WHERE ip = ? AND port = ? AND protocol = ?",
+            (ip, int(port), protocol)
+        ).fetchone()
+        if row is None or time.time() - row[4] > self.ttl:
+            return None
+        return {
+            'portid': str(port),
+            'protocol': protocol,
+            'state': row[0],
+            'service': row[1] or '',
+            'product': row[2] or '',
+            'version': row[3] or '',
+            'timestamp': row[4]
+        }
+
+    def needs_detection(self, ip, port, protocol, state):
+        """True if the endpoint is new, has changed state, or its entry has expired."""
+        cached = self.get(ip, port, protocol)
+        return cached is None or cached['state'] != state
+
+    def put(self, ip, port_info):
+        self.conn.execute(
+            "INSERT OR REPLACE INTO services (ip, port, protocol, state, service, product, version, timestamp)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (ip, int(port_info['portid']), port_info['protocol'], port_info.get('state'),
+             port_info.get('service'), port_info.get('product'), port_info.get('version'), time.time())
+        )
+
+    def evict(self):
+        self.conn.execute("DELETE FROM services WHERE timestamp < ?", (time.time() - self.ttl,))
+        self.conn.execute(
+            "DELETE FROM services WHERE rowid IN ("
+            " SELECT rowid FROM services ORDER BY timestamp DESC LIMIT -1 OFFSET ?)",
+            (self.max_entries,)
+        )
+        self.conn.commit()
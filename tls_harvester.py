@@ -0,0 +1,275 @@
+import asyncio
+import hashlib
+import ipaddress
+import json
+import logging
+import os
+import ssl
+
+DEFAULT_PORTS = (443,)
+DEFAULT_CONCURRENCY = 50
+DEFAULT_TIMEOUT = 5.0
+# Rounds of harvesting the names found in the previous round's certificates
+DEFAULT_ROUNDS = 3
+
+OID_COMMON_NAME = b"\x55\x04\x03"
+OID_ORGANIZATION = b"\x55\x04\x0a"
+OID_SUBJECT_ALT_NAME = b"\x55\x1d\x11"
+TAG_SEQUENCE = 0x30
+TAG_OID = 0x06
+TAG_UTC_TIME = 0x17
+TAG_GENERALIZED_TIME = 0x18
+TAG_EXPLICIT_VERSION = 0xa0
+TAG_EXPLICIT_EXTENSIONS = 0xa3
+TAG_DNS_NAME = 0x82
+TAG_IP_ADDRESS = 0x87
+
+logger = logging.getLogger(__name__)
+
+
+class CertificateError(ValueError):
+    pass
+
+
+def _read_tlv(data, pos):
+    """(tag, value start, value end) of the DER element at pos."""
+    if pos + 2 > len(data):
+        raise CertificateError("truncated element")
+    tag = data[pos]
+    length = data[pos + 1]
+    pos += 2
+    if length & 0x80:
+        size = length & 0x7f
+        if size == 0 or size > 4 or pos + size > len(data):
+            raise CertificateError("unsupported length")
+        length = int.from_bytes(data[pos:pos + size], 'big')
+        pos += size
+    if pos + length > len(data):
+        raise CertificateError("element overruns certificate")
+    return tag, pos, pos + length
+
+
+def _children(data, start, end):
+    pos = start
+    while pos < end:
+        tag, value_start, value_end = _read_tlv(data, pos)
+        yield tag, value_start, value_end
+        pos = value_end
+
+
+def _text(data, start, end):
+    # PrintableString, UTF8String, IA5String and T61String all decode as UTF-8 in practice
+    return data[start:end].decode('utf-8', errors='replace')
+
+
+def _name_attributes(data, start, end):
+    """{oid bytes: value} from an X.501 Name (SEQUENCE OF SET OF AttributeTypeAndValue)."""
+    attributes = {}
+    for _, set_start, set_end in _children(data, start, end):
+        for _, attr_start, attr_end in _children(data, set_start, set_end):
+            parts = list(_children(data, attr_start, attr_end))
+            if len(parts) == 2 and parts[0][0] == TAG_OID:
+                attributes.setdefault(data[parts[0][1]:parts[0][2]], _text(data, parts[1][1], parts[1][2]))
+    return attributes
+
+
+def _time(data, tag, start, end):
+    text = data[start:end].decode('ascii', errors='replace').rstrip('Z')
+    if tag == TAG_UTC_TIME:
+        year = int(text[:2])
+        text = f"{1900 + year if year >= 50 else 2000 + year}{text[2:]}"
+    return f"{text[0:4]}-{text[4:6]}-{text[6:8]}T{text[8:10]}:{text[10:12]}:{text[12:14] or '00'}Z"
+
+
+def _subject_alt_names(data, start, end):
+    names = []
+    for tag, value_start, value_end in _children(data, start, end):
+        if tag == TAG_DNS_NAME:
+            names.append(data[value_start:value_end].decode('ascii', errors='replace').lower())
+        elif tag == TAG_IP_ADDRESS and value_end - value_start in (4, 16):
+            names.append(str(ipaddress.ip_address(data[value_start:value_end])))
+    return names
+
+
+def parse_certificate(der):
+    """Subject CN, issuer, expiry and subject alternative names from a DER X.509 certificate.
+
+    Only the fields needed for discovery are decoded; signatures are not checked.
+    """
+    _, cert_start, cert_end = _read_tlv(der, 0)
+    tbs_tag, tbs_start, tbs_end = next(_children(der, cert_start, cert_end))
+    if tbs_tag != TAG_SEQUENCE:
+        raise CertificateError("not a certificate")
+    fields = list(_children(der, tbs_start, tbs_end))
+    if fields and fields[0][0] == TAG_EXPLICIT_VERSION:
+        fields = fields[1:]
+    # serial, signature algorithm, issuer, validity, subject, public key, [optional fields]
+    if len(fields) < 6:
+        raise CertificateError("incomplete certificate")
+    issuer = _name_attributes(der, fields[2][1], fields[2][2])
+    validity = list(_children(der, fields[3][1], fields[3][2]))
+    subject = _name_attributes(der, fields[4][1], fields[4][2])
+
+    san = []
+    for tag, start, end in fields[6:]:
+        if tag != TAG_EXPLICIT_EXTENSIONS:
+            continue
+        _, ext_start, ext_end = _read_tlv(der, start)
+        for _, item_start, item_end in _children(der, ext_start, ext_end):
+            parts = list(_children(der, item_start, item_end))
+            if parts and der[parts[0][1]:parts[0][2]] == OID_SUBJECT_ALT_NAME:
+                # extnValue OCTET STRING wraps the GeneralNames SEQUENCE
+                _, octets_start, octets_end = parts[-1]
+                _, names_start, names_end = _read_tlv(der, octets_start)
+                san = _subject_alt_names(der, names_start, names_end)
+    return {
+        'sha256': hashlib.sha256(der).hexdigest(),
+        'subject_cn': subject.get(OID_COMMON_NAME, ''),
+        'issuer': issuer.get(OID_COMMON_NAME) or issuer.get(OID_ORGANIZATION, ''),
+        'not_before': _time(der, *validity[0]) if len(validity) == 2 else '',
+        'not_after': _time(der, *validity[1]) if len(validity) == 2 else '',
+        'san': san,
+    }
+
+
+class CertificateCache:
+    """Parsed certificates by SHA-256 fingerprint, so a certificate served by many hosts is decoded once."""
+
+    def __init__(self):
+        self.entries = {}
+        self.hits = 0
+
+    def parse(self, der):
+        fingerprint = hashlib.sha256(der).hexdigest()
+        if fingerprint in self.entries:
+            self.hits += 1
+        else:
+            self.entries[fingerprint] = parse_certificate(der)
+        return self.entries[fingerprint]
+
+
+def in_scope(name, domain):
+    name = name.lower().rstrip('.')
+    if name.startswith("*."):
+        name = name[2:]
+    return name == domain or name.endswith("." + domain)
+
+
+def _tls_context():
+    # Self-signed and mismatched certificates are exactly what we want to read
+    context = ssl.create_default_context()
+    context.check_hostname = False
+    context.verify_mode = ssl.CERT_NONE
+    return context
+
+
+async def grab_certificate(host, port, timeout=DEFAULT_TIMEOUT, context=None):
+    """(peer IP, DER certificate) served to host:port with SNI host, or None if the handshake failed."""
+    async def _handshake():
+        server_name = None
+        try:
+            ipaddress.ip_address(host)
+        except ValueError:
+            server_name = host
+        _, writer = await asyncio.open_connection(host, port, ssl=context or _tls_context(),
+                                                  server_hostname=server_name)
+        try:
+            peer = writer.get_extra_info('peername')
+            der = writer.get_extra_info('ssl_object').getpeercert(binary_form=True)
+        finally:
+            writer.close()
+        return (peer[0] if peer else ''), der
+
+    try:
+        return await asyncio.wait_for(_handshake(), timeout)
+    except (OSError, asyncio.TimeoutError, ssl.SSLError, UnicodeError, ValueError):
+        return None
+
+
+async def harvest_certificates(endpoints, on_result, concurrency=DEFAULT_CONCURRENCY, timeout=DEFAULT_TIMEOUT,
+                               cache=None):
+    """Handshake with every (host, port) with at most `concurrency` connections in flight.
+
+    on_result(record) is called for each endpoint that served a certificate.
+    Returns the number of certificates received.
+    """
+    cache = cache if cache is not None else CertificateCache()
+    queue = asyncio.Queue(maxsize=concurrency * 2)
+    context = _tls_context()
+    received = 0
+
+    async def worker():
+        nonlocal received
+        while True:
+            endpoint = await queue.get()
+            if endpoint is None:
+                return
+            host, port = endpoint
+            result = await grab_certificate(host, port, timeout, context)
+            if result is None or not result[1]:
+                continue
+            try:
+                certificate = cache.parse(result[1])
+            except (CertificateError, StopIteration, IndexError, ValueError):
+                continue
+            received += 1
+            # A failing callback (e.g. a write error) must not take its worker down:
+            # with every worker gone the producer would block on the full queue forever
+            try:
+                on_result(dict(certificate, host=host, port=port, ip=result[0]))
+            except Exception as e:
+                logger.warning("Handling the certificate of %s:%s failed: %s", host, port, e)
+
+    workers = [asyncio.create_task(worker()) for _ in range(concurrency)]
+    for endpoint in endpoints:
+        await queue.put(endpoint)
+    for _ in workers:
+        await queue.put(None)
+    await asyncio.gather(*workers)
+    return received
+
+
+def harvest_hosts(domain, hosts, on_result, ports=DEFAULT_PORTS, rounds=DEFAULT_ROUNDS,
+                  concurrency=DEFAULT_CONCURRENCY, timeout=DEFAULT_TIMEOUT):
+    """Harvest certificates from hosts, then from in-scope SAN names not seen before, for up to rounds rounds.
+
+    Returns the set of in-scope names that were not among the input hosts.
+    """
+    cache = CertificateCache()
+    seen = {h.lower() for h in hosts}
+    pending = sorted(seen)
+    discovered = set()
+    for _ in range(rounds):
+        if not pending:
+            break
+        found = set()
+
+        def collect(record):
+            record['in_scope'] = sorted({n[2:] if n.startswith("*.") else n
+                                         for n in record['san'] if in_scope(n, domain)})
+            found.update(record['in_scope'])
+            on_result(record)
+
+        asyncio.run(harvest_certificates(((host, port) for host in pending for port in ports), collect,
+                                         concurrency, timeout, cache))
+        pending = sorted(found - seen)
+        seen.update(found)
+        discovered.update(pending)
+    return discovered
+
+
+def tls_scan(domain, log_handle, hosts, ports=DEFAULT_PORTS, rounds=DEFAULT_ROUNDS, concurrency=DEFAULT_CONCURRENCY,
+             timeout=DEFAULT_TIMEOUT):
+    """Collect the certificate of every HTTPS endpoint into results/tls_<domain>.jsonl."""
+    os.makedirs("results", exist_ok=True)
+    output_file = f"results/tls_{domain}.jsonl"
+    count = 0
+    with open(output_file, 'w') as f:
+        def write(record):
+            nonlocal count
+            count += 1
+            f.write(json.dumps(record) + "\n")
+        discovered = harvest_hosts(domain, hosts, write, ports, rounds, concurrency, timeout)
+    log_handle.write(f"TLS harvest for {domain}: {count} certificate(s), "
+                     f"{len(discovered)} new in-scope name(s) from subject alternative names.\n")
+    return output_file
@@ -0,0 +1,173 @@
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import threading
+from collections import deque
+from datetime import datetime, timezone
+
+LOG_DIR = "log"
+MAX_BYTES = 5 * 1024 * 1024
+BACKUP_COUNT = 3
+TAIL_LINES = 200
+# Log file for events that do not come from a tool (parsers, report writers, ...)
+MAIN_LOG = "scanner"
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON event per line: timestamp, run ID, tool, stream, level and message."""
+
+    def format(self, record):
+        event = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "run_id": getattr(record, "run_id", None),
+            "tool": getattr(record, "tool", MAIN_LOG),
+            "stream": getattr(record, "stream", "log"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        return json.dumps(event)
+
+
+class ToolFileRouter(logging.Handler):
+    """Write each record to a size-capped rotating file per (run, tool).
+
+    Only ever called from the queue listener thread, so file I/O stays off the
+    threads that produce log events.
+    """
+
+    def __init__(self, log_dir=LOG_DIR, max_bytes=MAX_BYTES, backup_count=BACKUP_COUNT):
+        super().__init__()
+        self.log_dir = log_dir
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.files = {}
+        self.formatter = JsonFormatter()
+
+    def _handler(self, run_id, tool):
+        key = (run_id, tool)
+        if key not in self.files:
+            run_dir = os.path.join(self.log_dir, run_id or "default")
+            os.makedirs(run_dir, exist_ok=True)
+            handler = logging.handlers.RotatingFileHandler(
+                os.path.join(run_dir, f"{tool}.jsonl"), maxBytes=self.max_bytes,
+                backupCount=self.backup_count, delay=True, encoding="utf-8")
+            handler.setFormatter(self.formatter)
+            self.files[key] = handler
+        return self.files[key]
+
+    def emit(self, record):
+        self._handler(getattr(record, "run_id", None), getattr(record, "tool", MAIN_LOG)).handle(record)
+
+    def close(self):
+        for handler in self.files.values():
+            handler.close()
+        self.files.clear()
+        super().close()
+
+
+class LogService:
+    """Process-wide queue logging: producers enqueue, one listener thread writes the files."""
+
+    def __init__(self, log_dir=LOG_DIR, max_bytes=MAX_BYTES, backup_count=BACKUP_COUNT, level=logging.INFO,
+                 default_run_id=None):
+        self.queue = queue.SimpleQueue()
+        self.queue_handler = logging.handlers.QueueHandler(self.queue)
+        self.queue_handler.addFilter(self._stamp_run_id)
+        self.default_run_id = default_run_id
+        self.router = ToolFileRouter(log_dir, max_bytes, backup_count)
+        self.listener = logging.handlers.QueueListener(self.queue, self.router)
+        self.level = level
+
+    def _stamp_run_id(self, record):
+        # Events from parsers and other shared code belong to the current run
+        if getattr(record, "run_id", None) is None:
+            record.run_id = self.default_run_id
+        return True
+
+    def start(self):
+        root = logging.getLogger()
+        root.addHandler(self.queue_handler)
+        root.setLevel(self.level)
+        self.listener.start()
+        return self
+
+    def stop(self):
+        """Flush every queued event to disk and detach from the root logger."""
+        logging.getLogger().removeHandler(self.queue_handler)
+        self.listener.stop()
+        self.router.close()
+
+
+class ToolLog:
+    """File-like log sink for one tool in one run.
+
+    write() turns text into structured log events, and fileno() hands
+    subprocesses the write end of a pipe that a reader thread drains into the
+    same events, so tool output never interleaves with other tools and the
+    tool never waits on log file I/O. The last TAIL_LINES lines are kept in
+    memory for error reporting, and listeners(line, stream) see every line.
+    """
+
+    def __init__(self, run_id, tool, tail_lines=TAIL_LINES):
+        self.logger = logging.getLogger(f"autorecon.tool.{tool}")
+        self.run_id = run_id
+        self.tool = tool
+        self.tail = deque(maxlen=tail_lines)
+        self.listeners = []
+        self._write_fd = None
+        self._reader = None
+        self._lock = threading.Lock()
+
+    def _emit(self, line, stream):
+        self.tail.append(line)
+        for listener in self.listeners:
+            listener(line, stream)
+        self.logger.info(line, extra={"run_id": self.run_id, "tool": self.tool, "stream": stream})
+
+    def emit(self, line, stream="log"):
+        """Log one line as if the tool had written it to the given stream."""
+        self._emit(line, stream)
+
+    def write(self, text):
+        for line in text.splitlines():
+            if line.strip():
+                self._emit(line, "log")
+        return len(text)
+
+    def flush(self):
+        pass
+
+    def fileno(self):
+        with self._lock:
+            if self._write_fd is None:
+                read_fd, self._write_fd = os.pipe()
+                self._reader = threading.Thread(target=self._pump, args=(read_fd,),
+                                                name=f"log-{self.tool}", daemon=True)
+                self._reader.start()
+            return self._write_fd
+
+    def _pump(self, read_fd):
+        with os.fdopen(read_fd, 'r', encoding='utf-8', errors='replace') as pipe:
+            for line in pipe:
+                line = line.rstrip('\r\n')
+                if line.strip():
+                    self._emit(line, "output")
+
+    def close(self):
+        """Close the pipe and wait until everything the tool printed has been logged."""
+        with self._lock:
+            if self._write_fd is not None:
+                os.close(self._write_fd)
+                self._write_fd = None
+        if self._reader is not None:
+            self._reader.join()
+            self._reader = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
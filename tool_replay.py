@@ -0,0 +1,282 @@
+import argparse
+import contextvars
+import glob
+import json
+import os
+import shutil
+import subprocess
+import threading
+import time
+from collections import deque
+from datetime import datetime
+
+from records import to_json
+
+BUNDLE_VERSION = 1
+MANIFEST = "manifest.json"
+RESULTS_DIR = "results"
+
+# Tool -> files it writes under results/; recorded after a run and restored on replay
+TOOL_ARTIFACTS = {
+    'nmap': ("nmap_{domain}.xml", "nmap_sv_{domain}_*.xml", "nmap_cached_{domain}.json", "nmap_targets_{domain}.txt"),
+    'whatweb': ("whatweb_{domain}.txt",),
+    'dnsenum': ("dnsenum_{domain}.xml",),
+    'theharvester': ("theharvester_{domain}.json",),
+    'httpx': ("httpx_headers_{domain}.txt",),
+    'sublist3r': ("sublist3r_{domain}.txt",),
+    'dnsdumpster': ("dnsdumpster_{domain}.json",),
+    'ct': ("ct_{domain}.txt",),
+    'bruteforce': ("bruteforce_{domain}.txt",),
+    'tls': ("tls_{domain}.jsonl",),
+    'host index': ("host_index_{domain}.json",),
+    'web probing': ("httpx_{domain}.jsonl", "httpx_targets_{domain}.txt", "whatweb_{domain}.json",
+                    "whatweb_targets_{domain}.txt", "fingerprint_{domain}.jsonl"),
+}
+# Files written a little before the recorded start still count (coarse file system timestamps)
+MTIME_SLACK = 1.0
+
+
+class ReplayError(RuntimeError):
+    """A replayed tool run that raised an error when it was recorded."""
+
+
+# subprocess.run is wrapped while a recorder is open; only code running a
+# recorded tool collects its calls, every other caller passes straight through.
+# A context variable rather than a thread-local, so work a tool hands to its own
+# threads through contextvars.copy_context() is recorded too.
+_active = contextvars.ContextVar('tool_replay_active', default=None)
+_original_run = subprocess.run
+_hook_lock = threading.Lock()
+_hook_users = 0
+
+
+def _recording_run(*popenargs, **kwargs):
+    active = _active.get()
+    if active is None:
+        return _original_run(*popenargs, **kwargs)
+    calls, run_started = active
+    command = popenargs[0] if popenargs else kwargs.get('args')
+    started = time.monotonic()
+    call = {"command": [str(part) for part in command] if isinstance(command, (list, tuple)) else str(command),
+            "started": round(started - run_started, 3), "exit_code": None}
+    try:
+        result = _original_run(*popenargs, **kwargs)
+        call["exit_code"] = result.returncode
+        return result
+    except subprocess.CalledProcessError as e:
+        call["exit_code"] = e.returncode
+        raise
+    except subprocess.TimeoutExpired:
+        call["timed_out"] = True
+        raise
+    except OSError as e:
+        call["error"] = str(e)
+        raise
+    finally:
+        call["seconds"] = round(time.monotonic() - started, 3)
+        calls.append(call)
+
+
+def _install_hook():
+    global _hook_users
+    with _hook_lock:
+        _hook_users += 1
+        subprocess.run = _recording_run
+
+
+def _remove_hook():
+    global _hook_users
+    with _hook_lock:
+        _hook_users -= 1
+        if _hook_users == 0:
+            subprocess.run = _original_run
+
+
+def _artifact_paths(tool, domain, results_dir=RESULTS_DIR):
+    paths = []
+    for pattern in TOOL_ARTIFACTS.get(tool, ()):
+        paths.extend(glob.glob(os.path.join(results_dir, pattern.format(domain=domain))))
+    return sorted(set(paths))
+
+
+def load_manifest(bundle_dir):
+    with open(os.path.join(bundle_dir, MANIFEST), 'r', encoding='utf-8') as f:
+        manifest = json.load(f)
+    if manifest.get("version") != BUNDLE_VERSION:
+        raise ValueError(f"{bundle_dir} is not a version {BUNDLE_VERSION} replay bundle")
+    return manifest
+
+
+class ToolRecorder:
+    """Record each wrapped tool run into a replay bundle directory.
+
+    A run is stored under runs/<id>/ as its timed log lines (output.jsonl) and
+    the result files it wrote (artifacts/); manifest.json lists every run
+    with its subprocess commands, exit codes, timing and return value. The
+    manifest is rewritten after each run, and recording into an existing
+    bundle adds to it.
+    """
+
+    def __init__(self, bundle_dir, results_dir=RESULTS_DIR):
+        self.bundle_dir = bundle_dir
+        self.results_dir = results_dir
+        self.lock = threading.Lock()
+        os.makedirs(os.path.join(bundle_dir, "runs"), exist_ok=True)
+        if os.path.exists(os.path.join(bundle_dir, MANIFEST)):
+            self.manifest = load_manifest(bundle_dir)
+        else:
+            self.manifest = {"version": BUNDLE_VERSION, "created": datetime.now().isoformat(), "runs": []}
+        _install_hook()
+
+    def close(self):
+        _remove_hook()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def wrap(self, tool, scan_func):
+        """scan_func(domain, log_handle) that records its run under tool."""
+        def recorded(domain, log_handle):
+            return self._record(tool, scan_func, domain, log_handle)
+        return recorded
+
+    def _record(self, tool, scan_func, domain, log_handle):
+        lines = []
+        started, wall_started = time.monotonic(), time.time()
+        log_handle.listeners.append(lambda line, stream: lines.append(
+            [round(time.monotonic() - started, 3), stream, line]))
+        calls = []
+        token = _active.set((calls, started))
+        output, error = None, None
+        try:
+            output = scan_func(domain, log_handle)
+            return output
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            _active.reset(token)
+            # Calls from concurrent threads are appended as they finish
+            calls.sort(key=lambda call: call["started"])
+            seconds = time.monotonic() - started
+            # Drain the tool's output pipe so the recording has every line
+            log_handle.close()
+            self._save(tool, domain, wall_started, seconds, output, error, calls, lines)
+
+    def _save(self, tool, domain, wall_started, seconds, output, error, calls, lines):
+        with self.lock:
+            run_id = f"{len(self.manifest['runs']):04d}-{domain}-{tool.replace(' ', '-')}"
+            run_dir = os.path.join(self.bundle_dir, "runs", run_id)
+            os.makedirs(os.path.join(run_dir, "artifacts"), exist_ok=True)
+            with open(os.path.join(run_dir, "output.jsonl"), 'w', encoding='utf-8') as f:
+                for line in lines:
+                    f.write(json.dumps(line) + "\n")
+            artifacts = []
+            for path in _artifact_paths(tool, domain, self.results_dir):
+                if os.path.getmtime(path) >= wall_started - MTIME_SLACK:
+                    shutil.copy2(path, os.path.join(run_dir, "artifacts", os.path.basename(path)))
+                    artifacts.append(os.path.basename(path))
+            self.manifest["runs"].append({
+                "id": run_id,
+                "tool": tool,
+                "domain": domain,
+                "started": datetime.fromtimestamp(wall_started).isoformat(),
+                "seconds": round(seconds, 3),
+                "output": json.loads(json.dumps(output, default=to_json)),
+                "error": error,
+                "calls": calls,
+                "artifacts": artifacts,
+                "log_lines": len(lines),
+            })
+            tmp_path = os.path.join(self.bundle_dir, MANIFEST + ".tmp")
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self.manifest, f, indent=2)
+            os.replace(tmp_path, os.path.join(self.bundle_dir, MANIFEST))
+
+
+class ToolReplayer:
+    """Serve recorded tool runs back instead of running the tools.
+
+    Each wrapped call takes the next recorded run of its (domain, tool),
+    clears the tool's current result files, replays its log lines and
+    restores its artifacts. speed scales the recorded timing (1 is the
+    original pace, 10 ten times faster); 0 replays without waiting.
+    """
+
+    def __init__(self, bundle_dir, speed=1.0, results_dir=RESULTS_DIR):
+        self.bundle_dir = bundle_dir
+        self.speed = speed
+        self.results_dir = results_dir
+        self.lock = threading.Lock()
+        self.runs = {}
+        for run in load_manifest(bundle_dir)["runs"]:
+            self.runs.setdefault((run["domain"], run["tool"]), deque()).append(run)
+
+    def close(self):
+        pass
+
+    def has(self, domain, tool):
+        return bool(self.runs.get((domain, tool)))
+
+    def domains(self):
+        return sorted({domain for domain, _ in self.runs})
+
+    def wrap(self, tool, scan_func=None):
+        """scan_func(domain, log_handle) stand-in that replays tool's next recorded run."""
+        def replayed(domain, log_handle):
+            return self._replay(tool, domain, log_handle)
+        return replayed
+
+    def _wait(self, started, offset):
+        if self.speed:
+            delay = started + offset / self.speed - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+
+    def _replay(self, tool, domain, log_handle):
+        with self.lock:
+            queue = self.runs.get((domain, tool))
+            run = queue.popleft() if queue else None
+        if run is None:
+            log_handle.write(f"No recorded {tool} run for {domain} in {self.bundle_dir}\n")
+            return None
+        started = time.monotonic()
+        run_dir = os.path.join(self.bundle_dir, "runs", run["id"])
+        # Leftovers from other runs would be parsed along with the recorded files
+        for path in _artifact_paths(tool, domain, self.results_dir):
+            os.remove(path)
+        with open(os.path.join(run_dir, "output.jsonl"), 'r', encoding='utf-8') as f:
+            for line in f:
+                offset, stream, text = json.loads(line)
+                self._wait(started, offset)
+                log_handle.emit(text, stream)
+        self._wait(started, run["seconds"])
+        os.makedirs(self.results_dir, exist_ok=True)
+        for name in run["artifacts"]:
+            shutil.copy2(os.path.join(run_dir, "artifacts", name), os.path.join(self.results_dir, name))
+        if run["error"]:
+            raise ReplayError(run["error"])
+        return run["output"]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Inspect a replay bundle recorded with scanner.py --record")
+    parser.add_argument("bundle", help="bundle directory")
+    args = parser.parse_args(argv)
+
+    manifest = load_manifest(args.bundle)
+    print(f"Bundle created {manifest['created']}, {len(manifest['runs'])} run(s)")
+    print(f"{'Run':<40}{'Seconds':>9}  {'Calls':>5}  {'Failed':>6}  {'Files':>5}  Error")
+    for run in manifest["runs"]:
+        # Each call keeps its own exit code; a call fails on a non-zero code, a timeout or an OS error
+        failed = sum(1 for call in run["calls"] if call["exit_code"] not in (0, None) or call.get("timed_out")
+                     or call.get("error"))
+        print(f"{run['id']:<40}{run['seconds']:>9.2f}  {len(run['calls']):>5}  {failed:>6}  "
+              f"{len(run['artifacts']):>5}  {run['error'] or ''}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,161 @@
+import asyncio
+import json
+import os
+import re
+
+from http_prober import probe_urls, DEFAULT_CONCURRENCY
+
+# (plugin name, where to look, literal keyword, optional verifying regex with a "version" group)
+# Channels: "header:<name>", "cookie", "meta", "body".
+SIGNATURES = [
+    ("Apache", "header:server", "apache", r"apache(?:/(?P<version>[\d.]+))?"),
+    ("nginx", "header:server", "nginx", r"nginx(?:/(?P<version>[\d.]+))?"),
+    ("LiteSpeed", "header:server", "litespeed", None),
+    ("Microsoft-IIS", "header:server", "microsoft-iis", r"microsoft-iis(?:/(?P<version>[\d.]+))?"),
+    ("OpenSSL", "header:server", "openssl", r"openssl/(?P<version>[\w.]+)"),
+    ("Cloudflare", "header:server", "cloudflare", None),
+    ("Cloudflare", "cookie", "__cf_bm", None),
+    ("Varnish", "header:via", "varnish", None),
+    ("Varnish", "header:x-varnish", "x-varnish", None),
+    ("Amazon-CloudFront", "header:x-amz-cf-id", "x-amz-cf-id", None),
+    ("PHP", "header:x-powered-by", "php", r"php(?:/(?P<version>[\d.]+))?"),
+    ("PHP", "cookie", "phpsessid", None),
+    ("ASP_NET", "header:x-aspnet-version", "x-aspnet-version", r"x-aspnet-version: (?P<version>[\d.]+)"),
+    ("ASP_NET", "header:x-powered-by", "asp.net", None),
+    ("ASP_NET", "cookie", "asp.net_sessionid", None),
+    ("Express", "header:x-powered-by", "express", None),
+    ("Java", "cookie", "jsessionid", None),
+    ("Django", "cookie", "csrftoken", None),
+    ("Laravel", "cookie", "laravel_session", None),
+    ("Drupal", "header:x-generator", "drupal", r"drupal (?P<version>\d+)"),
+    ("Drupal", "body", "drupal-settings-json", None),
+    ("WordPress", "meta", "wordpress", r"wordpress ?(?P<version>[\d.]+)?"),
+    ("WordPress", "body", "wp-content/", None),
+    ("Joomla", "meta", "joomla", None),
+    ("Magento", "body", "mage/cookies", None),
+    ("Shopify", "body", "cdn.shopify.com", None),
+    ("Wix", "body", "static.wixstatic.com", None),
+    ("JQuery", "body", "jquery", r"jquery[.-]?(?P<version>\d+\.\d+(?:\.\d+)?)(?:\.min)?\.js"),
+    ("Bootstrap", "body", "bootstrap", r"bootstrap[/.-]?(?P<version>\d+\.\d+(?:\.\d+)?)"),
+    ("Font-Awesome", "body", "font-awesome", None),
+    ("React", "body", "data-reactroot", None),
+    ("Vue", "body", "data-v-app", None),
+    ("Angular", "body", "ng-version", r'ng-version="(?P<version>[\d.]+)"'),
+    ("Google-Analytics", "body", "google-analytics.com", None),
+    ("Google-Analytics", "body", "gtag(", None),
+    ("Google-Tag-Manager", "body", "googletagmanager.com", None),
+    ("HTML5", "body", "<!doctype html>", None),
+]
+
+_TITLE = re.compile(r"<title[^>]*>(.*?)</title>", re.I | re.S)
+_META = re.compile(r"<meta[^>]+>", re.I)
+
+
+class SignatureIndex:
+    """All signature keywords compiled into one case-insensitive alternation.
+
+    A response is scanned once to find which keywords occur; only signatures
+    whose keyword was hit run their (channel-scoped) verifying regex.
+    """
+
+    def __init__(self, signatures=SIGNATURES):
+        self.by_keyword = {}
+        for name, channel, keyword, pattern in signatures:
+            compiled = re.compile(pattern, re.I) if pattern else None
+            self.by_keyword.setdefault(keyword.lower(), []).append((name, channel, compiled))
+        keywords = sorted(self.by_keyword, key=len, reverse=True)
+        self.pattern = re.compile("|".join(re.escape(k) for k in keywords), re.I)
+        # Matches never overlap, so a long keyword also credits the keywords inside it
+        self.contained = {k: [o for o in keywords if o != k and o in k] for k in keywords}
+
+    def match(self, response):
+        headers = response.get('headers', [])
+        header_text = "\n".join(f"{name.lower()}: {value}" for name, value in headers)
+        cookie_names = [value.split('=', 1)[0].strip() for name, value in headers if name.lower() == 'set-cookie']
+        cookie_text = "\n".join(cookie_names)
+        body = response.get('body', '')
+        haystack = "\n".join((header_text, cookie_text, body))
+
+        hits = set()
+        for found in self.pattern.finditer(haystack):
+            keyword = found.group(0).lower()
+            hits.add(keyword)
+            hits.update(self.contained[keyword])
+
+        meta_text = None
+        detected = {}
+        for keyword in hits:
+            for name, channel, compiled in self.by_keyword[keyword]:
+                if channel.startswith("header:"):
+                    wanted = channel[len("header:"):]
+                    scope = "\n".join(f"{n.lower()}: {v}" for n, v in headers if n.lower() == wanted)
+                elif channel == "cookie":
+                    scope = cookie_text
+                elif channel == "meta":
+                    if meta_text is None:
+                        meta_text = "\n".join(_META.findall(body))
+                    scope = meta_text
+                else:
+                    scope = body
+                if keyword not in scope.lower():
+                    continue
+                version = None
+                if compiled is not None:
+                    verified = compiled.search(scope)
+                    if verified is None:
+                        continue
+                    version = verified.groupdict().get('version')
+                if version or name not in detected:
+                    detected[name] = version
+        return detected
+
+
+_default_index = None
+
+
+def default_index():
+    global _default_index
+    if _default_index is None:
+        _default_index = SignatureIndex()
+    return _default_index
+
+
+def fingerprint_response(response, index=None):
+    """Build a parse_whatweb-compatible record for one HTTP response."""
+    index = index or default_index()
+    record = {'url': response['url'], 'status': f"{response['status']} {response.get('reason', '')}".strip()}
+    headers = {name.lower(): value for name, value in response.get('headers', [])}
+    if 'server' in headers:
+        record['HTTPServer'] = headers['server']
+    if 'x-powered-by' in headers:
+        record['X-Powered-By'] = headers['x-powered-by']
+    if 'strict-transport-security' in headers:
+        record['Strict-Transport-Security'] = headers['strict-transport-security']
+    cookies = [value.split('=', 1)[0].strip() for name, value in response.get('headers', [])
+               if name.lower() == 'set-cookie']
+    if cookies:
+        record['Cookies'] = ",".join(cookies)
+    if response.get('ip'):
+        record['IP'] = response['ip']
+    title = _TITLE.search(response.get('body', ''))
+    if title:
+        record['Title'] = " ".join(title.group(1).split())
+    for name, version in index.match(response).items():
+        record[name] = version if version else True
+    return record
+
+
+def fingerprint_urls(urls, on_record, concurrency=DEFAULT_CONCURRENCY, timeout=10.0):
+    """Probe urls asynchronously and fingerprint each response as it arrives."""
+    index = default_index()
+    return asyncio.run(probe_urls(urls, lambda response: on_record(fingerprint_response(response, index)),
+                                  concurrency=concurrency, timeout=timeout))
+
+
+def fingerprint_scan(domain, log_handle, urls, concurrency=DEFAULT_CONCURRENCY):
+    os.makedirs("results", exist_ok=True)
+    output_file = f"results/fingerprint_{domain}.jsonl"
+    with open(output_file, 'w') as f:
+        count = fingerprint_urls(urls, lambda record: f.write(json.dumps(record) + "\n"), concurrency=concurrency)
+    log_handle.write(f"In-process fingerprinting for {domain} matched {count} responding URL(s).\n")
+    return output_file